@@ -10,9 +10,9 @@ import datetime
 import os
 import sys
 import time
-from typing import Dict, Any, Optional, Tuple
-
-import schedule
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import config
 from login_handler import LoginHandler
@@ -21,8 +21,21 @@ from utils.notifier import Notifier
 # 添加当前目录到系统路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from utils.browser_factory import create_browser_manager, shutdown_shared_browsers
+from utils.http_client import (try_http_sign_in, DEFAULT_SIGNIN_API, SIGNIN_SUCCESS, SIGNIN_ALREADY_SIGNED,
+                               SIGNIN_AUTH_FAILED, SIGNIN_CHALLENGE, SIGNIN_UNEXPECTED, SIGNIN_SESSION_STATES)
+from utils.browser_pool import WarmBrowserPool
+from utils.cookie_store import get_cookie_store
+from utils.history import get_history
+from utils.accounts import load_accounts, build_account_config, resolve_worker_count, format_results_table
 from utils.logger import setup_logger, get_logger, logger
-from utils.selenium_browser import SeleniumBrowserManager
+from utils.metrics import BROWSER_CRASHES, record_results, start_metrics_server
+from utils.scheduler import DailyScheduler, build_jobs
+from utils.screenshots import get_screenshot_processor
+from utils.timing import SpanRecorder, activate, report_path, span
+
+if TYPE_CHECKING:
+    from utils.browser_factory import BrowserManager
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -34,11 +47,13 @@ def parse_arguments() -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(description='自动签到脚本')
     parser.add_argument('--headless', action='store_true', help='启用无头模式（不显示浏览器界面）')
+    parser.add_argument('--once', action='store_true', help='只执行一次签到后退出，忽略定时任务配置（适合cron调用）')
 
     return parser.parse_args()
 
 
-def perform_sign_in(browser_manager: SeleniumBrowserManager, config: Dict[str, Any]) -> Tuple[bool, str, Optional[str]]:
+def perform_sign_in(browser_manager: 'BrowserManager',
+                    config: Dict[str, Any]) -> Tuple[bool, str, Optional[str], bool]:
     """
     执行签到操作
     
@@ -47,7 +62,7 @@ def perform_sign_in(browser_manager: SeleniumBrowserManager, config: Dict[str, A
         config: 配置信息
         
     Returns:
-        (签到是否成功, 结果消息, 截图路径)
+        (签到是否成功, 结果消息, 截图路径, 是否今日已签到)，今日已签到时结果消息是之前签到的结果
     """
     logger = get_logger()
     elements_config = config.get('ELEMENTS', {}).get('signin', {})
@@ -59,60 +74,74 @@ def perform_sign_in(browser_manager: SeleniumBrowserManager, config: Dict[str, A
     # 是否截图
     take_screenshot = browser_config.get('screenshots', False)
     screenshot_path = None
+    screenshot_dir = config.get('SCREENSHOT', {}).get('dir', 'Screenshots')
+    account_name = config.get('USER', {}).get('name', '')
+    timestamp = f"{account_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}" if account_name \
+        else datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
 
     if not signin_url:
         logger.error("签到URL未配置")
-        return False, "签到URL未配置", None
+        return False, "签到URL未配置", None, False
 
     try:
-        # 导航到签到页面
+        # 导航到签到页面（等待页面加载和网络空闲）
         browser_manager.navigate_to(signin_url)
-        time.sleep(2)  # 等待页面加载
 
-        # 检查是否已经签到
-        if success_message and browser_manager.is_element_present(success_message, wait_time=3):
-            result_text = browser_manager.get_element_text(success_message)
+        # 一次检查签到结果和签到按钮：已有结果说明今日已签到，否则点击按钮
+        state = browser_manager.probe({'success': success_message, 'button': signin_button}, wait_time=3, settle=True)
+        if state.get('success', {}).get('present'):
+            result_text = state['success']['text']
             logger.info(f"今日已签到，无需重复操作: {result_text}")
-            # 保存签到记录
-            return True, result_text or "今日已签到", ""
-
-        # 点击签到按钮
-        if not browser_manager.click_element(signin_button):
-            logger.error("点击签到按钮失败")
-            return False, "点击签到按钮失败", None
-
-        # 等待签到结果
-        time.sleep(2)
-
-        # 检查是否签到成功
-        if success_message and browser_manager.is_element_present(success_message, wait_time=3):
-            # 获取签到成功的消息
-            result_text = browser_manager.get_element_text(success_message)
+            return True, result_text or "今日已签到", None, True
+        button = state.get('button', {})
+        if not button.get('present'):
+            # 页面已稳定或等待超时，既没有签到结果也没有签到按钮
+            logger.error("未找到签到按钮")
+            return False, "未找到签到按钮", None, False
+        if not button.get('clickable'):
+            logger.debug("签到按钮暂不可点击，等待按钮就绪")
+
+        with span('signin_click', ready=bool(button.get('clickable'))) as attributes:
+            # 点击签到按钮，probe已确认可点击时不再等待
+            mark = browser_manager.cdp_mark()
+            if not browser_manager.click_element(signin_button, ready=bool(button.get('clickable'))):
+                attributes['status'] = 'error'
+                logger.error("点击签到按钮失败")
+                return False, "点击签到按钮失败", None, False
+
+            # 等待签到接口返回并渲染结果
+            signin_api = urlparse(website_config.get('signin_api', DEFAULT_SIGNIN_API)).path
+            if browser_manager.wait_for_response(signin_api, since=mark) is None:
+                attributes['status'] = 'timeout'
+            browser_manager.wait_for_network_idle()
+
+        # 检查是否签到成功，同时获取签到成功的消息
+        state = browser_manager.probe({'success': success_message}, wait_time=3, settle=True)
+        if state.get('success', {}).get('present'):
+            result_text = state['success']['text']
             logger.info(f"签到成功: {result_text}")
 
-            # 截图保存
+            # 截图保存（只截取签到结果周围区域）
             if take_screenshot:
-                screenshot_path = os.path.join("Screenshots",
-                                               f"signin_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                browser_manager.take_screenshot(screenshot_path)
-                logger.info(f"已保存签到成功截图: {screenshot_path}")
+                screenshot_path = browser_manager.take_screenshot(
+                    os.path.join(screenshot_dir, f"signin_{timestamp}.png"), success_message)
+                logger.info(f"已提交签到成功截图: {screenshot_path}")
 
-            return True, result_text or "签到成功", screenshot_path
+            return True, result_text or "签到成功", screenshot_path, False
         else:
             logger.warning("签到失败，未检测到成功消息")
             # 截图保存
             if take_screenshot:
-                screenshot_path = os.path.join("Screenshots",
-                                               f"signin_failed_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                browser_manager.take_screenshot(screenshot_path)
-                logger.info(f"已保存签到失败截图: {screenshot_path}")
+                screenshot_path = browser_manager.take_screenshot(
+                    os.path.join(screenshot_dir, f"signin_failed_{timestamp}.png"))
+                logger.info(f"已提交签到失败截图: {screenshot_path}")
 
-            return False, "签到失败，未检测到成功消息", screenshot_path
+            return False, "签到失败，未检测到成功消息", screenshot_path, False
 
     except Exception as e:
         message = f"签到过程中出错: {e}"
         logger.error(message)
-        return False, message, None
+        return False, message, None, False
 
 
 def check_environment():
@@ -122,12 +151,17 @@ def check_environment():
     logger.info(f"工作目录: {os.getcwd()}")
 
     # 检查配置
-    required_configs = ['WEBSITE', 'USER', 'LOGIN', 'BROWSER', 'ELEMENTS']
+    required_configs = ['WEBSITE', 'LOGIN', 'BROWSER', 'ELEMENTS']
     for cfg in required_configs:
         if not hasattr(config, cfg):
             logger.error(f"缺少关键配置: {cfg}")
             return False
 
+    # 检查账号配置
+    if not getattr(config, 'ACCOUNTS', None) and not getattr(config, 'USER', None):
+        logger.error("缺少关键配置: USER 或 ACCOUNTS")
+        return False
+
     # 检查BROWSER配置
     if not config.BROWSER.get('type'):
         logger.error("未指定浏览器类型")
@@ -136,91 +170,282 @@ def check_environment():
     return True
 
 
-def run_signin_task():
-    logger.info("=" * 50)
-    logger.info("自动签到脚本启动")
-    logger.info(f"当前时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+def sign_in_account(account_config: Dict[str, Any], browser_pool: Optional[WarmBrowserPool] = None,
+                    run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    使用独立的浏览器完成单个账号的登录和签到，并记录各阶段耗时
 
-    notifier = Notifier(config.__dict__)
+    Args:
+        account_config: 该账号使用的配置信息
+        browser_pool: 常驻浏览器池，为None时每次启动新的浏览器
+        run_id: 运行ID，指定时将各阶段耗时写入该次运行的报告目录
+
+    Returns:
+        签到结果，包含account、success、message、screenshot、duration和timings
+    """
+    account_name = account_config.get('USER', {}).get('name', '') or 'default'
+    path = report_path(account_config.get('REPORT', {}), run_id, account_name) if run_id else None
+    recorder = SpanRecorder(account_name, path, run_id=run_id)
+    with activate(recorder):
+        result = _sign_in_account(account_config, browser_pool)
+
+    # 页面稳定后提前结束的等待所节省的时间
+    result['wait_saved'] = round(recorder.attribute_total('saved_seconds'), 2)
+    if result['wait_saved']:
+        logger.info(f"[{account_name}] 页面稳定检测节省等待 {result['wait_saved']:.1f} 秒")
+    recorder.attributes.update(success=result['success'], message=result['message'], network=result.get('network'),
+                               wait_saved=result['wait_saved'])
+    recorder.write()
+    result['timings'] = recorder.phase_totals()
+    return result
+
+
+def _sign_in_account(account_config: Dict[str, Any], browser_pool: Optional[WarmBrowserPool] = None) -> Dict[str, Any]:
+    """
+    使用独立的浏览器完成单个账号的登录和签到
+
+    Args:
+        account_config: 该账号使用的配置信息
+        browser_pool: 常驻浏览器池，为None时每次启动新的浏览器
 
+    Returns:
+        签到结果，包含account、success、message、screenshot、started_at、retries和duration
+    """
+    account_name = account_config.get('USER', {}).get('name', '')
+    retry_config = account_config.get('RETRY', {})
+    retry_count = retry_config.get('max_attempts', 3)
+    retry_delay = retry_config.get('delay', 5)
+    start_time = time.time()
+    result = {'account': account_name, 'success': False, 'message': '', 'screenshot': None,
+              'already_signed': False, 'started_at': start_time, 'retries': 0}
+
+    # 优先使用已保存的Cookie免浏览器签到
+    http_status = None
+    if account_config.get('LOGIN', {}).get('http_signin', True):
+        with span('http_signin') as attributes:
+            http_result = try_http_sign_in(account_config)
+            attributes['status'] = http_result[0] if http_result else 'no_cookies'
+        if http_result:
+            http_status, message = http_result
+            if http_status in (SIGNIN_SUCCESS, SIGNIN_ALREADY_SIGNED):
+                logger.info(f"[{account_name}] HTTP签到成功: {message}")
+                result.update(success=True, message=message, already_signed=http_status == SIGNIN_ALREADY_SIGNED,
+                              duration=time.time() - start_time)
+                return result
+            if http_status not in (SIGNIN_AUTH_FAILED, SIGNIN_CHALLENGE, SIGNIN_UNEXPECTED):
+                logger.error(f"[{account_name}] HTTP签到失败: {message}")
+                result.update(message=message, duration=time.time() - start_time)
+                return result
+            logger.info(f"[{account_name}] HTTP签到未通过（{message}），回退到浏览器签到")
+
+    browser_manager = None
+    network_before = {}
     try:
-        browser_manager = None
-        try:
+        if browser_pool:
+            # 从常驻浏览器池获取浏览器
+            browser_manager, warm_session = browser_pool.acquire(account_name, account_config)
+        else:
             # 创建浏览器实例
-            browser_manager = SeleniumBrowserManager(config.__dict__)
-            # 初始化浏览器
+            browser_manager = create_browser_manager(account_config)
+            warm_session = False
+        # 记录本次运行开始时的流量统计，常驻浏览器的统计是累计值
+        network_before = dict(browser_manager.network_stats)
+        # 创建登录处理器，HTTP签到已确认会话失效或遇到验证时不再重复预检
+        login_handler = LoginHandler(browser_manager, account_config, SIGNIN_SESSION_STATES.get(http_status))
+        # 需要表单登录时，在浏览器启动前开始求解验证码，使两者并行（登录页没有验证码时会取消）
+        if not warm_session and login_handler.needs_form_login():
+            login_handler.prefetch_turnstile()
+        # 初始化浏览器
+        if not browser_manager.driver:
             browser_manager.initialize_driver()
-            # 创建登录处理器
-            login_handler = LoginHandler(browser_manager, config.__dict__)
-            # 执行登录
-            login_success = False
-            retry_count = config.RETRY.get('max_attempts', 3)
-            retry_delay = config.RETRY.get('delay', 5)
-            for attempt in range(retry_count):
-                try:
-                    logger.info(f"登录尝试 {attempt + 1}/{retry_count}")
-                    if login_handler.login():
-                        login_success = True
+        # 执行登录，复用的浏览器仍保持登录状态时跳过
+        login_success = warm_session and login_handler.check_session()
+        if login_success:
+            logger.info(f"[{account_name}] 常驻浏览器仍处于登录状态，跳过登录")
+        for attempt in range(0 if login_success else retry_count):
+            result['retries'] += int(attempt > 0)
+            try:
+                logger.info(f"[{account_name}] 登录尝试 {attempt + 1}/{retry_count}")
+                if login_handler.login():
+                    login_success = True
+                    break
+                else:
+                    logger.warning(f"[{account_name}] 登录失败，等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+            except Exception as e:
+                logger.error(f"[{account_name}] 登录过程出错: {e}")
+                if attempt < retry_count - 1:
+                    logger.info(f"等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+        if not login_success:
+            logger.error(f"[{account_name}] 登录失败次数超过最大重试次数，任务终止")
+            result['message'] = "登录失败次数超过最大重试次数"
+            return result
+
+        logger.info(f"[{account_name}] 登录成功，准备签到")
+        # 签到流程
+        for attempt in range(retry_count):
+            result['retries'] += int(attempt > 0)
+            try:
+                logger.info(f"[{account_name}] 签到尝试 {attempt + 1}/{retry_count}")
+                with span('sign_in', attempt=attempt + 1):
+                    signin_result = perform_sign_in(browser_manager, account_config)
+                if isinstance(signin_result, tuple) and len(signin_result) == 4:
+                    success, message, screenshot, already_signed = signin_result
+                    result['message'] = message
+                    if success:
+                        result['success'] = True
+                        result['screenshot'] = screenshot
+                        result['already_signed'] = already_signed
                         break
-                    else:
-                        logger.warning(f"登录失败，等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-                except Exception as e:
-                    logger.error(f"登录过程出错: {e}")
-                    if attempt < retry_count - 1:
-                        logger.info(f"等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-            if not login_success:
-                logger.error("登录失败次数超过最大重试次数，任务终止")
-                return
-
-            logger.info("登录成功，准备签到")
-            # 签到流程
-            signin_success = False
-            signin_result = ""
-            screenshot_path = ""
-
-            for attempt in range(retry_count):
-                try:
-                    logger.info(f"签到尝试 {attempt + 1}/{retry_count}")
-                    result = perform_sign_in(browser_manager, config.__dict__)
-                    if isinstance(result, tuple) and len(result) == 3:
-                        success, message, screenshot = result
-                        if success:
-                            signin_success = True
-                            signin_result = message
-                            screenshot_path = screenshot
-                            break
-                    else:
-                        logger.warning(f"签到失败，等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-                except Exception as e:
-                    logger.error(f"签到过程出错: {e}")
-                    if attempt < retry_count - 1:
-                        logger.info(f"等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-
-            if signin_success:
-                logger.info("签到流程完成")
-                notifier.send_notification(
-                    "NodeSeek签到成功",
-                    f"签到结果: {signin_result}",
-                    success=True,
-                    screenshot_path=screenshot_path
-                )
-            else:
-                logger.error("签到失败次数超过最大重试次数")
-                notifier.send_notification(
-                    "NodeSeek签到失败",
-                    "签到失败次数超过最大重试次数",
-                    success=False
-                )
+                else:
+                    logger.warning(f"[{account_name}] 签到失败，等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+            except Exception as e:
+                logger.error(f"[{account_name}] 签到过程出错: {e}")
+                if attempt < retry_count - 1:
+                    logger.info(f"等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+
+        if result['success']:
+            logger.info(f"[{account_name}] 签到流程完成")
+        else:
+            logger.error(f"[{account_name}] 签到失败次数超过最大重试次数")
+            result['message'] = result['message'] or "签到失败次数超过最大重试次数"
 
-        finally:
-            # 关闭浏览器
-            if browser_manager:
-                logger.info("关闭浏览器")
+    except Exception as e:
+        logger.error(f"[{account_name}] 签到任务执行失败: {e}")
+        result['message'] = f"签到任务执行失败: {e}"
+
+    finally:
+        if browser_manager:
+            result['network'] = {key: value - network_before.get(key, 0)
+                                 for key, value in browser_manager.network_stats.items()}
+            logger.info(f"[{account_name}] 网络请求 {result['network']['requests']} 个，"
+                        f"传输 {result['network']['transferred_bytes'] // 1024} KB，"
+                        f"拦截 {result['network']['blocked_requests']} 个，"
+                        f"约节省 {result['network']['saved_bytes'] // 1024} KB")
+        # 签到失败时检查浏览器是否已意外退出
+        if browser_manager and browser_manager.driver and not result['success'] and not browser_manager.is_alive():
+            logger.warning(f"[{account_name}] 浏览器已意外退出")
+            BROWSER_CRASHES.inc()
+        # 关闭浏览器或归还到常驻浏览器池
+        if browser_manager and browser_pool:
+            with span('browser_release'):
+                browser_pool.release(browser_manager, account_name)
+        elif browser_manager:
+            logger.info(f"[{account_name}] 关闭浏览器")
+            with span('browser_close'):
                 browser_manager.close()
+        result['duration'] = time.time() - start_time
+
+    return result
+
+
+def send_summary_notification(notifier: Notifier, results: List[Dict[str, Any]]) -> None:
+    """
+    发送本次运行的汇总通知
+
+    Args:
+        notifier: 通知器
+        results: 各账号的签到结果
+    """
+    if not results:
+        return
+
+    # 单账号时保持原有的通知格式
+    if len(results) == 1:
+        result = results[0]
+        if result['success']:
+            notifier.send_notification(
+                "NodeSeek签到成功",
+                f"签到结果: {result['message']}",
+                success=True,
+                screenshot_path=result['screenshot']
+            )
+        else:
+            notifier.send_notification(
+                "NodeSeek签到失败",
+                result['message'],
+                success=False
+            )
+        return
+
+    success_count = sum(1 for result in results if result['success'])
+    failed_count = len(results) - success_count
+    notifier.send_notification(
+        f"NodeSeek签到汇总: 成功 {success_count}，失败 {failed_count}",
+        format_results_table(results),
+        success=failed_count == 0,
+        account_results=results
+    )
+
+
+def run_signin_task(browser_pool: Optional[WarmBrowserPool] = None, account_names: Optional[List[str]] = None):
+    """
+    执行一次签到任务
+
+    Args:
+        browser_pool: 常驻浏览器池，为None时每个账号启动新的浏览器
+        account_names: 需要签到的账号名称，为None时签到所有账号
+    """
+    logger.info("=" * 50)
+    logger.info("自动签到脚本启动")
+    logger.info(f"当前时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    notifier = Notifier(config.__dict__)
+    run_id = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    report_config = getattr(config, 'REPORT', {})
+    run_recorder = SpanRecorder('run', report_path(report_config, run_id, 'run'), run_id=run_id)
+
+    try:
+        accounts = load_accounts(config.__dict__)
+        if not accounts:
+            logger.error("未配置任何签到账号")
+            return
+
+        # 多账号模式根据全部账号判断，只签到其中一部分时仍使用各自的Cookie文件
+        multi_account = len(accounts) > 1
+        if account_names is not None:
+            accounts = [account for account in accounts if account['name'] in account_names]
+        workers = resolve_worker_count(config.__dict__, len(accounts))
+        logger.info(f"共 {len(accounts)} 个账号，并发数: {workers}")
+
+        account_configs = [build_account_config(config.__dict__, account, multi_account) for account in accounts]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='signin') as executor:
+            results = list(executor.map(
+                lambda account_config: sign_in_account(account_config, browser_pool, run_id), account_configs))
+        if not browser_pool:
+            # 不使用常驻浏览器池时，共享的浏览器进程只在本次运行中使用
+            shutdown_shared_browsers()
+
+        logger.info("签到结果汇总:\n" + format_results_table(results))
+        record_results(results)
+        # 保存签到记录
+        history = get_history(getattr(config, 'HISTORY', {}))
+        if history:
+            history.record(results, run_id)
+        with activate(run_recorder):
+            # 等待截图处理完成后再发送通知
+            with span('screenshot_flush'):
+                get_screenshot_processor(config.__dict__).flush()
+            # 后台发送完成后会把各渠道的耗时追加到运行报告
+            send_summary_notification(notifier, results)
+        run_recorder.attributes['accounts'] = [
+            {key: result.get(key) for key in ('account', 'success', 'duration', 'timings', 'network', 'wait_saved')}
+            for result in results
+        ]
+        run_recorder.write()
+        if run_recorder.report_path:
+            logger.info(f"运行报告已保存至 {os.path.dirname(run_recorder.report_path)}")
+
+        # 提示会话即将过期的账号
+        cookie_store = get_cookie_store(config.LOGIN)
+        if cookie_store:
+            expiring = cookie_store.expiring_within(config.LOGIN.get('expiry_warning_hours', 24))
+            if expiring:
+                accounts_text = ', '.join(account for account, _ in expiring)
+                logger.warning(f"以下账号的登录会话即将过期: {accounts_text}")
 
     except Exception as e:
         logger.error(f"签到任务执行失败: {e}")
@@ -228,43 +453,42 @@ def run_signin_task():
     logger.info("=== NodeSeek自动签到任务结束 ===")
 
 
-def setup_schedule():
-    """设置定时任务"""
+def create_scheduler(browser_pool: Optional[WarmBrowserPool] = None) -> Optional[DailyScheduler]:
+    """
+    创建定时调度器
+
+    Args:
+        browser_pool: 常驻浏览器池，为None时每次任务启动新的浏览器
+
+    Returns:
+        定时调度器，未启用或配置有误时返回None
+    """
     schedule_config = config.SCHEDULE
 
     if not schedule_config.get('enabled', False):
         logger.info("定时任务未启用")
-        return False
+        return None
 
-    schedule_time = schedule_config.get('time', '08:00')
     try:
-        # 验证时间格式
-        hour, minute = schedule_time.split(':')
-        hour, minute = int(hour), int(minute)
-        if not (0 <= hour < 24 and 0 <= minute < 60):
-            raise ValueError("时间格式不正确")
-
-        logger.info(f"设置定时任务，每天 {schedule_time} 执行签到")
-        schedule.every().day.at(schedule_time).do(run_signin_task)
-        return True
-
+        jobs = build_jobs(schedule_config, load_accounts(config.__dict__))
     except (ValueError, AttributeError) as e:
         logger.error(f"设置定时任务失败: {e}")
-        return False
+        return None
 
+    def prepare(account_names: Optional[List[str]]) -> None:
+        # 提前启动浏览器，定时任务开始时直接使用
+        if browser_pool:
+            count = len(account_names) if account_names is not None else len(load_accounts(config.__dict__))
+            browser_pool.prewarm(resolve_worker_count(config.__dict__, count))
 
-def run_scheduler():
-    """运行定时调度器"""
-    logger.info("启动定时调度器")
-
-    try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次
-    except KeyboardInterrupt:
-        logger.info("用户中断，程序退出")
-    except Exception as e:
-        logger.error(f"调度器运行出错: {e}")
+    scheduler = DailyScheduler(
+        schedule_config,
+        jobs,
+        run=lambda account_names: run_signin_task(browser_pool, account_names),
+        prepare=prepare if browser_pool else None,
+    )
+    logger.info(f"设置定时任务，{scheduler.describe()} 执行签到")
+    return scheduler
 
 
 def main():
@@ -283,43 +507,53 @@ def main():
     # 创建通知器实例
     notifier = Notifier(config.__dict__)
 
+    # --once时只执行一次签到，不启动定时任务相关的服务
+    schedule_mode = config.SCHEDULE.get('enabled', False) and not args.once
+
+    # 定时模式下启动Prometheus指标服务
+    if schedule_mode:
+        start_metrics_server(getattr(config, 'METRICS', {}))
+
+    # 常驻模式下在定时任务之间保持浏览器存活
+    browser_pool = None
+    if schedule_mode and config.BROWSER.get('keep_alive', False):
+        accounts = load_accounts(config.__dict__)
+        browser_pool = WarmBrowserPool(config.__dict__, resolve_worker_count(config.__dict__, len(accounts)))
+        logger.info("已启用常驻浏览器模式")
+
     try:
-        # 立即执行一次签到
-        logger.info("立即执行签到任务")
-        run_signin_task()
-
-        # 设置定时任务
-        schedule_enabled = setup_schedule()
-
-        # 如果设置了定时任务，启动调度器
-        if schedule_enabled:
-            # 如果只运行定时任务且当前时间接近设定时间，可以考虑先执行一次
-            current_time = datetime.datetime.now().time()
-            schedule_time = config.SCHEDULE.get('time', '08:00')
-            schedule_hour, schedule_minute = map(int, schedule_time.split(':'))
-            schedule_time_obj = datetime.time(hour=schedule_hour, minute=schedule_minute)
-
-            # 如果当前时间在设定时间的前后5分钟内，立即执行一次
-            time_diff = abs((current_time.hour * 60 + current_time.minute) -
-                            (schedule_hour * 60 + schedule_minute))
-            if time_diff <= 5:
-                logger.info(f"当前时间接近设定的签到时间 {schedule_time}，立即执行一次签到")
-                run_signin_task()
+        scheduler = create_scheduler(browser_pool) if schedule_mode else None
+
+        if scheduler:
+            if scheduler.catch_up:
+                # 首次启动或重启后错过了定时任务时立即补跑
+                scheduler.run_pending_catch_up()
+            else:
+                # 未启用补跑时保持以往的行为，启动时立即执行一次签到
+                logger.info("立即执行签到任务")
+                run_signin_task(browser_pool)
 
             # 通知已设置定时任务
             if hasattr(config, 'TELEGRAM') and config.TELEGRAM.get('enabled', False):
                 notifier.send_notification(
                     "NodeSeek签到任务已设置",
-                    f"定时任务已设置，将在每天 {config.SCHEDULE.get('time', '08:00')} 自动执行签到",
+                    f"定时任务已设置，将在{scheduler.describe()} 自动执行签到",
                     success=True
                 )
 
-            # 运行调度器
-            logger.info(f"开始等待定时任务执行，每天 {config.SCHEDULE.get('time', '08:00')} 自动签到")
-            run_scheduler()
+            # 运行调度器，空闲时阻塞等待到下一次任务
+            logger.info("启动定时调度器")
+            try:
+                scheduler.run_forever()
+            except KeyboardInterrupt:
+                logger.info("用户中断，程序退出")
         else:
+            # 立即执行一次签到
+            logger.info("立即执行签到任务")
+            run_signin_task(browser_pool)
             # 如果没有启用定时任务，提示用户
-            logger.warning("未启用定时任务，程序执行后自动退出")
+            if not args.once:
+                logger.warning("未启用定时任务，程序执行后自动退出")
     except Exception as e:
         logger.error(f"程序运行时出错: {e}")
 
@@ -334,6 +568,12 @@ def main():
 
         sys.exit(1)
 
+    finally:
+        if browser_pool:
+            browser_pool.shutdown()
+        # 等待后台通知发送完成，未送达的通知会在下次运行时重试
+        notifier.flush()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,274 @@
+"""
+只读检查的元素计算基准测试
+比较同一组只读检查（是否已登录、是否已签到、是否有验证码、是否为Cloudflare验证页面）的三种计算方式：
+逐个find_element、一次probe脚本调用、一次获取页面HTML后用lxml在本地计算（DomSnapshot）
+
+默认只测量lxml在页面模板和录制的页面上的解析与计算耗时，--browser 时额外启动浏览器访问本地模拟服务，
+测量包含WebDriver往返在内的完整耗时
+
+用法:
+    python -m benchmarks.dom_eval --runs 200
+    python -m benchmarks.dom_eval --pages "records/pages/*.html"
+    python -m benchmarks.dom_eval --browser --runs 20 --wait 0.5
+"""
+
+import argparse
+import copy
+import glob
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, Any, Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 未创建config.py时使用示例配置
+try:
+    import config
+except ImportError:
+    config = sys.modules['config'] = importlib.import_module('config_example')
+
+from benchmarks.mock_nodeseek import (MockNodeSeekServer, load_fixture, LOGGED_IN_NAV, LOGGED_OUT_NAV,
+                                      SIGNIN_BUTTON)
+from benchmarks.run_benchmark import percentile
+from utils.dom_snapshot import DomSnapshot, LXML_AVAILABLE, read_only_locators
+from utils.logger import setup_logger
+from utils.page_scripts import LOGOUT_LINK
+
+# 模拟的Cloudflare验证页面
+CHALLENGE_PAGE = ('<html><head><title>Just a moment...</title></head><body><div id="challenge-stage"></div>'
+                  '<script>window._cf_chl_opt = {};</script></body></html>')
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='只读检查的元素计算基准测试')
+    parser.add_argument('--runs', type=int, default=200, help='每个页面的计算次数')
+    parser.add_argument('--pages', nargs='*', default=[], help='录制的页面HTML文件（支持通配符）')
+    parser.add_argument('--browser', action='store_true', help='同时在浏览器中比较find_element、probe和snapshot')
+    parser.add_argument('--wait', type=float, default=0.5, help='find_element方式查找不存在的元素时的等待时间（秒）')
+    parser.add_argument('--no-headless', action='store_true', help='显示浏览器窗口')
+    parser.add_argument('--log-level', default='WARNING', help='日志级别')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    return parser.parse_args()
+
+
+def build_locators() -> Dict[str, Dict[str, str]]:
+    """
+    生成需要计算的只读检查：ELEMENTS中的所有元素加上登出链接
+
+    Returns:
+        名称 -> 元素定位配置
+    """
+    account_config = {key: value for key, value in vars(config).items() if key.isupper()}
+    return {**read_only_locators(account_config), 'logout_link': LOGOUT_LINK}
+
+
+def fixture_pages() -> Dict[str, str]:
+    """
+    渲染页面模板的各种状态
+
+    Returns:
+        页面名称 -> HTML
+    """
+    return {
+        'index_logged_out': load_fixture('index.html', nav=LOGGED_OUT_NAV),
+        'index_logged_in': load_fixture('index.html', nav=LOGGED_IN_NAV),
+        'signIn': load_fixture('signIn.html', turnstile_enabled='false', turnstile_delay_ms=0),
+        'board_button': load_fixture('board.html', nav=LOGGED_IN_NAV, signin=SIGNIN_BUTTON),
+        'board_signed': load_fixture('board.html', nav=LOGGED_IN_NAV, signin='<div>今日签到获得鸡腿 5 个</div>'),
+        'challenge': CHALLENGE_PAGE,
+    }
+
+
+def recorded_pages(patterns: List[str]) -> Dict[str, str]:
+    """
+    读取录制的页面HTML
+
+    Args:
+        patterns: 文件路径或通配符
+
+    Returns:
+        文件名 -> HTML
+    """
+    pages = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def measure(function: Callable[[], Any], runs: int) -> Tuple[Dict[str, float], Any]:
+    """
+    多次执行并统计耗时
+
+    Args:
+        function: 被测函数
+        runs: 执行次数
+
+    Returns:
+        ({'mean': 均值, 'p50': 中位数, 'p95': p95}，单位毫秒; 最后一次的返回值)
+    """
+    durations = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean': sum(durations) / len(durations),
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+    }, result
+
+
+def evaluate_offline(pages: Dict[str, str], locators: Dict[str, Dict[str, str]],
+                     runs: int) -> Dict[str, Dict[str, Any]]:
+    """
+    测量lxml解析页面并计算所有只读检查的耗时
+
+    Args:
+        pages: 页面名称 -> HTML
+        locators: 名称 -> 元素定位配置
+        runs: 每个页面的计算次数
+
+    Returns:
+        页面名称 -> 耗时统计和找到的元素
+    """
+    results = {}
+    for name, page in pages.items():
+        def evaluate():
+            snapshot = DomSnapshot(page)
+            return snapshot.evaluate(locators), snapshot.is_challenge()
+
+        stats, (elements, challenge) = measure(evaluate, runs)
+        found = sorted(key for key, item in elements.items() if item['present'])
+        results[name] = {**stats, 'bytes': len(page.encode('utf-8')), 'found': found, 'challenge': challenge}
+    return results
+
+
+def login_session(base_url: str) -> str:
+    """
+    通过模拟服务的登录接口获取会话令牌
+
+    Args:
+        base_url: 模拟服务地址
+
+    Returns:
+        session Cookie的值
+    """
+    request = urllib.request.Request(f"{base_url}/api/account/signIn", method='POST',
+                                     data=json.dumps({'username': 'bench', 'password': 'bench'}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        cookie = response.headers['Set-Cookie']
+    return cookie.split(';', 1)[0].split('=', 1)[1]
+
+
+def sign_in(base_url: str, session: str) -> None:
+    """通过模拟服务的签到接口完成签到，使签到页显示签到结果"""
+    request = urllib.request.Request(f"{base_url}/api/attendance", method='POST', data=b'{}',
+                                     headers={'Content-Type': 'application/json', 'Cookie': f"session={session}"})
+    urllib.request.urlopen(request).close()
+
+
+def evaluate_browser(locators: Dict[str, Dict[str, str]], args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    在浏览器中访问模拟服务的各个页面，比较三种计算方式的耗时
+
+    Args:
+        locators: 名称 -> 元素定位配置
+        args: 命令行参数
+
+    Returns:
+        页面名称 -> 计算方式 -> 耗时统计
+    """
+    from utils.selenium_browser import SeleniumBrowserManager
+
+    server = MockNodeSeekServer()
+    server.start()
+    base_url = server.base_url
+
+    browser_config = copy.deepcopy({key: value for key, value in vars(config).items() if key.isupper()})
+    browser_config['BROWSER'].update({'type': 'chrome', 'shared_chrome': False, 'headless': not args.no_headless})
+    browser_config['LOGIN'] = {**browser_config.get('LOGIN', {}), 'cookie_store': 'json'}
+    browser = SeleniumBrowserManager(browser_config)
+    browser.initialize_driver()
+
+    def find_elements():
+        # 逐个元素查找，不存在的元素会等待到超时
+        found = {}
+        for name, locator in locators.items():
+            element = browser.find_element(locator, args.wait)
+            found[name] = {'present': element is not None, 'text': element.text if element else None}
+        return found
+
+    methods = {
+        'find_element': find_elements,
+        'probe': lambda: browser.probe(locators),
+        'snapshot': lambda: browser.snapshot().evaluate(locators),
+    }
+
+    results = {}
+    try:
+        session = login_session(base_url)
+        pages = [('index_logged_out', '/'), ('signIn', '/signIn.html'),
+                 ('index_logged_in', '/'), ('board_button', '/board'), ('board_signed', '/board')]
+        for name, path in pages:
+            if name == 'index_logged_in':
+                browser.driver.add_cookie({'name': 'session', 'value': session, 'path': '/'})
+            elif name == 'board_signed':
+                sign_in(base_url, session)
+            browser.navigate_to(f"{base_url}{path}")
+            results[name] = {}
+            for method, function in methods.items():
+                stats, elements = measure(function, args.runs)
+                stats['found'] = sorted(key for key, item in elements.items() if item['present'])
+                results[name][method] = stats
+    finally:
+        browser.close()
+        server.shutdown()
+    return results
+
+
+def main():
+    args = parse_arguments()
+    setup_logger({'level': args.log_level, 'file': os.path.join(tempfile.gettempdir(), 'nodeseek_bench.log')})
+
+    if not LXML_AVAILABLE:
+        print("未安装lxml，请先执行 pip install lxml")
+        sys.exit(1)
+
+    locators = build_locators()
+    pages = {**fixture_pages(), **recorded_pages(args.pages)}
+    offline = evaluate_offline(pages, locators, args.runs)
+
+    print(f"只读检查: {len(locators)} 个  每页计算次数: {args.runs}")
+    print(f"{'页面':<24}{'大小(KB)':>10}{'均值(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}  找到的元素")
+    for name, stats in offline.items():
+        found = ','.join(stats['found']) + (' [challenge]' if stats['challenge'] else '')
+        print(f"{name:<24}{stats['bytes'] / 1024:>10.1f}{stats['mean']:>10.3f}{stats['p50']:>10.3f}"
+              f"{stats['p95']:>10.3f}  {found}")
+
+    browser = {}
+    if args.browser:
+        browser = evaluate_browser(locators, args)
+        print(f"\n浏览器（find_element等待: {args.wait} 秒）")
+        print(f"{'页面':<20}{'方式':<16}{'均值(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}  找到的元素")
+        for name, methods in browser.items():
+            for method, stats in methods.items():
+                print(f"{name:<20}{method:<16}{stats['mean']:>10.2f}{stats['p50']:>10.2f}{stats['p95']:>10.2f}"
+                      f"  {','.join(stats['found'])}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': args.runs, 'locators': list(locators), 'offline': offline, 'browser': browser},
+                      f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
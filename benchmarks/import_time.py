@@ -0,0 +1,108 @@
+"""
+导入耗时基准测试
+使用 python -X importtime 测量主程序的导入耗时，超过预算或导入了浏览器/验证码相关的重量级模块时返回非零退出码
+
+用法:
+    python -m benchmarks.import_time --budget-ms 300
+    python -m benchmarks.import_time --module auto_signin --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在启动浏览器或识别验证码时才应导入的模块
+DEFAULT_FORBIDDEN = ('selenium', 'undetected_chromedriver', 'webdriver_manager', 'aiohttp', 'PIL', 'playwright', 'lxml')
+
+# 未创建config.py时使用示例配置，与run_benchmark一致
+BOOTSTRAP = """
+import importlib, sys
+try:
+    import config
+except ImportError:
+    sys.modules['config'] = importlib.import_module('config_example')
+import {module}
+"""
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='主程序导入耗时基准测试')
+    parser.add_argument('--module', default='auto_signin', help='需要测量的模块')
+    parser.add_argument('--budget-ms', type=float, default=300, help='导入耗时预算（毫秒）')
+    parser.add_argument('--runs', type=int, default=5, help='测量次数，取中位数')
+    parser.add_argument('--top', type=int, default=10, help='显示耗时最多的模块数量')
+    parser.add_argument('--forbid', nargs='*', default=list(DEFAULT_FORBIDDEN),
+                        help='不允许在导入阶段加载的顶层包')
+    return parser.parse_args()
+
+
+def measure(module: str) -> Dict[str, Tuple[int, int, int]]:
+    """
+    在子进程中导入模块并解析 -X importtime 的输出
+
+    Args:
+        module: 模块名
+
+    Returns:
+        模块名 -> (自身耗时us, 累计耗时us, 嵌套层级)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOTSTRAP.format(module=module)],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return timings
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def main():
+    args = parse_arguments()
+
+    samples = []
+    timings = {}
+    for _ in range(args.runs):
+        timings = measure(args.module)
+        # config和被测模块的累计耗时之和即为总导入耗时，不包括解释器启动时导入的模块
+        samples.append(sum(timings.get(name, (0, 0, 0))[1] for name in ('config', 'config_example', args.module)) / 1000)
+    total_ms = median(samples)
+
+    print(f"模块: {args.module}  导入耗时(中位数): {total_ms:.1f} ms  预算: {args.budget_ms:.0f} ms")
+    print(f"{'模块':<48}{'自身(ms)':>10}{'累计(ms)':>10}")
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us, _) in slowest:
+        print(f"{name:<48}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"导入耗时 {total_ms:.1f} ms 超过预算 {args.budget_ms:.0f} ms")
+    loaded = sorted({name.split('.')[0] for name in timings} & set(args.forbid))
+    if loaded:
+        failures.append(f"导入阶段加载了重量级模块: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"失败: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+本地模拟的 NodeSeek 服务
+提供登录页、首页、签到页、登录/签到接口以及模拟的 Capsolver 接口，用于离线基准测试
+
+用法:
+    python -m benchmarks.mock_nodeseek --port 8800 --turnstile --captcha-delay 2
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 模拟静态资源的大小（字节），用于衡量资源拦截的效果
+STATIC_ASSETS = {
+    '.png': ('image/png', 48 * 1024),
+    '.woff2': ('font/woff2', 64 * 1024),
+    '.css': ('text/css', 16 * 1024),
+    '.js': ('application/javascript', 32 * 1024),
+}
+
+LOGGED_IN_NAV = '<a href="/api/account/signOut" title="登出">登出</a>'
+LOGGED_OUT_NAV = '<a href="/signIn.html">登录</a>'
+SIGNIN_BUTTON = '<button onclick="signIn()">试试手气</button>'
+
+
+class MockState:
+    """模拟服务的状态和行为配置"""
+
+    def __init__(self, latency_ms: int = 0, turnstile: bool = False, turnstile_delay_ms: int = 300,
+                 captcha_delay: float = 1.0, password: str = 'bench'):
+        """
+        初始化模拟服务状态
+
+        Args:
+            latency_ms: 每个请求附加的延迟（毫秒）
+            turnstile: 是否在登录页渲染模拟的Turnstile组件并校验令牌
+            turnstile_delay_ms: 点击登录后cf-turnstile-response输入框出现的延迟（毫秒），Turnstile容器在页面加载时渲染
+            captcha_delay: 模拟Capsolver完成识别所需的时间（秒）
+            password: 所有账号通用的密码
+        """
+        self.latency_ms = latency_ms
+        self.turnstile = turnstile
+        self.turnstile_delay_ms = turnstile_delay_ms
+        self.captcha_delay = captcha_delay
+        self.password = password
+        self.lock = threading.Lock()
+        # 会话令牌 -> 用户名
+        self.sessions: Dict[str, str] = {}
+        # 用户名 -> 签到日期
+        self.signed: Dict[str, str] = {}
+        # Capsolver任务ID -> (创建时间, 令牌)
+        self.captcha_tasks: Dict[str, Tuple[float, str]] = {}
+        # 已签发且未使用的Turnstile令牌
+        self.captcha_tokens = set()
+
+    def reset(self) -> None:
+        """清空所有会话、签到记录和验证码任务"""
+        with self.lock:
+            self.sessions.clear()
+            self.signed.clear()
+            self.captcha_tasks.clear()
+            self.captcha_tokens.clear()
+
+
+def load_fixture(name: str, **values: Any) -> str:
+    """
+    读取页面模板并替换{{key}}占位符
+
+    Args:
+        name: 模板文件名
+        values: 占位符的值
+
+    Returns:
+        页面HTML
+    """
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        content = f.read()
+    for key, value in values.items():
+        content = content.replace('{{' + key + '}}', str(value))
+    return content
+
+
+class MockNodeSeekHandler(BaseHTTPRequestHandler):
+    """模拟服务的请求处理器"""
+
+    server_version = 'MockNodeSeek/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def state(self) -> MockState:
+        return self.server.state
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """不输出访问日志"""
+
+    def _current_user(self) -> Optional[str]:
+        """根据session Cookie获取当前登录的用户"""
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        if 'session' not in cookie:
+            return None
+        with self.state.lock:
+            return self.state.sessions.get(cookie['session'].value)
+
+    def _read_json(self) -> Dict[str, Any]:
+        """读取JSON请求体"""
+        length = int(self.headers.get('Content-Length', 0))
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """发送响应"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_html(self, content: str) -> None:
+        self._send(200, content.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def _send_json(self, data: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json', headers)
+
+    def _delay(self) -> None:
+        """模拟网络延迟"""
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000)
+
+    def do_GET(self) -> None:
+        self._delay()
+        path = urlparse(self.path).path
+        user = self._current_user()
+        nav = LOGGED_IN_NAV if user else LOGGED_OUT_NAV
+
+        if path == '/':
+            self._send_html(load_fixture('index.html', nav=nav))
+        elif path == '/signIn.html':
+            self._send_html(load_fixture('signIn.html',
+                                         turnstile_enabled=str(self.state.turnstile).lower(),
+                                         turnstile_delay_ms=self.state.turnstile_delay_ms))
+        elif path == '/board':
+            if not user:
+                signin = '<p>请先登录</p>'
+            elif self.state.signed.get(user) == datetime.date.today().isoformat():
+                signin = '<div>今日签到获得鸡腿 5 个</div>'
+            else:
+                signin = SIGNIN_BUTTON
+            self._send_html(load_fixture('board.html', nav=nav, signin=signin))
+        elif path == '/api/account/signOut':
+            self._send(302, b'', 'text/plain', {'Location': '/', 'Set-Cookie': 'session=; Path=/; Max-Age=0'})
+        elif path.startswith('/static/'):
+            content_type, size = STATIC_ASSETS.get(os.path.splitext(path)[1], ('application/octet-stream', 1024))
+            self._send(200, b'\0' * size, content_type, {'Cache-Control': 'no-store'})
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+    def do_POST(self) -> None:
+        self._delay()
+        path = urlparse(self.path).path
+        data = self._read_json()
+
+        if path == '/api/account/signIn':
+            self._handle_login(data)
+        elif path == '/api/attendance':
+            self._handle_attendance()
+        elif path == '/createTask':
+            self._handle_create_task(data)
+        elif path == '/getTaskResult':
+            self._handle_get_task_result(data)
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+    def _handle_login(self, data: Dict[str, Any]) -> None:
+        """模拟 /api/account/signIn"""
+        if not data.get('username') or data.get('password') != self.state.password:
+            self._send_json({'success': False, 'message': '用户名或密码错误'})
+            return
+
+        if self.state.turnstile:
+            with self.state.lock:
+                token_valid = data.get('token') in self.state.captcha_tokens
+                self.state.captcha_tokens.discard(data.get('token'))
+            if not token_valid:
+                self._send_json({'success': False, 'message': '人机验证失败'})
+                return
+
+        session = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions[session] = data['username']
+        self._send_json({'success': True}, headers={
+            'Set-Cookie': f"session={session}; Path=/; Max-Age={30 * 86400}; HttpOnly",
+        })
+
+    def _handle_attendance(self) -> None:
+        """模拟 /api/attendance"""
+        user = self._current_user()
+        if not user:
+            self._send_json({'success': False, 'message': 'USER NOT FOUND'}, status=403)
+            return
+
+        today = datetime.date.today().isoformat()
+        with self.state.lock:
+            already_signed = self.state.signed.get(user) == today
+            self.state.signed[user] = today
+        if already_signed:
+            self._send_json({'success': False, 'message': '今天已完成签到，请勿重复操作'})
+        else:
+            gain = random.randint(1, 10)
+            self._send_json({'success': True, 'message': f'今日签到获得鸡腿 {gain} 个', 'gain': gain})
+
+    def _handle_create_task(self, data: Dict[str, Any]) -> None:
+        """模拟 Capsolver createTask"""
+        task_id = secrets.token_hex(8)
+        with self.state.lock:
+            self.state.captcha_tasks[task_id] = (time.monotonic(), secrets.token_urlsafe(32))
+        self._send_json({'errorId': 0, 'taskId': task_id, 'status': 'idle'})
+
+    def _handle_get_task_result(self, data: Dict[str, Any]) -> None:
+        """模拟 Capsolver getTaskResult"""
+        with self.state.lock:
+            task = self.state.captcha_tasks.get(data.get('taskId', ''))
+        if not task:
+            self._send_json({'errorId': 1, 'errorCode': 'ERROR_TASKID_INVALID', 'errorDescription': '任务不存在'})
+            return
+
+        created_at, token = task
+        if time.monotonic() - created_at < self.state.captcha_delay:
+            self._send_json({'errorId': 0, 'status': 'processing'})
+            return
+
+        with self.state.lock:
+            self.state.captcha_tokens.add(token)
+        self._send_json({'errorId': 0, 'status': 'ready', 'solution': {'token': token}})
+
+
+class MockNodeSeekServer(ThreadingHTTPServer):
+    """模拟的 NodeSeek 服务"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, state: Optional[MockState] = None):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示随机端口
+            state: 服务状态和行为配置
+        """
+        super().__init__((host, port), MockNodeSeekHandler)
+        self.state = state or MockState()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """在后台线程中启动服务"""
+        threading.Thread(target=self.serve_forever, name='mock-nodeseek', daemon=True).start()
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='本地模拟的NodeSeek服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8800, help='监听端口')
+    parser.add_argument('--latency-ms', type=int, default=0, help='每个请求附加的延迟（毫秒）')
+    parser.add_argument('--turnstile', action='store_true', help='启用模拟的Turnstile验证')
+    parser.add_argument('--captcha-delay', type=float, default=1.0, help='模拟验证码识别耗时（秒）')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    server = MockNodeSeekServer(args.host, args.port, MockState(
+        latency_ms=args.latency_ms, turnstile=args.turnstile, captcha_delay=args.captcha_delay))
+    print(f"模拟服务已启动: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,280 @@
+"""
+离线基准测试
+使用真实的浏览器管理器（Selenium或Playwright后端）/ LoginHandler / perform_sign_in 访问本地模拟服务，
+统计各阶段耗时的p50/p95以及整体吞吐量
+
+用法:
+    python -m benchmarks.run_benchmark --iterations 10 --concurrency 2 --mode form --turnstile
+"""
+
+import argparse
+import copy
+import importlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 未创建config.py时使用示例配置
+try:
+    import config
+except ImportError:
+    config = sys.modules['config'] = importlib.import_module('config_example')
+
+from auto_signin import perform_sign_in
+from benchmarks.mock_nodeseek import MockNodeSeekServer, MockState
+from login_handler import LoginHandler
+from utils.browser_factory import create_browser_manager, shutdown_shared_browsers
+from utils.http_client import try_http_sign_in, SIGNIN_SUCCESS, SIGNIN_ALREADY_SIGNED
+from utils.logger import setup_logger
+from utils.timing import SpanRecorder, activate
+
+PHASES = ('driver_init', 'login', 'sign_in', 'close', 'total')
+
+# 每个浏览器的网络流量统计
+NETWORK_SAMPLES: List[Dict[str, int]] = []
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='NodeSeek签到离线基准测试')
+    parser.add_argument('--iterations', type=int, default=5, help='签到的账号数量')
+    parser.add_argument('--concurrency', type=int, default=1, help='并发数')
+    parser.add_argument('--mode', choices=('form', 'cookie', 'http'), default='form',
+                        help='form: 每次表单登录; cookie: 使用已保存的Cookie登录; http: 免浏览器HTTP签到')
+    parser.add_argument('--latency-ms', type=int, default=0, help='模拟服务每个请求附加的延迟（毫秒）')
+    parser.add_argument('--turnstile', action='store_true', help='启用模拟的Turnstile验证')
+    parser.add_argument('--captcha-delay', type=float, default=1.0, help='模拟验证码识别耗时（秒）')
+    parser.add_argument('--no-headless', action='store_true', help='显示浏览器窗口')
+    parser.add_argument('--backend', choices=('chrome', 'shared-chrome', 'playwright'), default='chrome',
+                        help='chrome: 每个账号一个undetected Chrome; shared-chrome: 共享Chrome，每个账号一个浏览器上下文; '
+                             'playwright: 共享Chromium，每个账号一个浏览器上下文')
+    parser.add_argument('--no-blocking', action='store_true', help='不拦截图片、字体等资源')
+    parser.add_argument('--log-level', default='WARNING', help='日志级别')
+    parser.add_argument('--json', help='将结果写入JSON文件')
+    return parser.parse_args()
+
+
+def build_config(base_url: str, index: int, args: argparse.Namespace, cookie_dir: str) -> Dict[str, Any]:
+    """
+    生成指向模拟服务的账号配置
+
+    Args:
+        base_url: 模拟服务地址
+        index: 账号序号
+        args: 命令行参数
+        cookie_dir: Cookie保存目录
+
+    Returns:
+        账号配置
+    """
+    account_config = copy.deepcopy({key: value for key, value in vars(config).items() if key.isupper()})
+    account_config['WEBSITE'].update({
+        'url': base_url,
+        'login_url': f"{base_url}/signIn.html",
+        'signin_url': f"{base_url}/board",
+    })
+    account_config['USER'] = {'name': f"bench{index}", 'username': f"bench{index}", 'password': 'bench'}
+    account_config['LOGIN'].update({
+        'method': 'form' if args.mode == 'form' else 'auto',
+        'cookie_path': os.path.join(cookie_dir, f"bench{index}.json"),
+        'cookie_store': 'json',
+        'http_signin': args.mode == 'http',
+        'save_cookie': True,
+    })
+    account_config['CAPSOLVER'].update({
+        'enabled': args.turnstile,
+        'api_key': 'bench',
+        'api_url': base_url,
+        'timeout': max(30, args.captcha_delay * 5),
+    })
+    account_config['CAPSOLVER']['captcha_types']['turnstile'].update({'enabled': args.turnstile, 'site_key': 'bench'})
+    account_config['BROWSER'].update({'type': 'chrome' if args.backend == 'shared-chrome' else args.backend,
+                                      'shared_chrome': args.backend == 'shared-chrome',
+                                      'headless': not args.no_headless, 'screenshots': False, 'keep_alive': False})
+    account_config['RESOURCE_BLOCKING'] = {**account_config.get('RESOURCE_BLOCKING', {}),
+                                           'enabled': not args.no_blocking}
+    return account_config
+
+
+def run_browser_account(account_config: Dict[str, Any]) -> Dict[str, float]:
+    """
+    使用浏览器完成一个账号的登录和签到，并记录各阶段耗时
+
+    Args:
+        account_config: 账号配置
+
+    Returns:
+        各阶段耗时（秒），包括导航、元素等待、验证码识别等细分阶段
+    """
+    recorder = SpanRecorder(account_config['USER']['name'])
+    with activate(recorder):
+        timings = _run_browser_account(account_config)
+    for name, total in recorder.phase_totals().items():
+        timings.setdefault(name, total)
+    # 页面稳定检测提前结束等待所节省的时间
+    timings['wait_saved'] = recorder.attribute_total('saved_seconds')
+    return timings
+
+
+def _run_browser_account(account_config: Dict[str, Any]) -> Dict[str, float]:
+    timings = {}
+    start_time = time.perf_counter()
+
+    phase_start = time.perf_counter()
+    browser_manager = create_browser_manager(account_config)
+    browser_manager.initialize_driver()
+    timings['driver_init'] = time.perf_counter() - phase_start
+
+    try:
+        phase_start = time.perf_counter()
+        login_handler = LoginHandler(browser_manager, account_config)
+        if not login_handler.login():
+            raise RuntimeError(f"登录失败: {account_config['USER']['name']}")
+        timings['login'] = time.perf_counter() - phase_start
+
+        phase_start = time.perf_counter()
+        success, message, _, _ = perform_sign_in(browser_manager, account_config)
+        if not success:
+            raise RuntimeError(f"签到失败: {message}")
+        timings['sign_in'] = time.perf_counter() - phase_start
+    finally:
+        NETWORK_SAMPLES.append(dict(browser_manager.network_stats))
+        phase_start = time.perf_counter()
+        browser_manager.close()
+        timings['close'] = time.perf_counter() - phase_start
+
+    timings['total'] = time.perf_counter() - start_time
+    return timings
+
+
+def run_http_account(account_config: Dict[str, Any]) -> Dict[str, float]:
+    """
+    使用HTTP接口完成一个账号的签到
+
+    Args:
+        account_config: 账号配置
+
+    Returns:
+        各阶段耗时（秒）
+    """
+    start_time = time.perf_counter()
+    status, message = try_http_sign_in(account_config) or (None, '没有可用的Cookie')
+    if status not in (SIGNIN_SUCCESS, SIGNIN_ALREADY_SIGNED):
+        raise RuntimeError(f"HTTP签到失败: {message}")
+    elapsed = time.perf_counter() - start_time
+    return {'sign_in': elapsed, 'total': elapsed}
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 数值列表
+        percent: 百分位（0-100）
+
+    Returns:
+        百分位数
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    汇总各阶段耗时
+
+    Args:
+        samples: 每个账号的各阶段耗时
+
+    Returns:
+        各阶段的次数、均值、p50和p95
+    """
+    summary = {}
+    spans = sorted({phase for sample in samples for phase in sample} - set(PHASES))
+    for phase in PHASES + tuple(spans):
+        values = [sample[phase] for sample in samples if phase in sample]
+        if values:
+            summary[phase] = {
+                'count': len(values),
+                'mean': sum(values) / len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+            }
+    return summary
+
+
+def main():
+    args = parse_arguments()
+    setup_logger({'level': args.log_level, 'file': os.path.join(tempfile.gettempdir(), 'nodeseek_bench.log')})
+
+    server = MockNodeSeekServer(state=MockState(
+        latency_ms=args.latency_ms, turnstile=args.turnstile, captcha_delay=args.captcha_delay))
+    server.start()
+    cookie_dir = tempfile.mkdtemp(prefix='nodeseek_bench_')
+    configs = [build_config(server.base_url, index, args, cookie_dir) for index in range(args.iterations)]
+
+    # cookie和http模式需要先完成一次表单登录来保存Cookie，然后清空签到记录
+    if args.mode in ('cookie', 'http'):
+        print("预热: 表单登录并保存Cookie...")
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(run_browser_account, configs))
+        server.state.signed.clear()
+        NETWORK_SAMPLES.clear()
+
+    runner = run_http_account if args.mode == 'http' else run_browser_account
+    samples = []
+    failures = 0
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(runner, account_config) for account_config in configs]
+        for future in futures:
+            try:
+                samples.append(future.result())
+            except Exception as e:
+                failures += 1
+                print(f"失败: {e}")
+    wall_time = time.perf_counter() - start_time
+    shutdown_shared_browsers()
+    server.shutdown()
+
+    summary = summarize(samples)
+    throughput = len(samples) / wall_time * 60 if wall_time else 0
+
+    print(f"\n模式: {args.mode}  后端: {args.backend}  账号数: {args.iterations}  并发: {args.concurrency}  失败: {failures}")
+    print(f"{'阶段':<16}{'次数':>6}{'均值(s)':>10}{'p50(s)':>10}{'p95(s)':>10}")
+    for phase, stats in summary.items():
+        print(f"{phase:<16}{stats['count']:>6}{stats['mean']:>10.2f}{stats['p50']:>10.2f}{stats['p95']:>10.2f}")
+    print(f"总耗时: {wall_time:.2f} 秒  吞吐量: {throughput:.1f} 账号/分钟")
+    network = {key: sum(sample[key] for sample in NETWORK_SAMPLES) for key in
+               ('requests', 'transferred_bytes', 'blocked_requests', 'saved_bytes')}
+    if NETWORK_SAMPLES:
+        print(f"网络请求: {network['requests']}  传输: {network['transferred_bytes'] // 1024} KB  "
+              f"拦截: {network['blocked_requests']}  约节省: {network['saved_bytes'] // 1024} KB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'mode': args.mode,
+                'backend': args.backend,
+                'iterations': args.iterations,
+                'concurrency': args.concurrency,
+                'failures': failures,
+                'wall_time': wall_time,
+                'throughput_per_minute': throughput,
+                'phases': summary,
+                'network': network,
+            }, f, ensure_ascii=False, indent=2)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ WEBSITE = {
     'url': 'https://www.nodeseek.com',  # 网站地址
     'login_url': 'https://www.nodeseek.com/signIn.html',  # 登录页面地址
     'signin_url': 'https://www.nodeseek.com/board',  # 签到页面地址
+    'signin_api': '/api/attendance?random=true',  # 签到接口地址（HTTP签到使用）
 }
 
 # 用户信息
@@ -17,11 +18,34 @@ USER = {
     'password': 'your_password',    # 登录密码
 }
 
+# 多账号配置（可选，配置后将忽略USER）
+# 每个账号可单独指定cookie_path，未指定时使用 LOGIN['cookie_dir']/<name>.json
+ACCOUNTS = [
+    # {'name': 'main', 'username': 'user1', 'password': 'pass1'},
+    # {'name': 'alt', 'username': 'user2', 'password': 'pass2', 'offset_seconds': 600},  # 定时任务比其他账号晚10分钟
+]
+
+# 多账号并发配置
+CONCURRENCY = {
+    'max_workers': 3,  # 最大并发数（每个并发占用一个浏览器，Playwright后端可以设置得更大）
+    'memory_limit_mb': None,  # 内存上限(MB)，None表示读取容器的cgroup限制
+    'memory_per_browser_mb': 500,  # 每个浏览器预估占用的内存(MB)
+    'memory_per_context_mb': 80,  # Playwright后端或shared_chrome时每个浏览器上下文预估占用的内存(MB)，共享的浏览器进程按memory_per_browser_mb计算一次
+    'memory_reserve_mb': 300,  # 为主进程预留的内存(MB)
+}
+
 # 登录方式配置
 LOGIN = {
     'method': 'auto',  # 登录方式: form(表单登录)、cookie(Cookie登录)或auto(优先使用cookie，失败后使用表单)
     'cookie_path': 'cookies.json',  # Cookie保存路径，仅在cookie或auto登录方式下有效
     'save_cookie': True,  # 是否在表单登录成功后保存Cookie
+    'cookie_dir': 'cookies',  # 多账号模式下Cookie文件的保存目录
+    'cookie_store': 'json',  # Cookie存储方式: json(每个账号一个文件)或sqlite(所有账号保存在一个数据库中)
+    'cookie_db': 'records/cookies.db',  # sqlite存储方式下的数据库路径
+    'session_cookie_names': ['session'],  # 决定会话有效期的Cookie名称
+    'expiry_warning_hours': 24,  # 会话在该时间内过期时输出提醒
+    'preflight_check': True,  # 启动浏览器前用一次HTTP请求检查Cookie是否有效，失效时直接使用表单登录
+    'http_signin': True,  # 存在Cookie时优先通过HTTP接口签到，认证失败或遇到Cloudflare验证时回退到浏览器
 }
 
 # Capsolver验证码配置
@@ -42,15 +66,58 @@ CAPSOLVER = {
             'site_key': '0x4AAAAAAAaNy7leGjewpVyR',    # Cloudflare Turnstile site key
         }
     },
-    'timeout': 60,     # 识别超时时间(秒)
+    'timeout': 60,     # 识别超时时间(秒)，超过后放弃本次识别
+    'api_url': 'https://api.capsolver.com',  # Capsolver API地址，可指向本地模拟服务
 }
 
 # 浏览器配置
 BROWSER = {
-    'type': 'chrome',  # 浏览器类型：chrome、firefox 或 safari
+    'type': 'chrome',  # 浏览器后端：chrome(每个账号一个undetected Chrome) 或 playwright(共享一个Chromium，每个账号一个浏览器上下文)
     'headless': True,  # 是否使用无头模式（不显示浏览器窗口）
     'timeout': 10,  # 等待元素加载的超时时间（秒）
     'screenshots': True,  # 是否启用截图功能
+    'network_idle_ms': 500,  # 网络空闲判定的静默窗口(毫秒)，用于替代固定的等待时间
+    'long_request_seconds': 5,  # 超过该时长的请求（长轮询、统计上报）不再阻塞网络空闲判定
+    'settle_quiet_ms': 500,  # 页面加载完成后DOM和网络静默多久视为稳定(毫秒)，稳定后不再等待不存在的元素
+    'settle_markers': None,  # 表示页面已渲染出最终状态的元素列表，None表示使用登录表单、登出链接和签到页元素
+    'wait_strategy': 'observer',  # 元素等待方式：observer(页面内MutationObserver，元素出现后立即返回) 或 poll(每0.5秒轮询)
+    'read_mode': 'script',  # 只读检查的计算方式：script(页面内脚本) 或 snapshot(页面稳定后获取一次页面HTML，用lxml在本地计算，需要安装lxml)
+    'keep_alive': False,  # 定时任务模式下是否在两次运行之间保持浏览器存活（常驻模式）
+    'recycle_after': 10,  # 常驻浏览器使用多少次后重建，0表示不主动重建
+    'binary_path': None,  # Chrome可执行文件路径，None表示自动查找（Playwright后端找不到时使用playwright install安装的Chromium）
+    'version_main': None,  # 固定Chrome主版本号，None表示自动检测
+    'driver_cache': True,  # 是否缓存修补过的chromedriver，Chrome升级后才重新下载
+    'driver_cache_dir': 'drivers',  # chromedriver缓存目录（Docker中挂载为卷）
+    'shared_chrome': False,  # chrome后端是否让所有账号共享一个Chrome，每个账号使用独立的浏览器上下文
+}
+
+# 资源拦截配置（Chrome后端通过CDP Network.setBlockedURLs，Playwright后端通过请求路由）
+RESOURCE_BLOCKING = {
+    'enabled': True,  # 是否拦截签到流程用不到的资源
+    'resource_types': ['image', 'font', 'media'],  # 拦截网站自身的哪些类型资源（按扩展名匹配）
+    'third_party': [  # 拦截的第三方地址，*为通配符
+        '*google-analytics.com*',
+        '*googletagmanager.com*',
+        '*doubleclick.net*',
+        '*googlesyndication.com*',
+        '*hm.baidu.com*',
+        '*clarity.ms*',
+    ],
+    'first_party_paths': ['/static/', '/avatar/'],  # 只在网站自身的这些路径下按扩展名拦截
+    'extra_patterns': [],  # 其他需要拦截的地址
+    'allowlist': ['challenges.cloudflare.com', '/cdn-cgi/', 'turnstile'],  # 始终放行
+}
+
+# 截图配置（BROWSER['screenshots']为True时生效）
+SCREENSHOT = {
+    'dir': 'Screenshots',  # 截图保存目录
+    'format': 'webp',  # 截图格式: webp、jpeg或png（未安装Pillow时固定为png）
+    'quality': 80,  # webp/jpeg的编码质量
+    'max_width': 1280,  # 截图最大宽度，超过时等比缩小
+    'element_only': True,  # 签到成功时只截取签到结果周围的区域
+    'padding': 40,  # 元素截图四周保留的边距(像素)
+    'max_dir_mb': 200,  # 截图目录的最大总大小(MB)，超过时删除最旧的截图
+    'max_age_days': 30,  # 截图最长保存天数
 }
 
 # 网页元素定位信息（根据实际网站调整）
@@ -74,6 +141,12 @@ ELEMENTS = {
 SCHEDULE = {
     'enabled': True,  # 是否启用定时任务
     'time': '01:00',  # 每天执行时间
+    'times': [],  # 多个执行时间，如 ['01:00', '13:00']，设置后忽略time
+    'jitter_seconds': 0,  # 每次执行前的随机延迟上限(秒)
+    'prepare_seconds': 60,  # 常驻浏览器模式下提前多少秒预热浏览器
+    'catch_up': True,  # 重启后补跑错过的任务（首次启动时立即执行一次），关闭后每次启动都立即执行一次
+    'catch_up_hours': 12,  # 只补跑多少小时以内错过的任务
+    'state_path': 'records/schedule_state.json',  # 保存各任务最近一次运行时间的文件
 }
 
 # 邮件通知配置（可选.测试时用的AWS邮箱服务）
@@ -85,6 +158,7 @@ EMAIL = {
     'username': 'your_smtp_username',  # 发件人邮箱用户名
     'password': 'your_smtp_password',  # 发件人邮箱密码或应用专用密码
     'receiver': 'receiver@example.com',  # 收件人邮箱
+    'batch_mode': 'digest',  # 多账号邮件发送方式: digest(一封汇总邮件)或batch(每个账号一封，共用一个SMTP连接)
 }
 
 # Telegram通知配置（需自行编写通知）
@@ -94,6 +168,33 @@ TELEGRAM = {
     'url': 'http://bot.example.com/notice',  # Telegram bot url
 }
 
+# 通知发送配置
+NOTIFY = {
+    'async': True,  # 是否在后台线程发送通知，签到流程不再等待Telegram或SMTP
+    'channel_timeout': 30,  # 每个通知渠道的超时时间(秒)
+    'outbox_path': 'records/notify_outbox.json',  # 未送达通知的保存路径，下次运行时重试
+    'outbox_max_age_hours': 72,  # 未送达通知超过该时间后不再重试
+}
+
+# 运行报告配置
+REPORT = {
+    'enabled': True,  # 是否为每次运行生成各阶段耗时报告
+    'dir': 'records/reports',  # 报告保存目录，每次运行一个子目录
+}
+
+# 签到历史记录配置
+HISTORY = {
+    'enabled': True,  # 是否把每个账号每次签到的结果写入SQLite数据库
+    'path': 'records/history.db',  # 数据库路径，统计命令: python -m utils.history --days 30
+}
+
+# Prometheus指标配置（仅定时任务模式）
+METRICS = {
+    'enabled': False,  # 是否启动指标HTTP服务
+    'host': '0.0.0.0',  # 监听地址
+    'port': 9464,  # 监听端口，指标地址为 http://host:port/metrics
+}
+
 # 日志配置
 LOGGING = {
     'level': 'DEBUG',  # 日志级别：DEBUG, INFO, WARNING, ERROR
@@ -5,24 +5,41 @@
 
 import os
 import time
-from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
 
-from utils.selenium_browser import SeleniumBrowserManager
+from utils.cookie_store import get_cookie_store
+from utils.http_client import validate_saved_session, SESSION_EXPIRED, SESSION_MISSING, SESSION_UNKNOWN
 from utils.logger import get_logger
+from utils.timing import span
+
+if TYPE_CHECKING:
+    from utils.browser_factory import BrowserManager
 
 logger = get_logger()
 
+# Turnstile令牌有效期为300秒，预取的令牌超过该时间后不再使用
+TURNSTILE_TOKEN_TTL = 270
+
+# 登录页面上Turnstile验证码的特征元素，出现时才开始预取令牌
+TURNSTILE_LOCATORS = {
+    'widget': {'type': 'class', 'value': 'cf-turnstile'},
+    'response': {'type': 'name', 'value': 'cf-turnstile-response'},
+    'script': {'type': 'xpath', 'value': '//script[contains(@src, "challenges.cloudflare.com/turnstile")]'},
+}
+
 
 class LoginHandler:
     """处理网站登录逻辑的类"""
 
-    def __init__(self, browser: SeleniumBrowserManager, config: Dict[str, Any]):
+    def __init__(self, browser: 'BrowserManager', config: Dict[str, Any], session_state: Optional[str] = None):
         """
         初始化登录处理器
         
         Args:
             browser: 浏览器管理器实例
             config: 配置信息
+            session_state: 已知的会话状态（如HTTP签到的结果），提供时第一次登录跳过会话预检
         """
         self.browser = browser
         self.config = config
@@ -39,6 +56,17 @@ class LoginHandler:
         self.cookie_path = self.login_config.get('cookie_path', 'cookies.json')
         # 是否保存Cookie
         self.save_cookie = self.login_config.get('save_cookie', True)
+        # Cookie数据库，未配置时使用cookie_path指向的JSON文件
+        self.cookie_store = get_cookie_store(self.login_config)
+        self.account = self.user_config.get('name') or self.user_config.get('username', '')
+
+        # 是否在启动浏览器前用HTTP请求预检已保存的会话
+        self.preflight_check = self.login_config.get('preflight_check', True)
+        self._session_state: Optional[str] = session_state
+
+        # 预取的Turnstile令牌
+        self._turnstile_future: Optional[Future] = None
+        self._turnstile_started = 0.0
 
     def login(self) -> bool:
         """
@@ -52,24 +80,178 @@ class LoginHandler:
             logger.error("登录URL未配置")
             return False
 
-        # 根据登录方式选择登录逻辑
-        if self.login_method == 'auto':
-            logger.info("使用自动登录模式（优先尝试cookie登录）")
-            # 先尝试Cookie登录
-            success = self._cookie_login()
-            # 如果Cookie登录失败，则使用表单登录
-            if not success:
-                logger.info("Cookie登录失败，切换到表单登录")
+        with span('login', method=self.login_method) as attributes:
+            # 根据登录方式选择登录逻辑
+            if self.login_method == 'auto':
+                logger.info("使用自动登录模式（优先尝试cookie登录）")
+                # 根据预检结果决定是否值得尝试Cookie登录
+                session_state, self._session_state = self._get_session_state(), None
+                if session_state == SESSION_EXPIRED:
+                    logger.info("预检发现Cookie已失效，直接使用表单登录")
+                    self._discard_saved_cookies()
+                    success = False
+                elif session_state == SESSION_MISSING:
+                    success = False
+                else:
+                    success = self._cookie_login()
+                # 如果Cookie登录失败，则使用表单登录
+                if not success:
+                    logger.info("Cookie登录失败，切换到表单登录")
+                    success = self._form_login()
+            elif self.login_method == 'cookie':
+                logger.info("使用Cookie登录")
+                success = self._cookie_login()
+            else:  # 默认使用表单登录
+                logger.info("使用表单登录")
                 success = self._form_login()
-        elif self.login_method == 'cookie':
-            logger.info("使用Cookie登录")
-            success = self._cookie_login()
-        else:  # 默认使用表单登录
-            logger.info("使用表单登录")
-            success = self._form_login()
+
+            attributes['success'] = success
 
         return success
 
+    def needs_form_login(self) -> bool:
+        """
+        判断本次登录是否会走表单登录
+
+        Returns:
+            是否需要表单登录
+        """
+        if self.login_method == 'form':
+            return True
+        return self.login_method == 'auto' and self._get_session_state() in (SESSION_MISSING, SESSION_EXPIRED)
+
+    def _get_session_state(self) -> str:
+        """
+        获取已保存会话的状态，结果在下一次登录前缓存
+
+        Returns:
+            会话状态：valid、expired、challenged、missing或unknown
+        """
+        if self._session_state is None:
+            if not self._has_saved_cookies():
+                self._session_state = SESSION_MISSING
+            elif self.preflight_check:
+                with span('session_preflight') as attributes:
+                    self._session_state = attributes['state'] = validate_saved_session(self.config)
+                logger.info(f"会话预检结果: {self._session_state}")
+            else:
+                self._session_state = SESSION_UNKNOWN
+        return self._session_state
+
+    def prefetch_turnstile(self) -> None:
+        """
+        在后台开始求解Turnstile验证码，表单提交时再取回结果
+
+        每次求解都会消耗Capsolver额度，只应在确定要表单登录或登录页面出现Turnstile时调用，
+        页面上最终没有验证码时由_handle_turnstile_captcha取消
+        """
+        if self._turnstile_future and time.time() - self._turnstile_started < TURNSTILE_TOKEN_TTL:
+            return
+
+        turnstile_config = self.capsolver_config.get('captcha_types', {}).get('turnstile', {})
+        if not self.capsolver_config.get('enabled', False) or not turnstile_config.get('enabled', False):
+            return
+
+        site_key = turnstile_config.get('site_key', '')
+        login_url = self.website_config.get('login_url', '')
+        if not site_key or not login_url or not self.capsolver_config.get('api_key'):
+            return
+
+        from utils.captcha_solver import get_solver_service
+
+        logger.info("开始后台预取Turnstile验证码")
+        self._turnstile_started = time.time()
+        self._turnstile_future = get_solver_service(self.capsolver_config).submit_turnstile(site_key, login_url)
+
+    def _cancel_turnstile_prefetch(self) -> None:
+        """页面上没有Turnstile验证码时取消预取，尚未完成的求解不再等待"""
+        future, self._turnstile_future = self._turnstile_future, None
+        if future and not future.done():
+            future.cancel()
+            logger.info("页面上没有Turnstile验证码，已取消预取")
+
+    def _turnstile_markers_present(self) -> bool:
+        """
+        检查当前页面是否出现Turnstile验证码的特征元素（只检查一次，不等待）
+
+        Returns:
+            是否出现Turnstile验证码
+        """
+        try:
+            return any(item['present'] for item in self.browser.probe(TURNSTILE_LOCATORS).values())
+        except Exception as e:
+            logger.debug(f"检查Turnstile验证码特征时出错: {e}")
+            return False
+
+    def _take_turnstile_token(self, site_key: str, url: str) -> Optional[str]:
+        """
+        获取Turnstile令牌，优先使用预取结果
+
+        Args:
+            site_key: Turnstile site key
+            url: 页面URL
+
+        Returns:
+            验证码令牌或None
+        """
+        future, self._turnstile_future = self._turnstile_future, None
+        if future and time.time() - self._turnstile_started < TURNSTILE_TOKEN_TTL:
+            timeout = self.capsolver_config.get('timeout', 60)
+            with span('captcha_solve', source='prefetch') as attributes:
+                try:
+                    token = future.result(timeout=timeout)
+                    if token:
+                        attributes['solve_seconds'] = round(time.time() - self._turnstile_started, 3)
+                        logger.info(f"使用预取的Turnstile令牌（耗时 {attributes['solve_seconds']:.1f} 秒）")
+                        return token
+                    attributes['status'] = 'failed'
+                except Exception as e:
+                    attributes['status'] = 'error'
+                    logger.warning(f"预取Turnstile验证码失败: {e}")
+
+        with span('captcha_solve', source='inline') as attributes:
+            token = self.browser.solve_turnstile(site_key, url)
+            if not token:
+                attributes['status'] = 'failed'
+            return token
+
+    def check_session(self) -> bool:
+        """
+        检查浏览器当前是否仍处于登录状态，用于复用常驻浏览器时跳过登录
+
+        Returns:
+            是否已登录
+        """
+        try:
+            self.browser.navigate_to(self.website_config.get('url', ''))
+            return self._verify_login_status()
+        except Exception as e:
+            logger.warning(f"检查登录状态时出错: {e}")
+            return False
+
+    def _has_saved_cookies(self) -> bool:
+        """
+        判断是否保存了Cookie，使用数据库时会自动导入已有的JSON Cookie文件
+
+        Returns:
+            是否存在Cookie
+        """
+        if not self.cookie_store:
+            return os.path.exists(self.cookie_path)
+
+        if self.cookie_store.has(self.account):
+            return True
+        return os.path.exists(self.cookie_path) and self.cookie_store.import_json(self.account, self.cookie_path)
+
+    def _discard_saved_cookies(self) -> None:
+        """删除已失效的Cookie"""
+        if self.cookie_store:
+            self.cookie_store.delete(self.account)
+            logger.info(f"已删除过期的Cookie (账号: {self.account})")
+        if os.path.exists(self.cookie_path):
+            os.remove(self.cookie_path)
+            logger.info(f"已删除过期的Cookie文件: {self.cookie_path}")
+
     def _cookie_login(self) -> bool:
         """
         使用Cookie登录
@@ -77,24 +259,22 @@ class LoginHandler:
         Returns:
             登录是否成功
         """
-        # 检查Cookie文件是否存在
-        if not os.path.exists(self.cookie_path):
-            logger.warning(f"Cookie文件不存在: {self.cookie_path}")
+        # 检查是否保存了Cookie
+        if not self._has_saved_cookies():
+            logger.warning(f"Cookie不存在: {self.cookie_path}")
             return False
 
         try:
             # 先打开首页
             self.browser.navigate_to(self.website_config.get('url', ''))
-            time.sleep(2)  # 等待页面加载
 
             # 加载Cookie
-            if not self.browser.load_cookies(self.cookie_path):
+            if not self.browser.load_cookies(self.cookie_path, account=self.account):
                 logger.error("加载Cookie失败")
                 return False
 
             # 刷新页面使Cookie生效
             self.browser.navigate_to(self.website_config.get('url', ''))
-            time.sleep(2)  # 等待页面加载
 
             # 验证登录状态
             if self._verify_login_status():
@@ -102,10 +282,8 @@ class LoginHandler:
                 return True
             else:
                 logger.warning("Cookie登录失败，可能已过期")
-                # 删除过期的Cookie文件
-                if os.path.exists(self.cookie_path):
-                    os.remove(self.cookie_path)
-                    logger.info(f"已删除过期的Cookie文件: {self.cookie_path}")
+                # 删除过期的Cookie
+                self._discard_saved_cookies()
                 return False
 
         except Exception as e:
@@ -122,7 +300,10 @@ class LoginHandler:
         try:
             # 打开登录页面
             self.browser.navigate_to(self.website_config.get('login_url', ''))
-            time.sleep(2)  # 等待页面加载
+
+            # 登录页面出现Turnstile验证码时开始求解，与填写表单并行
+            if self._turnstile_markers_present():
+                self.prefetch_turnstile()
 
             # 填写用户名
             username = self.user_config.get('username', '')
@@ -149,13 +330,14 @@ class LoginHandler:
                 logger.error("点击登录按钮失败")
                 return False
 
-            time.sleep(3)
+            # 等待提交后触发的请求（如Turnstile组件加载）结束
+            self.browser.wait_for_network_idle()
 
             # 检查是否需要处理Cloudflare Turnstile验证码
             result, token = self._handle_turnstile_captcha()
             if result:
-                # 如果验证码处理成功，可能需要等待一段时间
-                time.sleep(3)
+                # 等待注入验证码后触发的请求结束
+                self.browser.wait_for_network_idle()
 
             script = f"""
             fetch('/api/account/signIn', {{
@@ -178,8 +360,16 @@ class LoginHandler:
                     }}
                 }});
             """
-            self.browser.driver.execute_script(script)
-            logger.info(f"已模拟Turnstile回调并发送登录请求，token: {token}")
+            with span('login_api') as attributes:
+                mark = self.browser.cdp_mark()
+                self.browser.execute_script(script)
+                logger.info(f"已模拟Turnstile回调并发送登录请求，token: {token}")
+
+                # 等待登录接口返回，成功时页面会跳转到首页
+                response = self.browser.wait_for_response('/api/account/signIn', since=mark)
+                if response is None:
+                    attributes['status'] = 'timeout'
+                self.browser.wait_for_network_idle()
 
             # 验证登录状态
             if self._verify_login_status():
@@ -187,8 +377,8 @@ class LoginHandler:
 
                 # 如果设置了保存Cookie，则保存
                 if self.save_cookie:
-                    if self.browser.save_cookies(self.cookie_path):
-                        logger.info(f"已保存Cookie到: {self.cookie_path}")
+                    if self.browser.save_cookies(self.cookie_path, account=self.account):
+                        logger.info("已保存登录Cookie")
                     else:
                         logger.warning("保存Cookie失败")
 
@@ -251,8 +441,9 @@ class LoginHandler:
             return False, None
 
         # 检查页面上是否存在Turnstile验证码
-        if not self.browser.is_element_present({'type': 'name', 'value': 'cf-turnstile-response'}, wait_time=3):
+        if not self.browser.is_element_present({'type': 'name', 'value': 'cf-turnstile-response'}, wait_time=3, settle=True):
             logger.debug("页面上未检测到Turnstile验证码")
+            self._cancel_turnstile_prefetch()
             return False, None
 
         try:
@@ -262,10 +453,10 @@ class LoginHandler:
                 return False, None
 
             # 获取当前URL
-            current_url = self.browser.driver.current_url
+            current_url = self.browser.current_url
 
-            # 解决验证码
-            token = self.browser.solve_turnstile(site_key, current_url)
+            # 解决验证码（优先使用预取结果）
+            token = self._take_turnstile_token(site_key, current_url)
             if not token:
                 logger.error("解决Turnstile验证码失败")
                 return False, None
@@ -0,0 +1,183 @@
+"""
+多账号管理模块，负责账号列表解析、单账号配置生成以及并发数计算
+"""
+
+import os
+from typing import Dict, Any, List, Optional
+
+from utils.browser_factory import uses_shared_browser
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# cgroup内存限制文件（依次为cgroup v2和v1）
+CGROUP_MEMORY_FILES = (
+    '/sys/fs/cgroup/memory.max',
+    '/sys/fs/cgroup/memory/memory.limit_in_bytes',
+)
+# cgroup v1在未限制内存时会返回一个极大的值，超过该值视为未限制
+UNLIMITED_MEMORY_BYTES = 1 << 60
+
+
+def load_accounts(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    获取需要签到的账号列表
+
+    优先使用ACCOUNTS配置，未配置时回退到单账号的USER配置
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        账号列表，每个账号至少包含name、username和password
+    """
+    accounts = config.get('ACCOUNTS') or []
+    if not accounts:
+        user_config = config.get('USER', {})
+        if not user_config.get('username'):
+            return []
+        accounts = [user_config]
+
+    result = []
+    seen = set()
+    for index, account in enumerate(accounts):
+        username = account.get('username', '')
+        if not username:
+            logger.warning(f"第 {index + 1} 个账号未配置用户名，已跳过")
+            continue
+
+        name = account.get('name') or username
+        if name in seen:
+            logger.warning(f"账号名称重复: {name}，已跳过")
+            continue
+        seen.add(name)
+
+        result.append({**account, 'name': name})
+
+    return result
+
+
+def build_account_config(config: Dict[str, Any], account: Dict[str, Any], multi_account: bool) -> Dict[str, Any]:
+    """
+    为单个账号生成独立的配置信息
+
+    Args:
+        config: 全局配置信息
+        account: 账号信息
+        multi_account: 是否处于多账号模式
+
+    Returns:
+        该账号使用的配置信息
+    """
+    account_config = dict(config)
+    account_config['USER'] = {**config.get('USER', {}), **account}
+
+    login_config = dict(config.get('LOGIN', {}))
+    cookie_path = account.get('cookie_path')
+    if not cookie_path and multi_account:
+        # 多账号模式下每个账号使用独立的Cookie文件
+        cookie_dir = login_config.get('cookie_dir', 'cookies')
+        cookie_path = os.path.join(cookie_dir, f"{account['name']}.json")
+    if cookie_path:
+        login_config['cookie_path'] = cookie_path
+    account_config['LOGIN'] = login_config
+
+    return account_config
+
+
+def get_memory_limit_mb(concurrency_config: Dict[str, Any]) -> Optional[int]:
+    """
+    获取可用的内存上限
+
+    优先使用配置中的memory_limit_mb，否则读取容器的cgroup限制
+
+    Args:
+        concurrency_config: 并发配置
+
+    Returns:
+        内存上限（MB），无法确定时返回None
+    """
+    if concurrency_config.get('memory_limit_mb'):
+        return int(concurrency_config['memory_limit_mb'])
+
+    for path in CGROUP_MEMORY_FILES:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+
+        if not value.isdigit() or int(value) >= UNLIMITED_MEMORY_BYTES:
+            return None
+        return int(value) // (1024 * 1024)
+
+    return None
+
+
+def resolve_worker_count(config: Dict[str, Any], account_count: int) -> int:
+    """
+    计算签到工作线程数量
+
+    每个工作线程持有一个独立的浏览器（共享浏览器进程时为其中的一个浏览器上下文），
+    因此线程数受内存上限约束
+
+    Args:
+        config: 配置信息
+        account_count: 账号数量
+
+    Returns:
+        工作线程数量
+    """
+    concurrency_config = config.get('CONCURRENCY', {})
+    max_workers = max(1, int(concurrency_config.get('max_workers', 1)))
+    workers = min(max_workers, max(1, account_count))
+
+    memory_limit = get_memory_limit_mb(concurrency_config)
+    if memory_limit:
+        per_browser = concurrency_config.get('memory_per_browser_mb', 500)
+        reserve = concurrency_config.get('memory_reserve_mb', 300)
+        if uses_shared_browser(config):
+            # 共享的浏览器进程只计算一次，之后每个账号只增加一个浏览器上下文
+            reserve += per_browser
+            per_browser = concurrency_config.get('memory_per_context_mb', 80)
+        memory_workers = max(1, (memory_limit - reserve) // per_browser)
+        if memory_workers < workers:
+            unit = '浏览器上下文' if uses_shared_browser(config) else '浏览器'
+            logger.info(f"内存上限 {memory_limit}MB 最多支持 {memory_workers} 个{unit}，并发数由 {workers} 调整为 {memory_workers}")
+            workers = memory_workers
+
+    return workers
+
+
+def format_results_table(results: List[Dict[str, Any]]) -> str:
+    """
+    将各账号的签到结果格式化为文本表格
+
+    Args:
+        results: 签到结果列表
+
+    Returns:
+        文本表格
+    """
+    headers = ('账号', '结果', '耗时(秒)', '说明')
+    rows = [
+        (
+            result['account'],
+            '成功' if result['success'] else '失败',
+            f"{result.get('duration', 0):.1f}",
+            result.get('message', ''),
+        )
+        for result in results
+    ]
+
+    widths = [len(header) for header in headers]
+    for row in rows:
+        for i, cell in enumerate(row[:-1]):
+            widths[i] = max(widths[i], len(cell))
+
+    lines = [' | '.join(header.ljust(widths[i]) for i, header in enumerate(headers))]
+    lines.append('-+-'.join('-' * width for width in widths))
+    for row in rows:
+        lines.append(' | '.join(cell.ljust(widths[i]) for i, cell in enumerate(row)))
+
+    return '\n'.join(lines)
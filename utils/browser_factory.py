@@ -0,0 +1,77 @@
+"""
+浏览器后端选择模块
+根据 BROWSER['type'] 和 BROWSER['shared_chrome'] 创建对应的浏览器管理器，各后端提供相同的接口，
+后端模块在创建时才导入
+"""
+
+import sys
+from typing import TYPE_CHECKING, Dict, Any, Union
+
+if TYPE_CHECKING:
+    from utils.playwright_browser import PlaywrightBrowserManager
+    from utils.selenium_browser import SeleniumBrowserManager
+
+    BrowserManager = Union[SeleniumBrowserManager, PlaywrightBrowserManager]
+
+# 使用Playwright后端的浏览器类型
+PLAYWRIGHT_TYPES = ('playwright',)
+
+
+def is_playwright(config: Dict[str, Any]) -> bool:
+    """
+    判断配置是否使用Playwright后端
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        是否使用Playwright
+    """
+    return config.get('BROWSER', {}).get('type', 'chrome').lower() in PLAYWRIGHT_TYPES
+
+
+def uses_shared_browser(config: Dict[str, Any]) -> bool:
+    """
+    判断所有账号是否共享一个浏览器进程（Playwright后端或开启shared_chrome的Chrome后端）
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        是否共享浏览器进程
+    """
+    return is_playwright(config) or bool(config.get('BROWSER', {}).get('shared_chrome', False))
+
+
+def create_browser_manager(config: Dict[str, Any]) -> 'BrowserManager':
+    """
+    创建浏览器管理器
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        type为playwright时返回PlaywrightBrowserManager（共享Chromium中的一个浏览器上下文），
+        开启shared_chrome时返回ContextBrowserManager（共享Chrome中的一个浏览器上下文），
+        否则返回SeleniumBrowserManager（独立的undetected Chrome）
+    """
+    if is_playwright(config):
+        from utils.playwright_browser import PlaywrightBrowserManager
+        return PlaywrightBrowserManager(config)
+
+    if uses_shared_browser(config):
+        from utils.shared_chrome import ContextBrowserManager
+        return ContextBrowserManager(config)
+
+    from utils.selenium_browser import SeleniumBrowserManager
+    return SeleniumBrowserManager(config)
+
+
+def shutdown_shared_browsers() -> None:
+    """关闭已启动的共享浏览器进程，未使用共享浏览器时不导入对应模块"""
+    if 'utils.shared_chrome' in sys.modules:
+        from utils.shared_chrome import shutdown_shared_chrome
+        shutdown_shared_chrome()
+    if 'utils.playwright_browser' in sys.modules:
+        from utils.playwright_browser import get_runtime
+        get_runtime().shutdown()
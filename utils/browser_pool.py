@@ -0,0 +1,156 @@
+"""
+常驻浏览器池模块，在定时任务之间保持浏览器存活，避免每次运行都冷启动并重新登录
+"""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple
+
+from utils.browser_factory import create_browser_manager, shutdown_shared_browsers
+from utils.logger import get_logger
+from utils.metrics import BROWSER_CRASHES
+
+if TYPE_CHECKING:
+    from utils.browser_factory import BrowserManager
+
+logger = get_logger()
+
+
+class WarmBrowserPool:
+    """常驻浏览器池，按账号优先复用已登录的浏览器"""
+
+    def __init__(self, config: Dict[str, Any], max_idle: int = 1):
+        """
+        初始化浏览器池
+
+        Args:
+            config: 配置信息
+            max_idle: 最多保留的空闲浏览器数量
+        """
+        browser_config = config.get('BROWSER', {})
+        self.config = config
+        self.max_idle = max(1, max_idle)
+        # 浏览器使用多少次后重建，0表示不主动重建
+        self.recycle_after = browser_config.get('recycle_after', 10)
+        self._lock = threading.Lock()
+        # 空闲浏览器列表，每项包含manager、account和runs
+        self._idle: List[Dict[str, Any]] = []
+        # 使用中浏览器的运行次数，按id(manager)索引
+        self._runs: Dict[int, int] = {}
+
+    def acquire(self, account: str, account_config: Dict[str, Any]) -> Tuple['BrowserManager', bool]:
+        """
+        获取一个可用的浏览器
+
+        优先返回上次由同一账号使用的浏览器，其次复用其他空闲浏览器（会清除Cookie），
+        都不可用时返回一个新的浏览器管理器，由调用方调用initialize_driver启动，
+        以便在浏览器启动的同时进行验证码预取等准备工作
+
+        Args:
+            account: 账号名称
+            account_config: 该账号使用的配置信息
+
+        Returns:
+            (浏览器管理器, 是否保留了该账号的登录状态)
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                # 依次为：同一账号用过的、预热的、其他账号用过的浏览器
+                slot = min(self._idle, key=lambda slot: (slot['account'] != account, slot['account'] is not None))
+                self._idle.remove(slot)
+
+            # 健康检查和清除会话需要与浏览器通信，在锁外进行，不阻塞其他工作线程
+            manager = slot['manager']
+            if not manager.is_alive():
+                logger.warning("常驻浏览器已失效，重新启动")
+                BROWSER_CRASHES.inc()
+                manager.close()
+                continue
+
+            if slot['account'] not in (account, None):
+                logger.info(f"[{account}] 复用常驻浏览器并清除上一个账号的会话")
+                try:
+                    manager.reset_session()
+                except Exception as e:
+                    logger.warning(f"清除常驻浏览器的会话失败: {e}")
+                    manager.close()
+                    continue
+
+            with self._lock:
+                self._runs[id(manager)] = slot['runs']
+            if slot['account'] == account:
+                logger.info(f"[{account}] 复用常驻浏览器（已运行 {slot['runs']} 次）")
+                return manager, True
+            if slot['account'] is None:
+                logger.info(f"[{account}] 使用预热的浏览器")
+            return manager, False
+
+        manager = create_browser_manager(account_config)
+        with self._lock:
+            self._runs[id(manager)] = 0
+        return manager, False
+
+    def release(self, manager: 'BrowserManager', account: str) -> None:
+        """
+        归还浏览器，达到重建次数、已失效或空闲过多时直接关闭
+
+        Args:
+            manager: 浏览器管理器
+            account: 使用该浏览器的账号名称
+        """
+        with self._lock:
+            runs = self._runs.pop(id(manager), 0) + 1
+            idle_full = len(self._idle) >= self.max_idle
+
+        if self.recycle_after and runs >= self.recycle_after:
+            logger.info(f"常驻浏览器已运行 {runs} 次，关闭后重建")
+        elif idle_full:
+            logger.debug("空闲浏览器数量已达上限，关闭浏览器")
+        elif not manager.is_alive():
+            logger.warning("常驻浏览器已失效，关闭浏览器")
+        else:
+            with self._lock:
+                # 健康检查期间其他线程可能已归还浏览器
+                if len(self._idle) < self.max_idle:
+                    self._idle.append({'manager': manager, 'account': account, 'runs': runs})
+                    return
+            logger.debug("空闲浏览器数量已达上限，关闭浏览器")
+
+        manager.close()
+
+    def prewarm(self, count: int) -> int:
+        """
+        提前启动浏览器，使空闲浏览器数量达到count（不超过max_idle）
+
+        Args:
+            count: 需要的浏览器数量
+
+        Returns:
+            新启动的浏览器数量
+        """
+        with self._lock:
+            missing = min(count, self.max_idle) - len(self._idle)
+        started = 0
+        for _ in range(max(0, missing)):
+            manager = create_browser_manager(self.config)
+            try:
+                manager.initialize_driver()
+            except Exception as e:
+                logger.error(f"预热浏览器失败: {e}")
+                manager.close()
+                break
+            with self._lock:
+                self._idle.append({'manager': manager, 'account': None, 'runs': 0})
+            started += 1
+        if started:
+            logger.info(f"已预热 {started} 个浏览器")
+        return started
+
+    def shutdown(self) -> None:
+        """关闭所有空闲浏览器，以及各浏览器上下文共用的浏览器进程"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            slot['manager'].close()
+        shutdown_shared_browsers()
@@ -0,0 +1,274 @@
+"""
+基于 asyncio/aiohttp 的 Capsolver 客户端
+所有账号共享同一个连接池，轮询结果时使用自适应退避，并以配置的timeout作为硬性截止时间
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Tuple
+
+import aiohttp
+
+from utils.logger import get_logger
+from utils.timing import current_recorder
+
+logger = get_logger()
+
+DEFAULT_API_URL = 'https://api.capsolver.com'
+
+# 轮询间隔：从initial开始，每次乘以factor，最大不超过max
+POLL_INITIAL_DELAY = 0.5
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_DELAY = 5.0
+
+
+class CaptchaSolveError(Exception):
+    """Capsolver返回错误或任务失败"""
+
+
+class AsyncCapsolverClient:
+    """Capsolver异步客户端"""
+
+    def __init__(self, api_key: str, api_url: str = DEFAULT_API_URL, timeout: float = 60,
+                 max_connections: int = 20):
+        """
+        初始化客户端
+
+        Args:
+            api_key: Capsolver API密钥
+            api_url: Capsolver API地址
+            timeout: 单个任务的截止时间（秒）
+            max_connections: 连接池大小
+        """
+        self.api_key = api_key
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，首次调用时在当前事件循环中创建"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=15),
+            )
+        return self._session
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        调用Capsolver接口
+
+        Args:
+            path: 接口路径
+            payload: 请求内容（不含clientKey）
+
+        Returns:
+            接口返回的JSON
+        """
+        session = await self._get_session()
+        async with session.post(f"{self.api_url}{path}", json={'clientKey': self.api_key, **payload}) as response:
+            data = await response.json(content_type=None)
+
+        if data.get('errorId'):
+            raise CaptchaSolveError(f"{data.get('errorCode')}: {data.get('errorDescription')}")
+        return data
+
+    async def create_task(self, task: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        创建识别任务
+
+        Args:
+            task: 任务参数
+
+        Returns:
+            (任务ID, 立即返回的识别结果)
+        """
+        data = await self._post('/createTask', {'task': task})
+        solution = data.get('solution') if data.get('status') == 'ready' else None
+        return data.get('taskId', ''), solution
+
+    async def get_task_result(self, task_id: str) -> Dict[str, Any]:
+        """
+        查询任务结果
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            接口返回的JSON
+        """
+        return await self._post('/getTaskResult', {'taskId': task_id})
+
+    async def _solve(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """创建任务并轮询直到得到结果"""
+        task_id, solution = await self.create_task(task)
+        if solution:
+            return solution
+        logger.debug(f"已创建{task.get('type')}任务 (ID: {task_id})")
+
+        delay = POLL_INITIAL_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            delay = min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
+
+            try:
+                data = await self.get_task_result(task_id)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # 网络抖动时继续轮询，由外层截止时间兜底
+                logger.debug(f"查询任务结果失败，稍后重试: {e}")
+                continue
+
+            status = data.get('status')
+            if status == 'ready':
+                return data.get('solution', {})
+            if status == 'failed':
+                raise CaptchaSolveError(f"任务失败: {data}")
+            logger.debug("等待验证码识别结果...")
+
+    async def solve(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        在截止时间内完成一个识别任务
+
+        Args:
+            task: 任务参数
+
+        Returns:
+            识别结果，失败或超时返回None
+        """
+        start_time = time.monotonic()
+        try:
+            solution = await asyncio.wait_for(self._solve(task), timeout=self.timeout)
+            logger.info(f"成功解决{task.get('type')}（耗时 {time.monotonic() - start_time:.1f} 秒）")
+            return solution
+        except asyncio.TimeoutError:
+            logger.error(f"解决{task.get('type')}超时（{self.timeout} 秒）")
+        except (CaptchaSolveError, aiohttp.ClientError) as e:
+            logger.error(f"解决{task.get('type')}时出错: {e}")
+        return None
+
+    async def solve_turnstile(self, site_key: str, url: str) -> Optional[str]:
+        """
+        解决Cloudflare Turnstile验证码
+
+        Args:
+            site_key: Turnstile site key
+            url: 页面URL
+
+        Returns:
+            验证码令牌或None
+        """
+        solution = await self.solve({
+            'type': 'AntiTurnstileTaskProxyLess',
+            'websiteURL': url,
+            'websiteKey': site_key,
+        })
+        return solution.get('token') if solution else None
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+class CaptchaSolverService:
+    """在后台线程的事件循环中运行AsyncCapsolverClient，供同步代码并发提交任务"""
+
+    def __init__(self, capsolver_config: Dict[str, Any]):
+        """
+        初始化识别服务
+
+        Args:
+            capsolver_config: Capsolver配置
+        """
+        self.client = AsyncCapsolverClient(
+            api_key=capsolver_config.get('api_key', ''),
+            api_url=capsolver_config.get('api_url', DEFAULT_API_URL),
+            timeout=capsolver_config.get('timeout', 60),
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='capsolver', daemon=True)
+        self._thread.start()
+
+    def submit_turnstile(self, site_key: str, url: str) -> Future:
+        """
+        提交Turnstile识别任务
+
+        Args:
+            site_key: Turnstile site key
+            url: 页面URL
+
+        Returns:
+            结果为验证码令牌（或None）的Future
+        """
+        future = asyncio.run_coroutine_threadsafe(self.client.solve_turnstile(site_key, url), self._loop)
+
+        # 任务在后台完成，记录到提交时所在线程的记录器中
+        recorder = current_recorder()
+        if recorder is not None:
+            start = time.perf_counter()
+
+            def record(done: Future) -> None:
+                failed = done.cancelled() or done.exception() is not None or not done.result()
+                recorder.add('captcha_task', time.perf_counter() - start, start=start,
+                             status='failed' if failed else 'ok', type='turnstile')
+
+            future.add_done_callback(record)
+        return future
+
+    def solve_turnstile(self, site_key: str, url: str) -> Optional[str]:
+        """
+        同步解决Turnstile验证码
+
+        Args:
+            site_key: Turnstile site key
+            url: 页面URL
+
+        Returns:
+            验证码令牌或None
+        """
+        return self.submit_turnstile(site_key, url).result()
+
+    def close(self) -> None:
+        """关闭连接池并停止事件循环"""
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"关闭Capsolver连接池时出错: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_services: Dict[Tuple[str, str], CaptchaSolverService] = {}
+_services_lock = threading.Lock()
+
+
+def get_solver_service(capsolver_config: Dict[str, Any]) -> CaptchaSolverService:
+    """
+    获取共享的识别服务，相同的API密钥和地址只创建一个实例
+
+    Args:
+        capsolver_config: Capsolver配置
+
+    Returns:
+        识别服务
+    """
+    key = (capsolver_config.get('api_key', ''), capsolver_config.get('api_url', DEFAULT_API_URL))
+    with _services_lock:
+        if key not in _services:
+            _services[key] = CaptchaSolverService(capsolver_config)
+        return _services[key]
+
+
+@atexit.register
+def shutdown_solver_services() -> None:
+    """关闭所有识别服务"""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.close()
@@ -0,0 +1,224 @@
+"""
+基于 SQLite 的多账号Cookie存储模块
+按账号和域名保存Cookie，并为每个账号记录会话的最早过期时间以便查询即将过期的账号
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cookies (
+    account TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL DEFAULT '/',
+    value TEXT NOT NULL,
+    expiry INTEGER,
+    secure INTEGER NOT NULL DEFAULT 0,
+    http_only INTEGER NOT NULL DEFAULT 0,
+    same_site TEXT,
+    PRIMARY KEY (account, domain, name, path)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    account TEXT PRIMARY KEY,
+    earliest_expiry INTEGER,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions (earliest_expiry);
+"""
+
+
+class CookieStore:
+    """SQLite Cookie存储"""
+
+    def __init__(self, db_path: str, session_cookie_names: Optional[List[str]] = None):
+        """
+        初始化Cookie存储
+
+        Args:
+            db_path: 数据库文件路径
+            session_cookie_names: 决定会话有效期的Cookie名称，为空时使用所有带过期时间的Cookie
+        """
+        self.db_path = db_path
+        self.session_cookie_names = set(session_cookie_names or [])
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接，每次操作使用独立连接以便多线程访问，调用方负责关闭（with conn只提交事务不关闭连接）"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _earliest_expiry(self, cookies: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        计算会话的最早过期时间
+
+        Args:
+            cookies: Selenium格式的Cookie列表
+
+        Returns:
+            最早过期时间（Unix时间戳），都是会话Cookie时返回None
+        """
+        tracked = [cookie for cookie in cookies if cookie.get('name') in self.session_cookie_names]
+        expiries = [int(cookie['expiry']) for cookie in (tracked or cookies) if cookie.get('expiry')]
+        return min(expiries) if expiries else None
+
+    def save(self, account: str, cookies: List[Dict[str, Any]]) -> None:
+        """
+        在一个事务中替换账号的全部Cookie
+
+        Args:
+            account: 账号名称
+            cookies: Selenium格式的Cookie列表
+        """
+        rows = [
+            (
+                account,
+                cookie.get('domain', ''),
+                cookie['name'],
+                cookie.get('path', '/'),
+                cookie['value'],
+                int(cookie['expiry']) if cookie.get('expiry') else None,
+                int(bool(cookie.get('secure'))),
+                int(bool(cookie.get('httpOnly'))),
+                cookie.get('sameSite'),
+            )
+            for cookie in cookies
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM cookies WHERE account = ?', (account,))
+            conn.executemany('INSERT OR REPLACE INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)',
+                         (account, self._earliest_expiry(cookies), int(time.time())))
+
+    def load(self, account: str, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取账号的Cookie
+
+        Args:
+            account: 账号名称
+            domain: 只读取该域名的Cookie，为None时读取全部
+
+        Returns:
+            Selenium格式的Cookie列表
+        """
+        sql = 'SELECT domain, name, path, value, expiry, secure, http_only, same_site FROM cookies WHERE account = ?'
+        params: Tuple = (account,)
+        if domain:
+            sql += ' AND domain = ?'
+            params += (domain,)
+
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        cookies = []
+        for domain, name, path, value, expiry, secure, http_only, same_site in rows:
+            cookie = {'domain': domain, 'name': name, 'path': path, 'value': value,
+                      'secure': bool(secure), 'httpOnly': bool(http_only)}
+            if expiry:
+                cookie['expiry'] = expiry
+            if same_site:
+                cookie['sameSite'] = same_site
+            cookies.append(cookie)
+        return cookies
+
+    def has(self, account: str) -> bool:
+        """
+        判断账号是否保存了Cookie
+
+        Args:
+            account: 账号名称
+
+        Returns:
+            是否存在Cookie
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute('SELECT 1 FROM sessions WHERE account = ?', (account,)).fetchone()
+        return row is not None
+
+    def delete(self, account: str) -> None:
+        """
+        删除账号的全部Cookie
+
+        Args:
+            account: 账号名称
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM cookies WHERE account = ?', (account,))
+            conn.execute('DELETE FROM sessions WHERE account = ?', (account,))
+
+    def import_json(self, account: str, filename: str) -> bool:
+        """
+        导入save_cookies写出的JSON Cookie文件
+
+        Args:
+            account: 账号名称
+            filename: cookies文件路径
+
+        Returns:
+            是否导入成功
+        """
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"导入Cookie文件失败: {e}")
+            return False
+
+        self.save(account, cookies)
+        logger.info(f"已将 {filename} 导入Cookie数据库")
+        return True
+
+    def expiring_within(self, hours: float) -> List[Tuple[str, int]]:
+        """
+        查询会话将在指定时间内过期的账号
+
+        Args:
+            hours: 小时数
+
+        Returns:
+            (账号名称, 过期时间戳)列表，按过期时间升序
+        """
+        deadline = int(time.time() + hours * 3600)
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                'SELECT account, earliest_expiry FROM sessions '
+                'WHERE earliest_expiry IS NOT NULL AND earliest_expiry <= ? ORDER BY earliest_expiry',
+                (deadline,)
+            ).fetchall()
+
+
+_stores: Dict[str, CookieStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_cookie_store(login_config: Dict[str, Any]) -> Optional[CookieStore]:
+    """
+    根据登录配置获取Cookie存储
+
+    Args:
+        login_config: 登录配置
+
+    Returns:
+        配置为sqlite时返回共享的CookieStore，否则返回None（使用JSON文件）
+    """
+    if login_config.get('cookie_store', 'json') != 'sqlite':
+        return None
+
+    db_path = login_config.get('cookie_db', 'records/cookies.db')
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = CookieStore(db_path, login_config.get('session_cookie_names'))
+        return _stores[db_path]
@@ -0,0 +1,219 @@
+"""
+DOM快照模块
+获取一次页面HTML后用lxml在本地计算元素定位配置，适用于只读的状态检查（是否已签到、是否已登录、
+是否出现验证码、是否为Cloudflare验证页面），浏览器页面和HTTP签到的响应共用同一套判断
+"""
+
+import importlib.util
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# lxml可用时在第一次解析页面时才导入，否则调用方回退到原来的检查方式
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+# css定位器需要cssselect转换为XPath
+CSSSELECT_AVAILABLE = importlib.util.find_spec('cssselect') is not None
+
+# Cloudflare验证页面的特征元素
+CHALLENGE_LOCATORS = (
+    {'type': 'xpath', 'value': '//title[contains(., "Just a moment")]'},
+    {'type': 'xpath', 'value': '//*[@id="challenge-form" or @id="challenge-stage" or @id="cf-challenge-running"]'},
+    {'type': 'xpath', 'value': '//script[contains(@src, "challenge-platform")]'},
+    {'type': 'xpath', 'value': '//script[contains(., "_cf_chl_opt")]'},
+    {'type': 'xpath', 'value': '//*[contains(@class, "cf-chl-") or contains(@id, "cf-chl-")]'},
+)
+
+
+def xpath_literal(value: str) -> str:
+    """
+    把字符串转换为XPath字面量，同时包含单双引号时使用concat
+
+    Args:
+        value: 字符串
+
+    Returns:
+        XPath字面量
+    """
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    parts = value.split('"')
+    return 'concat(' + ', \'"\', '.join(f'"{part}"' for part in parts) + ')'
+
+
+def locator_to_xpath(element_config: Dict[str, str]) -> Optional[str]:
+    """
+    把元素定位配置转换为XPath
+
+    Args:
+        element_config: 元素定位配置
+
+    Returns:
+        XPath表达式，css定位器返回None（需要cssselect单独处理）
+    """
+    locator_type = element_config.get('type', '').lower()
+    value = element_config.get('value', '')
+    literal = xpath_literal(value)
+    xpath_map = {
+        'xpath': value,
+        'id': f"//*[@id={literal}]",
+        'name': f"//*[@name={literal}]",
+        'class': f"//*[contains(concat(' ', normalize-space(@class), ' '), {xpath_literal(f' {value} ')})]",
+        'tag': f"//{value}",
+        'link_text': f"//a[normalize-space(.)={literal}]",
+        'partial_link_text': f"//a[contains(., {literal})]",
+    }
+    return xpath_map.get(locator_type)
+
+
+def is_supported(element_config: Dict[str, str]) -> bool:
+    """
+    元素定位配置能否在快照中计算
+
+    Args:
+        element_config: 元素定位配置
+
+    Returns:
+        是否支持，css定位器在未安装cssselect时不支持
+    """
+    return locator_to_xpath(element_config) is not None or CSSSELECT_AVAILABLE
+
+
+@lru_cache(maxsize=256)
+def _compile_xpath(expression: str):
+    from lxml import etree
+    return etree.XPath(expression)
+
+
+@lru_cache(maxsize=64)
+def _compile_css(selector: str):
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(selector)
+
+
+class DomSnapshot:
+    """页面HTML的只读快照，所有定位器在同一次解析结果上计算"""
+
+    def __init__(self, page_source: Optional[str]):
+        """
+        解析页面HTML
+
+        Args:
+            page_source: 页面HTML，为空或lxml不可用时快照不可用
+        """
+        self.tree = None
+        if not page_source or not LXML_AVAILABLE:
+            return
+
+        from lxml import html
+
+        try:
+            self.tree = html.document_fromstring(page_source)
+        except Exception as e:
+            logger.debug(f"解析页面HTML失败: {e}")
+
+    @property
+    def available(self) -> bool:
+        """快照是否可用"""
+        return self.tree is not None
+
+    def find(self, element_config: Dict[str, str]) -> Optional[Any]:
+        """
+        查找第一个匹配的元素
+
+        Args:
+            element_config: 元素定位配置
+
+        Returns:
+            lxml元素，未找到或定位器无效时返回None
+        """
+        if not self.available or not element_config:
+            return None
+
+        try:
+            expression = locator_to_xpath(element_config)
+            if expression is None:
+                matches = _compile_css(element_config.get('value', ''))(self.tree)
+            else:
+                matches = _compile_xpath(expression)(self.tree)
+        except Exception as e:
+            logger.debug(f"无法在快照中计算定位器 {element_config}: {e}")
+            return None
+
+        for match in matches if isinstance(matches, list) else []:
+            # 忽略XPath返回的文本和属性值，只接受元素
+            if hasattr(match, 'tag'):
+                return match
+        return None
+
+    def is_present(self, element_config: Dict[str, str]) -> bool:
+        """元素是否存在"""
+        return self.find(element_config) is not None
+
+    def text(self, element_config: Dict[str, str]) -> Optional[str]:
+        """
+        获取元素文本（合并空白字符）
+
+        Args:
+            element_config: 元素定位配置
+
+        Returns:
+            元素文本，元素不存在时返回None
+        """
+        element = self.find(element_config)
+        if element is None:
+            return None
+        return ' '.join(element.text_content().split())
+
+    def evaluate(self, locators: Dict[str, Optional[Dict[str, str]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        计算多个元素定位配置，返回结构与浏览器的probe一致
+
+        快照中无法得知样式和布局，clickable只表示元素存在且没有disabled属性
+
+        Args:
+            locators: 名称 -> 元素定位配置，值为空的项会被忽略
+
+        Returns:
+            名称 -> {'present': 是否存在, 'text': 文本, 'clickable': 是否可点击}
+        """
+        result = {}
+        for name, locator in locators.items():
+            if not locator:
+                continue
+            element = self.find(locator)
+            if element is None:
+                result[name] = {'present': False, 'text': None, 'clickable': False}
+            else:
+                result[name] = {
+                    'present': True,
+                    'text': ' '.join(element.text_content().split()),
+                    'clickable': element.get('disabled') is None,
+                }
+        return result
+
+    def is_challenge(self) -> bool:
+        """是否为Cloudflare验证页面"""
+        return any(self.is_present(locator) for locator in CHALLENGE_LOCATORS)
+
+
+def read_only_locators(config: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """
+    收集ELEMENTS中用于只读检查的元素定位配置
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        名称（分组.元素）-> 元素定位配置
+    """
+    locators = {}
+    for group, elements in config.get('ELEMENTS', {}).items():
+        for name, locator in elements.items():
+            if isinstance(locator, dict) and locator.get('type'):
+                locators[f"{group}.{name}"] = locator
+    return locators
@@ -0,0 +1,232 @@
+"""
+chromedriver缓存模块
+检测本机Chrome的主版本号，并把undetected_chromedriver修补过的驱动按版本保存在持久化目录中，
+之后的启动直接复用，只有Chrome升级后才重新下载和修补，预热后可以完全离线运行
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 文件锁仅在POSIX系统可用，其他系统只使用线程锁
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 常见的Chrome可执行文件名称
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+')
+
+
+class DriverCache:
+    """按Chrome主版本号缓存修补过的chromedriver"""
+
+    def __init__(self, cache_dir: str = 'drivers', browser_path: Optional[str] = None):
+        """
+        初始化驱动缓存
+
+        Args:
+            cache_dir: 缓存目录，Docker中应挂载为持久化卷
+            browser_path: Chrome可执行文件路径，None表示自动查找
+        """
+        self.cache_dir = cache_dir
+        self.browser_path = browser_path
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+
+    @property
+    def driver_name(self) -> str:
+        return 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+    def find_browser(self) -> Optional[str]:
+        """
+        查找Chrome可执行文件
+
+        Returns:
+            可执行文件路径，未找到时返回None
+        """
+        for candidate in (self.browser_path, os.environ.get('BROWSER_BINARY')):
+            if candidate and os.path.exists(candidate):
+                return candidate
+        for name in CHROME_CANDIDATES:
+            path = shutil.which(name)
+            if path:
+                return path
+
+        try:
+            from undetected_chromedriver import find_chrome_executable
+            return find_chrome_executable()
+        except Exception:
+            return None
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.cache_dir, 'chrome_version.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, 'chrome_version.json')
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.debug(f"保存Chrome版本信息失败: {e}")
+
+    def detect_version(self) -> Optional[int]:
+        """
+        检测Chrome主版本号，结果按可执行文件的修改时间缓存，Chrome未升级时不再启动子进程
+
+        Returns:
+            主版本号，检测失败时返回None
+        """
+        if self._version is not None:
+            return self._version
+
+        browser = self.find_browser()
+        if not browser:
+            logger.warning("未找到Chrome可执行文件，无法检测版本")
+            return None
+
+        mtime = os.path.getmtime(os.path.realpath(browser))
+        meta = self._read_meta()
+        if meta.get('browser') == browser and meta.get('mtime') == mtime and meta.get('version'):
+            self._version = meta['version']
+            return self._version
+
+        try:
+            output = subprocess.run([browser, '--version'], capture_output=True, text=True, timeout=15).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"检测Chrome版本失败: {e}")
+            return None
+
+        match = VERSION_PATTERN.search(output)
+        if not match:
+            logger.warning(f"无法解析Chrome版本: {output.strip()}")
+            return None
+
+        self._version = int(match.group(1))
+        self._write_meta({'browser': browser, 'mtime': mtime, 'version': self._version})
+        logger.info(f"检测到Chrome主版本: {self._version}")
+        return self._version
+
+    def driver_path(self, version: int) -> str:
+        """获取某个主版本的驱动缓存路径"""
+        return os.path.join(self.cache_dir, str(version), self.driver_name)
+
+    @contextmanager
+    def _build_lock(self) -> Iterator[None]:
+        """同时持有线程锁和文件锁，避免多个线程或容器同时修补驱动"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(os.path.join(self.cache_dir, '.lock'), 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_driver(self, version: Optional[int] = None) -> Optional[str]:
+        """
+        获取修补过的驱动，缓存中不存在时下载并修补
+
+        Args:
+            version: Chrome主版本号，None表示自动检测
+
+        Returns:
+            驱动路径，失败时返回None（由undetected_chromedriver自行处理）
+        """
+        version = version or self.detect_version()
+        if not version:
+            return None
+
+        path = self.driver_path(version)
+        if os.path.exists(path):
+            return path
+
+        with self._build_lock():
+            # 等待锁期间可能已由其他线程或进程完成
+            if os.path.exists(path):
+                return path
+            try:
+                self._build(version, path)
+            except Exception as e:
+                logger.error(f"准备chromedriver {version} 失败: {e}")
+                return None
+            self._remove_stale(version)
+        return path
+
+    def _build(self, version: int, path: str) -> None:
+        """
+        下载并修补驱动，然后原子地放入缓存
+
+        Args:
+            version: Chrome主版本号
+            path: 缓存路径
+        """
+        from undetected_chromedriver import Patcher
+
+        logger.info(f"下载并修补chromedriver {version}，之后的启动将直接复用")
+        patcher = Patcher(version_main=version)
+        patcher.auto()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        shutil.copy2(patcher.executable_path, temp_path)
+        os.chmod(temp_path, 0o755)
+        os.replace(temp_path, path)
+        try:
+            os.remove(patcher.executable_path)
+        except OSError:
+            pass
+        logger.info(f"chromedriver已缓存至 {path}")
+
+    def _remove_stale(self, version: int) -> None:
+        """删除其他版本的驱动"""
+        for entry in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, entry)
+            if entry.isdigit() and int(entry) != version and os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+                logger.info(f"已删除旧版本的chromedriver: {entry}")
+
+
+_caches: Dict[str, DriverCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_driver_cache(browser_config: Dict[str, Any]) -> Optional[DriverCache]:
+    """
+    获取共享的驱动缓存
+
+    Args:
+        browser_config: 浏览器配置
+
+    Returns:
+        驱动缓存，未启用时返回None
+    """
+    if not browser_config.get('driver_cache', True):
+        return None
+
+    cache_dir = browser_config.get('driver_cache_dir', 'drivers')
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = DriverCache(cache_dir, browser_config.get('binary_path'))
+        return _caches[cache_dir]
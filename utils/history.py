@@ -0,0 +1,448 @@
+"""
+签到历史记录模块
+每个账号每次签到写入一行到 SQLite（WAL模式），按 (account, date) 建立索引；
+统计命令按账号顺序流式读取，只在内存中保留当前账号的状态和按0.1秒取整的耗时分布
+
+用法:
+    python -m utils.history --since 2026-01-01
+    python -m utils.history --days 30 --phase login
+    python -m utils.history --account alice --account bob --format jsonl
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    run_id TEXT,
+    success INTEGER NOT NULL,
+    message TEXT,
+    chicken_legs INTEGER,
+    already_signed INTEGER NOT NULL DEFAULT 0,
+    duration REAL,
+    timings TEXT,
+    retries INTEGER NOT NULL DEFAULT 0,
+    screenshot TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_account_date ON attempts (account, date);
+"""
+
+# 签到结果中的鸡腿数量，如"今日签到获得鸡腿 5 个"
+CHICKEN_LEGS_PATTERN = re.compile(r'鸡腿\s*(\d+)\s*个')
+
+# 统计耗时分布时的精度（秒）
+LATENCY_RESOLUTION = 0.1
+
+
+def parse_chicken_legs(message: Optional[str]) -> Optional[int]:
+    """
+    从签到结果中解析获得的鸡腿数量
+
+    Args:
+        message: 签到结果消息
+
+    Returns:
+        鸡腿数量，消息中没有数量时返回None
+    """
+    match = CHICKEN_LEGS_PATTERN.search(message or '')
+    return int(match.group(1)) if match else None
+
+
+def failure_reason(message: Optional[str]) -> str:
+    """
+    归并失败原因：去掉冒号后的异常详情，使同类失败计入同一项
+
+    Args:
+        message: 失败消息
+
+    Returns:
+        失败原因
+    """
+    reason = re.split(r'[:：]', message or '', maxsplit=1)[0].strip()
+    return reason[:60] or '未知原因'
+
+
+class SignInHistory:
+    """SQLite签到历史记录"""
+
+    def __init__(self, db_path: str):
+        """
+        初始化历史记录数据库
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            # 旧版本创建的数据库没有already_signed列
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(attempts)')}
+            if 'already_signed' not in columns:
+                conn.execute('ALTER TABLE attempts ADD COLUMN already_signed INTEGER NOT NULL DEFAULT 0')
+
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接，每次操作使用独立连接以便多线程访问，调用方负责关闭（with conn只提交事务不关闭连接）"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def record(self, results: List[Dict[str, Any]], run_id: Optional[str] = None) -> None:
+        """
+        在一个事务中追加一次运行中各账号的签到结果
+
+        Args:
+            results: 各账号的签到结果
+            run_id: 运行ID
+        """
+        rows = []
+        for result in results:
+            # 今日已签到时消息是之前签到的结果，鸡腿已在那次签到中记录
+            counted = result.get('success') and not result.get('already_signed')
+            started_at = result.get('started_at') or time.time() - (result.get('duration') or 0)
+            rows.append((
+                result.get('account') or 'default',
+                datetime.date.fromtimestamp(started_at).isoformat(),
+                started_at,
+                run_id,
+                int(bool(result.get('success'))),
+                result.get('message'),
+                parse_chicken_legs(result.get('message')) if counted else None,
+                int(bool(result.get('already_signed'))),
+                result.get('duration'),
+                json.dumps(result.get('timings') or {}, ensure_ascii=False),
+                result.get('retries', 0),
+                result.get('screenshot') or None,
+            ))
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    'INSERT INTO attempts (account, date, started_at, run_id, success, message, chicken_legs, '
+                    'already_signed, duration, timings, retries, screenshot) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        except sqlite3.Error as e:
+            logger.error(f"保存签到记录失败: {e}")
+            return
+        logger.debug(f"已保存 {len(rows)} 条签到记录")
+
+    def iter_attempts(self, since: Optional[str] = None, until: Optional[str] = None,
+                      accounts: Optional[List[str]] = None, phase: Optional[str] = None) -> Iterator[Tuple]:
+        """
+        按账号、日期和写入顺序逐行读取签到记录，不一次性载入内存
+
+        Args:
+            since: 起始日期（含），格式YYYY-MM-DD
+            until: 结束日期（含），格式YYYY-MM-DD
+            accounts: 只读取这些账号
+            phase: 指定时duration返回该阶段的耗时（如login、sign_in），而不是总耗时
+
+        Returns:
+            (account, date, success, message, chicken_legs, duration)的迭代器
+        """
+        duration = 'duration'
+        params: List[Any] = []
+        if phase:
+            duration = 'json_extract(timings, ?)'
+            params.append(f'$."{phase}"')
+        conditions = []
+        if since:
+            conditions.append('date >= ?')
+            params.append(since)
+        if until:
+            conditions.append('date <= ?')
+            params.append(until)
+        if accounts:
+            conditions.append(f"account IN ({', '.join('?' * len(accounts))})")
+            params.extend(accounts)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        conn = self._connect()
+        try:
+            # 排序与(account, date)索引一致（索引隐含rowid），不需要额外排序
+            cursor = conn.execute(
+                f"SELECT account, date, success, message, chicken_legs, {duration} FROM attempts {where} "
+                f"ORDER BY account, date, id", params)
+            yield from cursor
+        finally:
+            conn.close()
+
+
+class LatencyHistogram:
+    """按LATENCY_RESOLUTION取整的耗时分布，内存占用只与不同耗时的数量有关"""
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.buckets[round(seconds / LATENCY_RESOLUTION)] += 1
+        self.count += 1
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        self.buckets.update(other.buckets)
+        self.count += other.count
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        计算百分位数（最近秩法）
+
+        Args:
+            percent: 百分位（0-100）
+
+        Returns:
+            百分位数（秒），没有数据时返回None
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return round(bucket * LATENCY_RESOLUTION, 1)
+        return None
+
+
+class AccountStats:
+    """单个账号的流式统计"""
+
+    def __init__(self, account: Optional[str]):
+        self.account = account
+        self.attempts = 0
+        self.successes = 0
+        self.chicken_legs = 0
+        self.latency = LatencyHistogram()
+        self.failures: Counter = Counter()
+        # 按天统计的连续签到天数，某天有任意一次成功即视为当天已签到
+        self.signed_days = 0
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.last_signed: Optional[datetime.date] = None
+        self._day: Optional[str] = None
+        self._day_success = False
+        # 每天只计一次鸡腿，兼容旧版本把今日已签到的结果也解析为鸡腿的记录
+        self._day_legs = False
+
+    def add(self, date: str, success: bool, message: Optional[str], chicken_legs: Optional[int],
+            duration: Optional[float]) -> None:
+        """
+        累加一条签到记录，记录需按日期顺序传入
+
+        Args:
+            date: 日期
+            success: 是否成功
+            message: 结果消息
+            chicken_legs: 鸡腿数量
+            duration: 耗时（秒）
+        """
+        if date != self._day:
+            self._close_day()
+            self._day, self._day_success, self._day_legs = date, False, False
+        self.attempts += 1
+        if duration is not None:
+            self.latency.add(duration)
+        if success:
+            self.successes += 1
+            if chicken_legs is not None and not self._day_legs:
+                self.chicken_legs += chicken_legs
+                self._day_legs = True
+            self._day_success = True
+        else:
+            self.failures[failure_reason(message)] += 1
+
+    def merge(self, other: 'AccountStats') -> None:
+        """
+        合并另一个账号的次数、耗时分布和失败原因（不合并连续签到天数）
+
+        Args:
+            other: 账号统计
+        """
+        self.attempts += other.attempts
+        self.successes += other.successes
+        self.chicken_legs += other.chicken_legs
+        self.latency.merge(other.latency)
+        self.failures.update(other.failures)
+
+    def _close_day(self) -> None:
+        """结束一天的统计并更新连续签到天数"""
+        if self._day is None:
+            return
+        day = datetime.date.fromisoformat(self._day)
+        if self._day_success:
+            self.signed_days += 1
+            consecutive = self.last_signed is not None and (day - self.last_signed).days == 1
+            self.current_streak = self.current_streak + 1 if consecutive else 1
+            self.longest_streak = max(self.longest_streak, self.current_streak)
+            self.last_signed = day
+        else:
+            self.current_streak = 0
+        self._day = None
+
+    def finish(self, as_of: Optional[datetime.date] = None) -> Dict[str, Any]:
+        """
+        结束统计
+
+        Args:
+            as_of: 统计截止日期，最后一次签到早于其前一天时当前连续天数归零（当天可能尚未签到）
+
+        Returns:
+            该账号的统计结果
+        """
+        self._close_day()
+        if as_of and (self.last_signed is None or (as_of - self.last_signed).days > 1):
+            self.current_streak = 0
+        return {
+            'account': self.account,
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'success_rate': self.successes / self.attempts if self.attempts else 0,
+            'p50': self.latency.percentile(50),
+            'p95': self.latency.percentile(95),
+            'chicken_legs': self.chicken_legs,
+            'signed_days': self.signed_days,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'last_signed': self.last_signed.isoformat() if self.last_signed else None,
+            'failures': dict(self.failures.most_common()),
+        }
+
+
+def stream_stats(attempts: Iterator[Tuple], as_of: Optional[datetime.date] = None) -> Iterator[Dict[str, Any]]:
+    """
+    按账号依次产出统计结果，最后产出account为None的总体统计
+
+    Args:
+        attempts: iter_attempts返回的迭代器（按账号和日期排序）
+        as_of: 计算当前连续签到天数的截止日期，为None时使用今天
+
+    Returns:
+        统计结果的迭代器
+    """
+    as_of = as_of or datetime.date.today()
+    total = AccountStats(None)
+    accounts = 0
+    current: Optional[AccountStats] = None
+    for account, date, success, message, chicken_legs, duration in attempts:
+        if current is None or account != current.account:
+            if current is not None:
+                accounts += 1
+                total.merge(current)
+                yield current.finish(as_of)
+            current = AccountStats(account)
+        current.add(date, bool(success), message, chicken_legs, duration)
+    if current is not None:
+        accounts += 1
+        total.merge(current)
+        yield current.finish(as_of)
+
+    summary = total.finish()
+    for key in ('signed_days', 'current_streak', 'longest_streak', 'last_signed'):
+        summary.pop(key)
+    summary['accounts'] = accounts
+    yield summary
+
+
+_histories: Dict[str, SignInHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(history_config: Dict[str, Any]) -> Optional[SignInHistory]:
+    """
+    根据配置获取签到历史记录
+
+    Args:
+        history_config: 历史记录配置
+
+    Returns:
+        启用时返回共享的SignInHistory，否则返回None
+    """
+    if not history_config.get('enabled', True):
+        return None
+
+    db_path = history_config.get('path', 'records/history.db')
+    with _histories_lock:
+        if db_path not in _histories:
+            _histories[db_path] = SignInHistory(db_path)
+        return _histories[db_path]
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='签到历史统计')
+    parser.add_argument('--db', help='历史记录数据库路径，默认使用HISTORY配置')
+    parser.add_argument('--since', help='起始日期（含），如 2026-01-01')
+    parser.add_argument('--until', help='结束日期（含）')
+    parser.add_argument('--days', type=int, help='只统计最近N天，忽略--since')
+    parser.add_argument('--account', action='append', help='只统计指定账号，可重复指定')
+    parser.add_argument('--phase', help='按指定阶段（如login、sign_in）的耗时计算百分位，默认使用总耗时')
+    parser.add_argument('--top', type=int, default=5, help='显示的失败原因数量')
+    parser.add_argument('--format', choices=('table', 'jsonl'), default='table',
+                        help='table: 表格; jsonl: 每个账号一行JSON，最后一行为总体统计')
+    return parser.parse_args()
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else '-'
+
+
+def main():
+    args = parse_arguments()
+    db_path = args.db
+    if not db_path:
+        try:
+            import config
+            db_path = getattr(config, 'HISTORY', {}).get('path')
+        except ImportError:
+            pass
+        db_path = db_path or 'records/history.db'
+    if not os.path.exists(db_path):
+        print(f"历史记录数据库不存在: {db_path}")
+        sys.exit(1)
+
+    since = args.since
+    if args.days:
+        since = (datetime.date.today() - datetime.timedelta(days=args.days - 1)).isoformat()
+
+    attempts = SignInHistory(db_path).iter_attempts(since, args.until, args.account, args.phase)
+    as_of = min(datetime.date.fromisoformat(args.until), datetime.date.today()) if args.until else None
+    if args.format == 'table':
+        print(f"{'账号':<20}{'次数':>6}{'成功率':>8}{'p50(s)':>8}{'p95(s)':>8}{'鸡腿':>6}"
+              f"{'当前连续':>8}{'最长连续':>8}  主要失败原因")
+    for stats in stream_stats(attempts, as_of):
+        if args.format == 'jsonl':
+            print(json.dumps(stats, ensure_ascii=False), flush=True)
+            continue
+        failures = ', '.join(f"{reason}({count})" for reason, count in list(stats['failures'].items())[:args.top])
+        if stats['account'] is not None:
+            print(f"{stats['account']:<20}{stats['attempts']:>6}{stats['success_rate']:>8.1%}"
+                  f"{_format_seconds(stats['p50']):>8}{_format_seconds(stats['p95']):>8}{stats['chicken_legs']:>6}"
+                  f"{stats['current_streak']:>8}{stats['longest_streak']:>8}  {failures}", flush=True)
+        else:
+            print(f"\n账号数: {stats['accounts']}  签到次数: {stats['attempts']}  成功率: {stats['success_rate']:.1%}  "
+                  f"p50: {_format_seconds(stats['p50'])} 秒  p95: {_format_seconds(stats['p95'])} 秒  "
+                  f"鸡腿: {stats['chicken_legs']}")
+            for reason, count in list(stats['failures'].items())[:args.top]:
+                print(f"  失败原因: {reason} ({count} 次)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+基于 requests 的免浏览器签到模块
+使用浏览器保存的Cookie直接调用签到接口，仅在认证失败或遇到Cloudflare验证时回退到浏览器流程
+"""
+
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from utils.cookie_store import get_cookie_store
+from utils.dom_snapshot import DomSnapshot
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 浏览器与HTTP请求共用的User-Agent，cf_clearance等Cookie与User-Agent绑定，两者必须一致
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
+
+# 签到接口（"试试手气"对应random=true）
+DEFAULT_SIGNIN_API = '/api/attendance?random=true'
+
+# 签到结果状态
+SIGNIN_SUCCESS = 'success'
+# 今日已签到，本次没有获得鸡腿
+SIGNIN_ALREADY_SIGNED = 'already_signed'
+# 接口以JSON明确返回未登录（401/403且success为false），Cookie已失效
+SIGNIN_AUTH_FAILED = 'auth_failed'
+SIGNIN_CHALLENGE = 'challenge'
+SIGNIN_ERROR = 'error'
+# 响应无法解析或不是预期的格式（包括不是JSON的401/403拦截页面），交给浏览器流程确认
+SIGNIN_UNEXPECTED = 'unexpected'
+
+# 会话预检结果
+SESSION_VALID = 'valid'
+SESSION_EXPIRED = 'expired'
+SESSION_CHALLENGED = 'challenged'
+SESSION_MISSING = 'missing'
+SESSION_UNKNOWN = 'unknown'
+
+# HTTP签到已经得出的会话状态，回退到浏览器签到时无需再次预检
+SIGNIN_SESSION_STATES = {
+    SIGNIN_AUTH_FAILED: SESSION_EXPIRED,
+    SIGNIN_CHALLENGE: SESSION_CHALLENGED,
+}
+
+# 已登录页面中的登出链接
+LOGGED_IN_MARKER = '/api/account/signOut'
+LOGGED_IN_LINK = {'type': 'xpath', 'value': f'//a[@href="{LOGGED_IN_MARKER}"]'}
+
+# 接口返回的"今日已签到"提示
+ALREADY_SIGNED_KEYWORDS = ('已完成签到', '重复')
+# Cloudflare验证页面的特征
+CHALLENGE_MARKERS = ('Just a moment', 'challenge-platform', 'cf-chl-')
+
+
+class HttpSignInClient:
+    """使用requests.Session完成签到的客户端"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化HTTP签到客户端
+
+        Args:
+            config: 配置信息
+        """
+        self.website_config = config.get('WEBSITE', {})
+        self.timeout = config.get('BROWSER', {}).get('timeout', 10)
+        self.base_url = self.website_config.get('url', '')
+        self.signin_api = urljoin(self.base_url, self.website_config.get('signin_api', DEFAULT_SIGNIN_API))
+
+        user_agent = config.get('BROWSER', {}).get('user_agent') or DEFAULT_USER_AGENT
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'application/json, text/plain, */*',
+            'Origin': self.base_url,
+            'Referer': self.website_config.get('signin_url', self.base_url),
+        })
+
+    def load_cookies(self, filename: str) -> bool:
+        """
+        从浏览器保存的Cookie文件加载Cookie
+
+        Args:
+            filename: cookies文件路径
+
+        Returns:
+            是否加载成功
+        """
+        if not os.path.exists(filename):
+            logger.debug(f"Cookies文件不存在: {filename}")
+            return False
+
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+            self.set_cookies(cookies)
+            return bool(cookies)
+        except Exception as e:
+            logger.error(f"加载cookies失败: {e}")
+            return False
+
+    def set_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """
+        将Selenium格式的Cookie写入会话
+
+        Args:
+            cookies: Selenium格式的Cookie列表
+        """
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False),
+            )
+
+    def sign_in(self) -> Tuple[str, str]:
+        """
+        调用签到接口
+
+        Returns:
+            (签到状态, 结果消息)
+        """
+        try:
+            response = self.session.post(self.signin_api, json={}, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error(f"请求签到接口失败: {e}")
+            return SIGNIN_ERROR, f"请求签到接口失败: {e}"
+
+        # 先按状态码和验证页面分类，响应体不一定是JSON
+        if self._is_challenge(response):
+            return SIGNIN_CHALLENGE, "遇到Cloudflare验证"
+        if response.status_code in (401, 403):
+            # 只有接口以JSON明确返回未登录时才认为Cookie已失效，WAF等拦截页面交给浏览器确认
+            data = self._json_body(response)
+            if data is not None and not data.get('success'):
+                return SIGNIN_AUTH_FAILED, str(data.get('message') or '') or "Cookie已失效"
+            logger.warning(f"签到接口返回 {response.status_code}，无法确认Cookie状态")
+            return SIGNIN_UNEXPECTED, f"签到接口返回异常: {response.status_code}"
+
+        data = self._json_body(response)
+        if data is None:
+            logger.warning(f"签到接口返回了非预期的内容: {response.status_code}")
+            return SIGNIN_UNEXPECTED, f"签到接口返回异常: {response.status_code}"
+
+        message = str(data.get('message') or '')
+        if data.get('success'):
+            return SIGNIN_SUCCESS, message or "签到成功"
+        if any(keyword in message for keyword in ALREADY_SIGNED_KEYWORDS):
+            return SIGNIN_ALREADY_SIGNED, message
+
+        return SIGNIN_ERROR, message or f"签到失败: {response.status_code}"
+
+    @staticmethod
+    def _json_body(response: requests.Response) -> Optional[Dict[str, Any]]:
+        """
+        解析JSON对象响应
+
+        Args:
+            response: HTTP响应
+
+        Returns:
+            JSON对象，响应不是JSON对象时返回None
+        """
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def validate_session(self) -> str:
+        """
+        用一次轻量的HTTP请求检查Cookie对应的会话是否有效
+
+        Returns:
+            会话状态：valid、expired、challenged或unknown
+        """
+        check_url = urljoin(self.base_url, self.website_config.get('session_check_url', '/'))
+        try:
+            response = self.session.get(check_url, timeout=self.timeout, headers={'Accept': 'text/html'})
+        except requests.RequestException as e:
+            logger.warning(f"会话预检请求失败: {e}")
+            return SESSION_UNKNOWN
+
+        # 页面只解析一次，验证页面和登录状态都在同一个快照上判断
+        snapshot = self._html_snapshot(response)
+        if self._is_challenge(response, snapshot):
+            return SESSION_CHALLENGED
+        if response.status_code == 401:
+            return SESSION_EXPIRED
+        # 限流、服务器错误或WAF拦截页面上没有登出链接，无法据此判断Cookie失效，交给浏览器确认
+        if not 200 <= response.status_code < 300 or 'text/html' not in response.headers.get('Content-Type', ''):
+            logger.info(f"会话预检无法确认登录状态: {response.status_code}")
+            return SESSION_UNKNOWN
+        logged_in = snapshot.is_present(LOGGED_IN_LINK) if snapshot else LOGGED_IN_MARKER in response.text
+        return SESSION_VALID if logged_in else SESSION_EXPIRED
+
+    @staticmethod
+    def _html_snapshot(response: requests.Response) -> Optional[DomSnapshot]:
+        """
+        把HTML响应解析为DOM快照
+
+        Args:
+            response: HTTP响应
+
+        Returns:
+            DOM快照，响应不是HTML或lxml不可用时返回None
+        """
+        if 'text/html' not in response.headers.get('Content-Type', ''):
+            return None
+        snapshot = DomSnapshot(response.text)
+        return snapshot if snapshot.available else None
+
+    @classmethod
+    def _is_challenge(cls, response: requests.Response, snapshot: Optional[DomSnapshot] = None) -> bool:
+        """
+        判断响应是否为Cloudflare验证页面
+
+        Args:
+            response: HTTP响应
+            snapshot: 已解析的DOM快照，为空时按需解析
+
+        Returns:
+            是否为验证页面
+        """
+        if response.headers.get('cf-mitigated') == 'challenge':
+            return True
+        if response.status_code in (403, 503) and 'text/html' in response.headers.get('Content-Type', ''):
+            snapshot = snapshot or cls._html_snapshot(response)
+            if snapshot:
+                return snapshot.is_challenge()
+            return any(marker in response.text for marker in CHALLENGE_MARKERS)
+        return False
+
+    def close(self) -> None:
+        """关闭会话"""
+        self.session.close()
+
+
+def create_http_client(config: Dict[str, Any]) -> Optional[HttpSignInClient]:
+    """
+    创建已加载账号Cookie的HTTP客户端
+
+    Args:
+        config: 账号配置信息
+
+    Returns:
+        HTTP客户端，没有可用Cookie时返回None
+    """
+    login_config = config.get('LOGIN', {})
+    cookie_store = get_cookie_store(login_config)
+    client = HttpSignInClient(config)
+    cookie_path = login_config.get('cookie_path', 'cookies.json')
+    if cookie_store:
+        user_config = config.get('USER', {})
+        account = user_config.get('name') or user_config.get('username', '')
+        cookies = cookie_store.load(account)
+        # 与LoginHandler一致，数据库中没有时导入已有的JSON Cookie文件
+        if not cookies and os.path.exists(cookie_path) and cookie_store.import_json(account, cookie_path):
+            cookies = cookie_store.load(account)
+        if cookies:
+            client.set_cookies(cookies)
+            return client
+    elif client.load_cookies(cookie_path):
+        return client
+
+    client.close()
+    return None
+
+
+def try_http_sign_in(config: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    尝试使用已保存的Cookie免浏览器签到
+
+    Args:
+        config: 账号配置信息
+
+    Returns:
+        (签到状态, 结果消息)，没有可用Cookie时返回None
+    """
+    client = create_http_client(config)
+    if not client:
+        return None
+    try:
+        logger.info("使用Cookie通过HTTP接口签到")
+        return client.sign_in()
+    finally:
+        client.close()
+
+
+def validate_saved_session(config: Dict[str, Any]) -> str:
+    """
+    在启动浏览器前检查已保存的会话
+
+    Args:
+        config: 账号配置信息
+
+    Returns:
+        会话状态：valid、expired、challenged、missing或unknown
+    """
+    client = create_http_client(config)
+    if not client:
+        return SESSION_MISSING
+    try:
+        return client.validate_session()
+    finally:
+        client.close()
@@ -0,0 +1,396 @@
+"""
+Prometheus指标模块
+使用标准库实现计数器、仪表和直方图，并通过内置HTTP服务以Prometheus文本格式输出
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.timing import SpanRecorder, add_span_listener
+
+logger = get_logger()
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    """生成标签文本，如{account="a",le="1"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """指标基类"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        初始化指标
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名称
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 的标签应为 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        """返回指标的样本行"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """以Prometheus文本格式输出"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """只增不减的计数器"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Gauge(Metric):
+    """可任意设置的仪表，也可以在采集时通过回调计算"""
+
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Optional[Callable[[], Optional[float]]] = None):
+        """
+        初始化仪表
+
+        Args:
+            name: 指标名称
+            documentation: 指标说明
+            labelnames: 标签名称
+            callback: 采集时调用的取值函数，仅用于无标签的仪表，返回None时不输出
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[str]:
+        if self.callback:
+            try:
+                value = self.callback()
+            except Exception as e:
+                logger.debug(f"采集指标 {self.name} 失败: {e}")
+                value = None
+            return [f"{self.name} {_format_value(value)}"] if value is not None else []
+
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """累计分桶的直方图"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # 标签 -> (各分桶计数, 总和)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            for bound, count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """以Prometheus文本格式输出所有指标"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+def read_rss_bytes(pid: int) -> Optional[int]:
+    """
+    从/proc读取进程的常驻内存
+
+    Args:
+        pid: 进程ID
+
+    Returns:
+        常驻内存（字节），无法读取时返回None
+    """
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def child_process_ids(root_pid: int) -> List[int]:
+    """
+    获取进程的所有子孙进程（浏览器和chromedriver）
+
+    Args:
+        root_pid: 根进程ID
+
+    Returns:
+        子孙进程ID列表
+    """
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # 进程名可能包含空格，父进程ID位于最后一个")"之后的第二个字段
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    result, stack = [], [root_pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def browser_rss_bytes() -> Optional[int]:
+    """统计本进程启动的浏览器和驱动进程的常驻内存总和"""
+    if not os.path.isdir('/proc'):
+        return None
+    return sum(read_rss_bytes(pid) or 0 for pid in child_process_ids(os.getpid()))
+
+
+_next_run_at: Optional[float] = None
+
+
+def set_next_run(timestamp: Optional[float]) -> None:
+    """
+    设置下一次定时签到的时间
+
+    Args:
+        timestamp: Unix时间戳，None表示没有计划中的任务
+    """
+    global _next_run_at
+    _next_run_at = timestamp
+
+
+def _seconds_until_next_run() -> Optional[float]:
+    if _next_run_at is None:
+        return None
+    return max(0.0, _next_run_at - time.time())
+
+
+REGISTRY = MetricsRegistry()
+
+SIGNIN_TOTAL = REGISTRY.register(Counter(
+    'nodeseek_signin_total', '签到结果计数', ('account', 'result')))
+SIGNIN_DURATION = REGISTRY.register(Histogram(
+    'nodeseek_signin_duration_seconds', '单个账号签到的总耗时', ('account',)))
+LAST_SUCCESS = REGISTRY.register(Gauge(
+    'nodeseek_last_success_timestamp_seconds', '账号最近一次签到成功的时间', ('account',)))
+PHASE_DURATION = REGISTRY.register(Histogram(
+    'nodeseek_phase_duration_seconds', '各阶段耗时', ('phase', 'status')))
+CAPTCHA_DURATION = REGISTRY.register(Histogram(
+    'nodeseek_captcha_solve_seconds', '验证码识别耗时', ('type',)))
+CAPTCHA_TOTAL = REGISTRY.register(Counter(
+    'nodeseek_captcha_solve_total', '验证码识别次数', ('type', 'status')))
+BROWSER_STARTS = REGISTRY.register(Counter(
+    'nodeseek_browser_starts_total', '浏览器启动次数', ('status',)))
+BROWSER_CRASHES = REGISTRY.register(Counter(
+    'nodeseek_browser_crashes_total', '浏览器意外退出的次数'))
+BROWSER_RSS = REGISTRY.register(Gauge(
+    'nodeseek_browser_rss_bytes', '浏览器和驱动进程的常驻内存总和', callback=browser_rss_bytes))
+PROCESS_RSS = REGISTRY.register(Gauge(
+    'nodeseek_process_rss_bytes', '签到程序自身的常驻内存', callback=lambda: read_rss_bytes(os.getpid())))
+NOTIFY_DURATION = REGISTRY.register(Histogram(
+    'nodeseek_notification_duration_seconds', '通知发送耗时', ('channel', 'status')))
+NETWORK_BYTES = REGISTRY.register(Counter(
+    'nodeseek_network_bytes_total', '浏览器传输的流量和资源拦截预估节省的流量', ('kind',)))
+BLOCKED_REQUESTS = REGISTRY.register(Counter(
+    'nodeseek_blocked_requests_total', '被资源拦截规则拦截的请求数'))
+WAIT_SAVED = REGISTRY.register(Counter(
+    'nodeseek_wait_saved_seconds_total', '页面稳定后提前结束元素等待所节省的时间'))
+LAST_RUN = REGISTRY.register(Gauge(
+    'nodeseek_last_run_timestamp_seconds', '最近一次签到任务结束的时间'))
+NEXT_RUN = REGISTRY.register(Gauge(
+    'nodeseek_next_run_seconds', '距离下一次定时签到的秒数', callback=_seconds_until_next_run))
+
+
+def _observe_span(recorder: SpanRecorder, record: Dict[str, Any]) -> None:
+    """将timing模块记录的span转换为指标"""
+    name, duration, status = record['name'], record['duration'], record['status']
+    attributes = record.get('attributes', {})
+
+    PHASE_DURATION.observe(duration, phase=name, status=status)
+    if attributes.get('saved_seconds'):
+        WAIT_SAVED.inc(attributes['saved_seconds'])
+    if name == 'driver_init':
+        BROWSER_STARTS.inc(status=status)
+    elif name == 'captcha_task':
+        CAPTCHA_DURATION.observe(duration, type=attributes.get('type', 'turnstile'))
+        CAPTCHA_TOTAL.inc(type=attributes.get('type', 'turnstile'), status=status)
+    elif name == 'notify':
+        NOTIFY_DURATION.observe(duration, channel=attributes.get('channel', ''), status=status)
+
+
+add_span_listener(_observe_span)
+
+
+def record_results(results: List[Dict[str, Any]]) -> None:
+    """
+    记录一次签到任务中各账号的结果
+
+    Args:
+        results: 各账号的签到结果
+    """
+    now = time.time()
+    for result in results:
+        account = result.get('account') or 'default'
+        SIGNIN_TOTAL.inc(account=account, result='success' if result.get('success') else 'failure')
+        if result.get('duration') is not None:
+            SIGNIN_DURATION.observe(result['duration'], account=account)
+        if result.get('success'):
+            LAST_SUCCESS.set(now, account=account)
+        network = result.get('network')
+        if network:
+            NETWORK_BYTES.inc(network['transferred_bytes'], kind='transferred')
+            NETWORK_BYTES.inc(network['saved_bytes'], kind='saved')
+            BLOCKED_REQUESTS.inc(network['blocked_requests'])
+    LAST_RUN.set(now)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """输出/metrics的请求处理器"""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """不输出访问日志"""
+
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """在后台线程中运行的指标HTTP服务"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 9464):
+        super().__init__((host, port), _MetricsHandler)
+
+    def start(self) -> None:
+        threading.Thread(target=self.serve_forever, name='metrics', daemon=True).start()
+
+
+def start_metrics_server(metrics_config: Dict[str, Any]) -> Optional[MetricsServer]:
+    """
+    按配置启动指标HTTP服务
+
+    Args:
+        metrics_config: 指标配置
+
+    Returns:
+        指标服务，未启用或启动失败时返回None
+    """
+    if not metrics_config.get('enabled', False):
+        return None
+
+    host = metrics_config.get('host', '0.0.0.0')
+    port = metrics_config.get('port', 9464)
+    try:
+        server = MetricsServer(host, port)
+    except OSError as e:
+        logger.error(f"启动指标服务失败: {e}")
+        return None
+    server.start()
+    logger.info(f"Prometheus指标服务已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -2,18 +2,25 @@
 通知模块，支持Telegram通知和邮件通知
 """
 
+import html
 import os
+import queue
+import threading
+import time
 import requests
 import json
 import traceback
 import smtplib
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List
 
 from utils.logger import get_logger
+from utils.timing import SpanRecorder, current_recorder
 
 logger = get_logger()
 
@@ -65,33 +72,67 @@ class Notifier:
         else:
             logger.debug("邮件通知未启用")
 
-    def send_notification(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None) -> bool:
+        # 后台发送配置
+        self.notify_config = config.get('NOTIFY', {})
+        self.channel_timeout = self.notify_config.get('channel_timeout', 30)
+        self.dispatcher = None
+        if self.notify_config.get('async', True) and self.channels():
+            self.dispatcher = get_dispatcher(self)
+
+    def channels(self) -> Dict[str, Callable[..., bool]]:
+        """
+        获取已启用的通知渠道
+
+        Returns:
+            渠道名称到发送函数的映射，发送函数参数为(title, message, success, screenshot_path, account_results)
+        """
+        channels = {}
+        if self.telegram_enabled:
+            # Telegram通知暂时不能发送图片
+            channels['telegram'] = lambda title, message, success, screenshot_path, account_results=None: \
+                self.send_telegram(title, message, success, None)
+        if self.email_enabled:
+            channels['email'] = self._email_channel
+        return channels
+
+    def send_notification(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None,
+                          account_results: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
-        发送通知
+        发送通知，启用后台发送时只负责入队，立即返回
         
         Args:
             title: 通知标题
             message: 通知内容
             success: 是否成功通知
             screenshot_path: 截图路径(可选)
+            account_results: 多账号运行时各账号的签到结果(可选)，邮件按batch_mode汇总发送
             
         Returns:
-            是否成功发送任一通知
+            是否成功发送（或提交）任一通知
         """
-        results = []
-        
-        # 发送Telegram通知.暂时不能发送图片
-        if self.telegram_enabled:
-            telegram_result = self.send_telegram(title, message, success, None)
-            results.append(telegram_result)
-            
-        # 发送邮件通知
-        if self.email_enabled:
-            email_result = self.send_email(title, message, success, screenshot_path)
-            results.append(email_result)
-            
+        if self.dispatcher:
+            return self.dispatcher.submit(title, message, success, screenshot_path, account_results=account_results)
+
+        recorder = current_recorder()
+        results = [send_with_span(recorder, name, send, title, message, success, screenshot_path, account_results)
+                   for name, send in self.channels().items()]
+
         # 只要有一个通知发送成功，就返回True
         return any(results) if results else False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待后台通知发送完成，超时未发送的通知会保存到发件箱，下次运行时重试
+
+        Args:
+            timeout: 最长等待时间（秒），默认为渠道超时时间的两倍
+
+        Returns:
+            是否全部发送完成
+        """
+        if not self.dispatcher:
+            return True
+        return self.dispatcher.flush(timeout if timeout is not None else self.channel_timeout * 2)
     
     def send_telegram(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None) -> bool:
         """
@@ -166,6 +207,37 @@ class Notifier:
             logger.error(traceback.format_exc())
             return False
     
+    def _email_channel(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None,
+                       account_results: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        邮件渠道，多账号结果根据batch_mode发送汇总邮件或逐个账号发送
+
+        Args:
+            title: 邮件主题
+            message: 邮件内容
+            success: 是否成功通知
+            screenshot_path: 截图路径(可选)
+            account_results: 各账号的签到结果(可选)
+
+        Returns:
+            是否成功发送邮件
+        """
+        batch_mode = self.email_config.get('batch_mode', 'digest')
+        if account_results and batch_mode == 'digest':
+            return self.send_email_digest(title, account_results, success)
+        if account_results and batch_mode == 'batch':
+            messages = [
+                self._build_email(
+                    f"NodeSeek签到{'成功' if result['success'] else '失败'}: {result['account']}",
+                    result.get('message', ''),
+                    result['success'],
+                    result.get('screenshot'),
+                )
+                for result in account_results
+            ]
+            return self._send_messages(messages) == len(messages)
+        return self.send_email(title, message, success, screenshot_path)
+
     def send_email(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None,
                  additional_images: Optional[List[str]] = None) -> bool:
         """
@@ -183,143 +255,569 @@ class Notifier:
         """
         if not self.email_enabled:
             return False
-            
+
+        try:
+            msg = self._build_email(title, message, success, screenshot_path, additional_images)
+            return self._send_messages([msg]) == 1
+        except Exception as e:
+            logger.error(f"发送邮件通知时出错: {e}")
+            logger.error(traceback.format_exc())
+            return False
+
+    def send_email_digest(self, title: str, account_results: List[Dict[str, Any]], success: bool = True) -> bool:
+        """
+        发送多账号汇总邮件，所有账号的结果和截图放在一封邮件的表格中
+
+        Args:
+            title: 邮件主题
+            account_results: 各账号的签到结果
+            success: 是否全部成功
+
+        Returns:
+            是否成功发送邮件
+        """
+        if not self.email_enabled:
+            return False
+
         try:
-            # 创建一个带有附件的邮件对象
             msg = MIMEMultipart('related')
             msg['Subject'] = f"{'✅ ' if success else '❌ '}{title}"
             msg['From'] = self.email_sender
             msg['To'] = self.email_receiver
-            
-            # 创建HTML内容，转换换行符为HTML换行标签
-            html_message = message.replace('\n', '<br>')
-            status_text = "成功" if success else "失败"
-            
-            # 创建HTML内容
+
+            rows = []
+            for index, result in enumerate(account_results):
+                status = '✅ 成功' if result['success'] else '❌ 失败'
+                image_html = ''
+                if self._attach_image(msg, result.get('screenshot'), f"digest{index}"):
+                    image_html = f'<img src="cid:digest{index}" style="max-width:320px; border:1px solid #ddd;">'
+                rows.append(f"""
+                    <tr>
+                        <td>{html.escape(str(result['account']))}</td>
+                        <td>{status}</td>
+                        <td>{result.get('duration', 0):.1f}</td>
+                        <td>{html.escape(result.get('message', ''))}</td>
+                        <td>{image_html}</td>
+                    </tr>
+                """)
+
             html_content = f"""
             <html>
             <head>
                 <style>
                     body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
-                    .container {{ padding: 20px; }}
                     .header {{ font-size: 18px; font-weight: bold; color: {'green' if success else 'red'}; }}
-                    .content {{ margin-top: 20px; }}
-                    .image-container {{ margin-top: 20px; }}
+                    table {{ border-collapse: collapse; margin-top: 20px; }}
+                    th, td {{ border: 1px solid #ddd; padding: 6px 10px; text-align: left; vertical-align: top; }}
                 </style>
             </head>
             <body>
-                <div class="container">
-                    <div class="header">{'✅ ' if success else '❌ '}{title} ({status_text})</div>
-                    <div class="content">
-                        {html_message}
-                    </div>
-            """
-            
-            # 如果有截图，添加到HTML中
-            image_count = 0
-            
-            if screenshot_path and os.path.exists(screenshot_path):
-                try:
-                    # 读取图片文件
-                    with open(screenshot_path, 'rb') as img_file:
-                        img_data = img_file.read()
-                    
-                    # 创建图片附件
-                    image = MIMEImage(img_data)
-                    image_id = f"image{image_count}"
-                    image.add_header('Content-ID', f'<{image_id}>')
-                    msg.attach(image)
-                    
-                    # 在HTML中引用图片
-                    html_content += f"""
-                    <div class="image-container">
-                        <p>签到结果截图:</p>
-                        <img src="cid:{image_id}" style="max-width:800px; border:1px solid #ddd;">
-                    </div>
-                    """
-                    image_count += 1
-                    logger.info(f"已添加截图到邮件: {screenshot_path}")
-                except Exception as img_e:
-                    logger.warning(f"添加截图到邮件时出错: {img_e}")
-            
-            # 添加额外的图片
-            if additional_images:
-                for img_path in additional_images:
-                    if os.path.exists(img_path):
-                        try:
-                            # 读取图片文件
-                            with open(img_path, 'rb') as img_file:
-                                img_data = img_file.read()
-                            
-                            # 创建图片附件
-                            image = MIMEImage(img_data)
-                            image_id = f"image{image_count}"
-                            image.add_header('Content-ID', f'<{image_id}>')
-                            msg.attach(image)
-                            
-                            # 获取文件名
-                            filename = Path(img_path).name
-                            
-                            # 在HTML中引用图片
-                            html_content += f"""
-                            <div class="image-container">
-                                <p>附件图片 - {filename}:</p>
-                                <img src="cid:{image_id}" style="max-width:800px; border:1px solid #ddd;">
-                            </div>
-                            """
-                            image_count += 1
-                            logger.info(f"已添加附加图片到邮件: {img_path}")
-                        except Exception as img_e:
-                            logger.warning(f"添加附加图片到邮件时出错: {img_e}")
-            
-            # 完成HTML内容
-            html_content += """
-                </div>
+                <div class="header">{'✅ ' if success else '❌ '}{html.escape(title)}</div>
+                <table>
+                    <tr><th>账号</th><th>结果</th><th>耗时(秒)</th><th>说明</th><th>截图</th></tr>
+                    {''.join(rows)}
+                </table>
             </body>
             </html>
             """
-            
-            # 添加HTML内容到邮件
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # 连接到SMTP服务器并发送
-            try:
-                # 使用SSL/TLS连接
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-                server.ehlo()
-                server.starttls()  # 启用TLS加密
-                server.ehlo()
-                
-                # 登录
-                server.login(self.email_username, self.email_password)
-                
-                # 发送邮件
-                server.send_message(msg)
-                server.quit()
-                
-                logger.info(f"邮件发送成功: {title}")
-                return True
-                
-            except Exception as smtp_e:
-                logger.error(f"SMTP操作出错: {smtp_e}")
-                logger.error(traceback.format_exc())
-                
-                # 尝试不使用TLS的方式
+            msg.attach(MIMEText(html_content, 'html'))
+
+            return self._send_messages([msg]) == 1
+        except Exception as e:
+            logger.error(f"发送汇总邮件时出错: {e}")
+            logger.error(traceback.format_exc())
+            return False
+
+    @staticmethod
+    def _attach_image(msg: MIMEMultipart, image_path: Optional[str], image_id: str) -> bool:
+        """
+        将图片作为内嵌附件添加到邮件
+
+        Args:
+            msg: 邮件对象
+            image_path: 图片路径
+            image_id: 图片的Content-ID
+
+        Returns:
+            是否添加成功
+        """
+        if not image_path or not os.path.exists(image_path):
+            return False
+        try:
+            # 读取图片文件
+            with open(image_path, 'rb') as img_file:
+                img_data = img_file.read()
+
+            # 创建图片附件
+            image = MIMEImage(img_data)
+            image.add_header('Content-ID', f'<{image_id}>')
+            msg.attach(image)
+            return True
+        except Exception as img_e:
+            logger.warning(f"添加图片到邮件时出错: {img_e}")
+            return False
+
+    def _build_email(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None,
+                     additional_images: Optional[List[str]] = None) -> MIMEMultipart:
+        """
+        构建带有截图和附加图片的HTML邮件
+
+        Args:
+            title: 邮件主题
+            message: 邮件内容
+            success: 是否成功通知
+            screenshot_path: 截图路径(可选)
+            additional_images: 额外的图片路径列表(可选)
+
+        Returns:
+            邮件对象
+        """
+        # 创建一个带有附件的邮件对象
+        msg = MIMEMultipart('related')
+        msg['Subject'] = f"{'✅ ' if success else '❌ '}{title}"
+        msg['From'] = self.email_sender
+        msg['To'] = self.email_receiver
+
+        # 创建HTML内容，转换换行符为HTML换行标签
+        html_message = message.replace('\n', '<br>')
+        status_text = "成功" if success else "失败"
+
+        # 创建HTML内容
+        html_content = f"""
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
+                .container {{ padding: 20px; }}
+                .header {{ font-size: 18px; font-weight: bold; color: {'green' if success else 'red'}; }}
+                .content {{ margin-top: 20px; }}
+                .image-container {{ margin-top: 20px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">{'✅ ' if success else '❌ '}{title} ({status_text})</div>
+                <div class="content">
+                    {html_message}
+                </div>
+        """
+
+        # 如果有截图，添加到HTML中
+        image_count = 0
+
+        if self._attach_image(msg, screenshot_path, f"image{image_count}"):
+            # 在HTML中引用图片
+            html_content += f"""
+                <div class="image-container">
+                    <p>签到结果截图:</p>
+                    <img src="cid:image{image_count}" style="max-width:800px; border:1px solid #ddd;">
+                </div>
+            """
+            image_count += 1
+            logger.info(f"已添加截图到邮件: {screenshot_path}")
+
+        # 添加额外的图片
+        for img_path in additional_images or []:
+            if self._attach_image(msg, img_path, f"image{image_count}"):
+                # 在HTML中引用图片
+                html_content += f"""
+                    <div class="image-container">
+                        <p>附件图片 - {Path(img_path).name}:</p>
+                        <img src="cid:image{image_count}" style="max-width:800px; border:1px solid #ddd;">
+                    </div>
+                """
+                image_count += 1
+                logger.info(f"已添加附加图片到邮件: {img_path}")
+
+        # 完成HTML内容
+        html_content += """
+            </div>
+        </body>
+        </html>
+        """
+
+        # 添加HTML内容到邮件
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """
+        建立已登录的SMTP连接，优先使用STARTTLS，失败时回退到非TLS方式
+
+        Returns:
+            SMTP连接
+        """
+        try:
+            # 使用SSL/TLS连接
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.channel_timeout)
+            server.ehlo()
+            server.starttls()  # 启用TLS加密
+            server.ehlo()
+
+            # 登录
+            server.login(self.email_username, self.email_password)
+            return server
+
+        except Exception as smtp_e:
+            logger.error(f"SMTP操作出错: {smtp_e}")
+
+            # 尝试不使用TLS的方式
+            logger.info("尝试使用非TLS方式连接SMTP服务器...")
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.channel_timeout)
+            server.ehlo()
+            if server.has_extn('auth'):
+                server.login(self.email_sender, self.email_password)
+            return server
+
+    def _send_messages(self, messages: List[MIMEMultipart]) -> int:
+        """
+        在同一个SMTP会话中依次发送多封邮件
+
+        Args:
+            messages: 邮件列表
+
+        Returns:
+            成功发送的邮件数量
+        """
+        if not messages:
+            return 0
+
+        try:
+            server = self._connect_smtp()
+        except Exception as e:
+            logger.error(f"连接SMTP服务器失败: {e}")
+            return 0
+
+        sent = 0
+        try:
+            for msg in messages:
                 try:
-                    logger.info("尝试使用非TLS方式连接SMTP服务器...")
-                    server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-                    server.login(self.email_sender, self.email_password)
                     server.send_message(msg)
-                    server.quit()
-                    
-                    logger.info(f"非TLS方式邮件发送成功: {title}")
-                    return True
-                except Exception as plain_e:
-                    logger.error(f"非TLS方式SMTP操作也出错: {plain_e}")
-                    return False
-                
+                    sent += 1
+                    logger.info(f"邮件发送成功: {msg['Subject']}")
+                except smtplib.SMTPServerDisconnected:
+                    # 连接被服务器断开时重连一次
+                    logger.warning("SMTP连接已断开，重新连接")
+                    server = self._connect_smtp()
+                    server.send_message(msg)
+                    sent += 1
+                    logger.info(f"邮件发送成功: {msg['Subject']}")
         except Exception as e:
-            logger.error(f"发送邮件通知时出错: {e}")
+            logger.error(f"SMTP发送出错: {e}")
             logger.error(traceback.format_exc())
-            return False 
\ No newline at end of file
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+
+        return sent
+
+
+def send_with_span(recorder: Optional[SpanRecorder], name: str, send: Callable[..., bool], *args: Any) -> bool:
+    """
+    发送到单个渠道并记录耗时
+
+    Args:
+        recorder: 记录器，为None时不记录
+        name: 渠道名称
+        send: 渠道的发送函数
+        args: 发送函数的参数
+
+    Returns:
+        是否发送成功
+    """
+    start = time.perf_counter()
+    status = 'error'
+    try:
+        delivered = send(*args)
+        status = 'ok' if delivered else 'failed'
+        return delivered
+    finally:
+        if recorder is not None:
+            recorder.add('notify', time.perf_counter() - start, start=start, status=status, channel=name)
+
+
+class NotificationDispatcher:
+    """后台通知分发器，并发发送到各渠道，发送失败的通知保存到发件箱"""
+
+    def __init__(self, notifier: Notifier, outbox_path: str, channel_timeout: float, max_age_hours: float = 72):
+        """
+        初始化分发器
+
+        Args:
+            notifier: 用于实际发送的通知器
+            outbox_path: 发件箱文件路径
+            channel_timeout: 每个渠道的超时时间（秒）
+            max_age_hours: 发件箱中的通知超过该时间后不再重试
+        """
+        self.notifier = notifier
+        self.outbox_path = outbox_path
+        self.channel_timeout = channel_timeout
+        self.max_age_hours = max_age_hours
+        self._queue: queue.Queue = queue.Queue()
+        self._outbox_lock = threading.Lock()
+        # 正在发送的通知ID -> 未送达的渠道、仍在运行的渠道数以及是否已写入发件箱，由_outbox_lock保护
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # 后台线程正在发送的通知
+        self._current: Optional[Dict[str, Any]] = None
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notify')
+        self._thread = threading.Thread(target=self._run, name='notify-dispatcher', daemon=True)
+        self._thread.start()
+
+        # 重试上次运行未送达的通知
+        self._retry_outbox()
+
+    def submit(self, title: str, message: str, success: bool = True, screenshot_path: Optional[str] = None,
+               channels: Optional[List[str]] = None, account_results: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """
+        提交通知到发送队列
+
+        Args:
+            title: 通知标题
+            message: 通知内容
+            success: 是否成功通知
+            screenshot_path: 截图路径(可选)
+            channels: 需要发送的渠道，默认为所有已启用渠道
+            account_results: 各账号的签到结果(可选)
+
+        Returns:
+            是否已提交
+        """
+        channels = channels or list(self.notifier.channels())
+        if not channels:
+            return False
+
+        self._queue.put({
+            'id': uuid.uuid4().hex,
+            'title': title,
+            'message': message,
+            'success': success,
+            'screenshot_path': screenshot_path,
+            'channels': channels,
+            'account_results': account_results,
+            'created_at': time.time(),
+            # 发送耗时记录到提交时所在线程的记录器中，不写入发件箱
+            'recorder': current_recorder(),
+        })
+        logger.debug(f"通知已加入发送队列: {title}")
+        return True
+
+    def _run(self) -> None:
+        """后台线程：依次取出通知并发送"""
+        while True:
+            item = self._queue.get()
+            try:
+                self._deliver(item)
+            except Exception as e:
+                logger.error(f"发送通知时出错: {e}")
+                self._save_to_outbox(item)
+            finally:
+                self._current = None
+                self._queue.task_done()
+
+    def _deliver(self, item: Dict[str, Any]) -> None:
+        """
+        并发发送到各渠道，超时或失败的渠道保存到发件箱
+
+        超时的渠道仍在后台继续发送，之后送达时再从发件箱中移除，避免下次运行重复发送
+
+        Args:
+            item: 通知内容
+        """
+        channels = self.notifier.channels()
+        recorder = item.get('recorder')
+        item.setdefault('id', uuid.uuid4().hex)
+        names = [name for name in item['channels'] if name in channels]
+        with self._outbox_lock:
+            self._pending[item['id']] = {'undelivered': set(names), 'running': len(names), 'persisted': False}
+            self._current = item
+
+        futures = {}
+        for name in names:
+            future = self._executor.submit(send_with_span, recorder, name, channels[name], item['title'],
+                                           item['message'], item['success'], item['screenshot_path'],
+                                           item.get('account_results'))
+            future.add_done_callback(lambda future, name=name: self._on_channel_done(item, name, future))
+            futures[name] = future
+
+        deadline = time.monotonic() + self.channel_timeout
+        for name, future in futures.items():
+            try:
+                future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                logger.warning(f"{name}通知发送超时（{self.channel_timeout} 秒）: {item['title']}")
+            except Exception as e:
+                logger.error(f"{name}通知发送出错: {e}")
+
+        self._persist(item)
+        if recorder:
+            recorder.write()
+
+    def _on_channel_done(self, item: Dict[str, Any], name: str, future: Any) -> None:
+        """
+        记录单个渠道的发送结果，通知已写入发件箱后才送达时将该渠道从发件箱中移除
+
+        Args:
+            item: 通知内容
+            name: 渠道名称
+            future: 该渠道的发送任务
+        """
+        delivered = not future.cancelled() and future.exception() is None and bool(future.result())
+        with self._outbox_lock:
+            state = self._pending.get(item['id'])
+            if state is None:
+                return
+            state['running'] -= 1
+            if delivered:
+                state['undelivered'].discard(name)
+                if state['persisted']:
+                    self._remove_channel_locked(item['id'], name)
+                    logger.info(f"{name}通知在超时后送达，已从发件箱移除: {item['title']}")
+            if state['persisted'] and not state['running']:
+                del self._pending[item['id']]
+
+    def _persist(self, item: Dict[str, Any]) -> None:
+        """
+        将通知中尚未送达的渠道写入发件箱（同一通知只保留一条）
+
+        Args:
+            item: 通知内容
+        """
+        with self._outbox_lock:
+            state = self._pending.get(item['id'])
+            if state is None:
+                return
+            state['persisted'] = True
+            undelivered = sorted(state['undelivered'])
+            if not state['running']:
+                del self._pending[item['id']]
+            if not undelivered:
+                return
+            self._upsert_locked({**item, 'channels': undelivered})
+        logger.info(f"通知已保存到发件箱，下次运行时重试: {item['title']} ({', '.join(undelivered)})")
+
+    def flush(self, timeout: float) -> bool:
+        """
+        等待队列中的通知发送完成
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否全部发送完成
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        if not self._queue.unfinished_tasks:
+            return True
+
+        # 正在发送的通知保存未送达的渠道，之后送达的渠道会再从发件箱中移除
+        current = self._current
+        if current is not None:
+            self._persist(current)
+
+        # 尚未开始发送的通知保存到发件箱
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._save_to_outbox(item)
+            self._queue.task_done()
+        logger.warning("部分通知未能在退出前发送，已保存到发件箱")
+        return False
+
+    def _load_outbox(self) -> List[Dict[str, Any]]:
+        """读取发件箱"""
+        if not os.path.exists(self.outbox_path):
+            return []
+        try:
+            with open(self.outbox_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取通知发件箱失败: {e}")
+            return []
+
+    def _write_outbox(self, items: List[Dict[str, Any]]) -> None:
+        """写入发件箱"""
+        if os.path.dirname(self.outbox_path):
+            os.makedirs(os.path.dirname(self.outbox_path), exist_ok=True)
+        temp_path = f"{self.outbox_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+        os.replace(temp_path, self.outbox_path)
+
+    def _save_to_outbox(self, item: Dict[str, Any]) -> None:
+        """
+        将未送达的通知保存到发件箱
+
+        Args:
+            item: 通知内容
+        """
+        with self._outbox_lock:
+            self._upsert_locked(item)
+        logger.info(f"通知已保存到发件箱，下次运行时重试: {item['title']} ({', '.join(item['channels'])})")
+
+    def _upsert_locked(self, item: Dict[str, Any]) -> None:
+        """写入发件箱，替换ID相同的通知，调用方需持有_outbox_lock"""
+        items = [saved for saved in self._load_outbox() if not item.get('id') or saved.get('id') != item['id']]
+        items.append({key: value for key, value in item.items() if key != 'recorder'})
+        self._write_outbox(items)
+
+    def _remove_channel_locked(self, item_id: str, name: str) -> None:
+        """从发件箱的通知中移除已送达的渠道，没有剩余渠道时移除整条通知，调用方需持有_outbox_lock"""
+        items = []
+        for saved in self._load_outbox():
+            if saved.get('id') == item_id:
+                saved['channels'] = [channel for channel in saved['channels'] if channel != name]
+                if not saved['channels']:
+                    continue
+            items.append(saved)
+        self._write_outbox(items)
+
+    def _retry_outbox(self) -> None:
+        """将发件箱中未过期的通知重新加入队列"""
+        with self._outbox_lock:
+            items = self._load_outbox()
+            if not items:
+                return
+            self._write_outbox([])
+
+        min_created_at = time.time() - self.max_age_hours * 3600
+        pending = [item for item in items if item.get('created_at', 0) >= min_created_at]
+        if len(pending) < len(items):
+            logger.warning(f"丢弃 {len(items) - len(pending)} 条过期的未送达通知")
+        for item in pending:
+            self._queue.put(item)
+        if pending:
+            logger.info(f"重试 {len(pending)} 条上次未送达的通知")
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(notifier: Notifier) -> NotificationDispatcher:
+    """
+    获取共享的后台通知分发器
+
+    Args:
+        notifier: 首次创建分发器时使用的通知器
+
+    Returns:
+        通知分发器
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            notify_config = notifier.notify_config
+            _dispatcher = NotificationDispatcher(
+                notifier,
+                outbox_path=notify_config.get('outbox_path', 'records/notify_outbox.json'),
+                channel_timeout=notifier.channel_timeout,
+                max_age_hours=notify_config.get('outbox_max_age_hours', 72),
+            )
+        return _dispatcher
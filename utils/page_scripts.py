@@ -0,0 +1,147 @@
+"""
+页面内执行的JavaScript脚本及相关的元素定位配置
+Selenium和Playwright后端共用，写法与Selenium的execute_script相同（通过arguments获取参数，return返回结果）
+"""
+
+from typing import Dict, Any, List
+
+# 已登录页面上的登出链接
+LOGOUT_LINK = {'type': 'xpath', 'value': '//a[@href="/api/account/signOut" and @title="登出"]'}
+
+# 按元素定位配置查找第一个匹配的元素，定位器类型与ELEMENTS配置一致
+RESOLVE_FUNCTION = """
+function resolve(locator) {
+    const value = locator.value;
+    switch ((locator.type || '').toLowerCase()) {
+        case 'xpath':
+            return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case 'id':
+            return document.getElementById(value);
+        case 'name':
+            return document.getElementsByName(value)[0] || null;
+        case 'class':
+            return document.getElementsByClassName(value)[0] || null;
+        case 'tag':
+            return document.getElementsByTagName(value)[0] || null;
+        case 'link_text':
+            return Array.from(document.links).find(link => link.textContent.trim() === value) || null;
+        case 'partial_link_text':
+            return Array.from(document.links).find(link => link.textContent.includes(value)) || null;
+        default:
+            return document.querySelector(value);
+    }
+}
+"""
+
+# 页面稳定状态：首次调用时安装MutationObserver记录最后一次DOM变化的时间
+SETTLE_FUNCTION = """
+function settleState(markers) {
+    let state = window.__nodeseekSettle;
+    if (!state) {
+        state = window.__nodeseekSettle = {last: performance.now()};
+        new MutationObserver(() => { state.last = performance.now(); })
+            .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    return {
+        ready: document.readyState === 'complete',
+        quietMs: performance.now() - state.last,
+        marker: markers.length === 0 || markers.some(marker => {
+            try {
+                return !!resolve(marker);
+            } catch (e) {
+                return false;
+            }
+        }),
+    };
+}
+"""
+
+# 一次解析多个元素定位配置，返回每个元素是否存在、文本和是否可点击
+# arguments[0]: {名称: {'type': 定位器类型, 'value': 定位值}}
+# arguments[1]: 终态标记列表，为null时不返回页面稳定状态
+PROBE_SCRIPT = RESOLVE_FUNCTION + SETTLE_FUNCTION + """
+const locators = arguments[0];
+const markers = arguments[1];
+const result = {};
+
+for (const [name, locator] of Object.entries(locators)) {
+    let element = null;
+    try {
+        element = resolve(locator);
+    } catch (e) {
+        element = null;
+    }
+    if (!element) {
+        result[name] = {present: false, text: null, clickable: false};
+        continue;
+    }
+    const rect = element.getBoundingClientRect();
+    const style = window.getComputedStyle(element);
+    const visible = rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+    result[name] = {
+        present: true,
+        text: (element.innerText || element.textContent || '').trim(),
+        clickable: visible && !element.disabled && style.pointerEvents !== 'none',
+    };
+}
+return {elements: result, settle: markers ? settleState(markers) : null};
+"""
+
+# 在页面中安装MutationObserver，目标元素出现时立即返回，超时返回null（用于execute_async_script）
+# arguments[0]: 元素定位配置; arguments[1]: 超时时间（毫秒）; 最后一个参数为回调
+WAIT_FOR_ELEMENT_SCRIPT = RESOLVE_FUNCTION + """
+const locator = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+
+// 定位配置本身有误时直接抛出异常，由调用方回退到轮询
+const existing = resolve(locator);
+if (existing) {
+    done(existing);
+    return;
+}
+
+let finished = false;
+const finish = element => {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(element);
+};
+const observer = new MutationObserver(() => {
+    const element = resolve(locator);
+    if (element) {
+        finish(element);
+    }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+const timer = setTimeout(() => finish(null), timeoutMs);
+"""
+
+
+def build_settle_markers(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    生成判断页面稳定时使用的终态标记：出现其中任意一个说明页面已渲染出最终状态
+
+    Args:
+        config: 配置信息，BROWSER.settle_markers未配置时使用登录表单、登出链接和签到页的元素
+
+    Returns:
+        元素定位配置列表
+    """
+    markers = config.get('BROWSER', {}).get('settle_markers')
+    if markers is not None:
+        return list(markers)
+
+    elements = config.get('ELEMENTS', {})
+    candidates = [
+        elements.get('login', {}).get('username_input'),
+        LOGOUT_LINK,
+        elements.get('login_check', {}).get('logged_in_element'),
+        elements.get('signin', {}).get('signin_button'),
+        elements.get('signin', {}).get('success_message'),
+    ]
+    return [marker for marker in candidates if marker]
@@ -0,0 +1,933 @@
+"""
+使用 Playwright 实现的浏览器管理模块
+所有账号共享一个Chromium进程，每个账号使用独立的BrowserContext（Cookie、缓存和存储互相隔离），
+Playwright的异步API运行在后台线程的事件循环中，对外提供与SeleniumBrowserManager相同的同步接口，
+因此签到线程可以像使用Selenium一样并发调用
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, ElementHandle, Page, Request, Route
+
+from utils.cookie_store import get_cookie_store
+from utils.dom_snapshot import DomSnapshot, LXML_AVAILABLE, is_supported
+from utils.driver_cache import CHROME_CANDIDATES
+from utils.http_client import DEFAULT_USER_AGENT
+from utils.logger import get_logger
+from utils.page_scripts import LOGOUT_LINK, PROBE_SCRIPT, build_settle_markers
+from utils.resource_blocking import build_blocked_patterns, compile_patterns, estimated_bytes, get_allowlist, is_allowed
+from utils.screenshots import get_screenshot_processor
+from utils.timing import span
+
+logger = get_logger()
+
+# probe等待元素出现时的轮询间隔（秒）
+PROBE_INTERVAL = 0.1
+
+# 每个上下文创建时注入的反检测脚本
+ANTI_DETECTION_SCRIPT = """
+Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+window.chrome = window.chrome || { runtime: {} };
+"""
+
+
+class PlaywrightRuntime:
+    """在后台线程中运行asyncio事件循环，并持有共享的Playwright和Chromium实例"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 在事件循环中首次使用时创建，事件循环重建后随之重建
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._playwright = None
+        self._browser: Optional['Browser'] = None
+        self._atexit_registered = False
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """启动事件循环线程"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='playwright-loop', daemon=True).start()
+                if not self._atexit_registered:
+                    atexit.register(self.shutdown)
+                    self._atexit_registered = True
+            return self._loop
+
+    def run(self, coroutine) -> Any:
+        """
+        在事件循环中运行协程并等待结果，可以从任意线程调用
+
+        Args:
+            coroutine: 协程对象
+
+        Returns:
+            协程的返回值
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop()).result()
+
+    async def get_browser(self, launch_options: Dict[str, Any]) -> 'Browser':
+        """
+        获取共享的Chromium，首次调用或进程已退出时启动
+
+        启动参数以第一个启动浏览器的账号配置为准
+
+        Args:
+            launch_options: chromium.launch的参数
+
+        Returns:
+            浏览器实例
+        """
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            from playwright.async_api import async_playwright
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            logger.info(f"启动共享的Chromium进程 (无头模式: {launch_options.get('headless')})")
+            self._browser = await self._playwright.chromium.launch(**launch_options)
+            return self._browser
+
+    async def _close(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self) -> None:
+        """关闭共享的Chromium并停止事件循环"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout=10)
+        except Exception as e:
+            logger.debug(f"关闭Playwright时出错: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        # 锁和Playwright实例绑定在旧的事件循环上，下次启动时在新的事件循环中重新创建
+        self._launch_lock = None
+        self._playwright = None
+        self._browser = None
+
+
+_runtime = PlaywrightRuntime()
+
+
+def get_runtime() -> PlaywrightRuntime:
+    """获取全局共享的Playwright运行环境"""
+    return _runtime
+
+
+class PlaywrightBrowserManager:
+    """Playwright浏览器管理类，每个实例对应共享Chromium中的一个BrowserContext"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化浏览器管理器
+
+        Args:
+            config: 浏览器配置信息
+        """
+        browser_config = config.get('BROWSER', {})
+        self.timeout = browser_config.get('timeout', 30)
+        self.browser_type = 'playwright'
+        self.headless = browser_config.get('headless', False)
+        self.user_agent = browser_config.get('user_agent') or DEFAULT_USER_AGENT
+        self.binary_path = browser_config.get('binary_path')
+        self._runtime = get_runtime()
+        self.context: Optional['BrowserContext'] = None
+        self.page: Optional['Page'] = None
+        # 与Selenium后端保持一致，启动后指向当前页面，未启动时为None
+        self.driver: Optional['Page'] = None
+
+        # 网络空闲判定，含义与Selenium后端相同
+        self.network_idle_ms = browser_config.get('network_idle_ms', 500)
+        self.long_request_seconds = browser_config.get('long_request_seconds', 5)
+        # 页面事件状态，由事件循环线程中的回调更新
+        self.cdp_events_enabled = False
+        self._cdp_seq = 0
+        self._cdp_events = deque(maxlen=1000)
+        self._inflight_requests: Dict['Request', float] = {}
+        self._last_network_activity = time.monotonic()
+
+        # 页面稳定判定：DOM和网络静默的时长，以及表示页面已渲染出最终状态的元素
+        self.settle_quiet_ms = browser_config.get('settle_quiet_ms', 500)
+        self.settle_markers = build_settle_markers(config)
+        # 只读检查的计算方式：script(页面内脚本) 或 snapshot(获取一次页面HTML后用lxml在本地计算)
+        self.read_mode = browser_config.get('read_mode', 'script')
+
+        # 资源拦截：通过context.route中止匹配的请求
+        self.blocked_patterns = build_blocked_patterns(config)
+        self._blocked_regex = compile_patterns(self.blocked_patterns)
+        self._allowlist = get_allowlist(config)
+        self._estimated_bytes = estimated_bytes(config)
+        self.network_stats = {'requests': 0, 'transferred_bytes': 0, 'blocked_requests': 0, 'saved_bytes': 0}
+
+        # 截图后处理
+        screenshot_config = config.get('SCREENSHOT', {})
+        self.screenshot_processor = get_screenshot_processor(config)
+        self.screenshot_element_only = screenshot_config.get('element_only', True)
+        self.screenshot_padding = screenshot_config.get('padding', 40)
+
+        # Cookie数据库，未配置时使用JSON文件
+        self.cookie_store = get_cookie_store(config.get('LOGIN', {}))
+
+        # Capsolver配置
+        self.capsolver_config = config.get('CAPSOLVER', {})
+        if self.capsolver_config.get('enabled', False):
+            logger.info("Capsolver已启用")
+        else:
+            logger.debug("Capsolver未启用")
+
+    def _run(self, coroutine) -> Any:
+        return self._runtime.run(coroutine)
+
+    def _launch_options(self) -> Dict[str, Any]:
+        """生成共享Chromium的启动参数，优先使用本机安装的Chrome"""
+        executable_path = self.binary_path
+        if not executable_path:
+            executable_path = next(filter(None, map(shutil.which, CHROME_CANDIDATES)), None)
+        return {
+            'headless': self.headless,
+            'executable_path': executable_path,
+            'args': [
+                '--no-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-gpu',
+                '--disable-blink-features=AutomationControlled',
+            ],
+        }
+
+    def initialize_driver(self) -> 'Page':
+        """
+        在共享的Chromium中创建本账号的浏览器上下文
+
+        Returns:
+            页面实例
+        """
+        try:
+            logger.info(f"创建Playwright浏览器上下文 (无头模式: {self.headless})")
+            with span('driver_init', browser=self.browser_type, headless=self.headless):
+                self._run(self._open_context())
+                return self.driver
+        except Exception as e:
+            logger.error(f"初始化Playwright失败: {e}")
+            raise
+
+    async def _open_context(self) -> None:
+        browser = await self._runtime.get_browser(self._launch_options())
+        context = await browser.new_context(
+            user_agent=self.user_agent,
+            viewport={'width': 1920, 'height': 1080},
+            locale='zh-CN',
+        )
+        context.set_default_timeout(self.timeout * 1000)
+        await context.add_init_script(ANTI_DETECTION_SCRIPT)
+        if self._blocked_regex:
+            await context.route(self._is_blocked, self._abort_blocked)
+            logger.debug(f"已启用资源拦截，共 {len(self.blocked_patterns)} 条规则")
+
+        page = await context.new_page()
+        page.on('request', self._on_request)
+        page.on('requestfinished', self._on_request_finished)
+        page.on('requestfailed', self._on_request_done)
+        page.on('response', self._on_response)
+        page.on('load', lambda _: self._record_event('Page.loadEventFired', {}))
+
+        self._cdp_events.clear()
+        self._inflight_requests.clear()
+        self._last_network_activity = time.monotonic()
+        self.context, self.page, self.driver = context, page, page
+        self.cdp_events_enabled = True
+
+    def _is_blocked(self, url: str) -> bool:
+        # 逐个URL检查放行来源，放行优先于所有拦截规则
+        return not is_allowed(url, self._allowlist) and bool(self._blocked_regex.match(url))
+
+    async def _abort_blocked(self, route: 'Route') -> None:
+        """中止被拦截的请求，按资源类型估算节省的流量"""
+        self.network_stats['blocked_requests'] += 1
+        self.network_stats['saved_bytes'] += self._estimated_bytes.get(
+            route.request.resource_type, self._estimated_bytes['other'])
+        await route.abort('blockedbyclient')
+
+    def _record_event(self, method: str, params: Dict[str, Any]) -> None:
+        self._cdp_seq += 1
+        self._cdp_events.append((self._cdp_seq, method, params))
+
+    def _on_request(self, request: 'Request') -> None:
+        if request.url.startswith('data:'):
+            return
+        now = time.monotonic()
+        self._inflight_requests[request] = now
+        self._last_network_activity = now
+        self.network_stats['requests'] += 1
+
+    def _on_request_done(self, request: 'Request') -> None:
+        if self._inflight_requests.pop(request, None) is not None:
+            self._last_network_activity = time.monotonic()
+
+    def _on_request_finished(self, request: 'Request') -> None:
+        self._on_request_done(request)
+        asyncio.ensure_future(self._count_transferred(request))
+
+    async def _count_transferred(self, request: 'Request') -> None:
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.network_stats['transferred_bytes'] += sizes['responseHeadersSize'] + sizes['responseBodySize']
+
+    def _on_response(self, response) -> None:
+        self._record_event('Network.responseReceived', {'response': {'url': response.url, 'status': response.status}})
+
+    def navigate_to(self, url: str) -> None:
+        """
+        导航到指定URL
+
+        Args:
+            url: 目标网页URL
+        """
+        logger.info(f"导航至: {url}")
+        with span('navigate', url=url) as attributes:
+            stats_before = dict(self.network_stats)
+            self._run(self.page.goto(url, wait_until='load', timeout=self.timeout * 1000))
+            attributes['network_idle'] = self.wait_for_network_idle()
+            attributes.update({key: value - stats_before[key] for key, value in self.network_stats.items()})
+
+    def cdp_mark(self) -> int:
+        """
+        记录当前的事件位置，之后的等待只匹配该位置之后发生的事件
+
+        Returns:
+            事件序号
+        """
+        return self._cdp_seq
+
+    def _find_cdp_event(self, method: str, since: int, url_part: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # 事件由事件循环线程追加，先复制再遍历
+        for seq, event_method, params in list(self._cdp_events):
+            if seq <= since or event_method != method:
+                continue
+            if url_part and url_part not in params.get('response', {}).get('url', ''):
+                continue
+            return params
+        return None
+
+    def wait_for_load(self, timeout: Optional[float] = None, since: Optional[int] = None) -> bool:
+        """
+        等待页面load事件
+
+        Args:
+            timeout: 超时时间（秒）
+            since: 只匹配该事件序号之后的load事件，为None时检查当前页面是否已加载完成
+
+        Returns:
+            是否在超时前完成加载
+        """
+        timeout = timeout or self.timeout
+        if since is None:
+            try:
+                self._run(self.page.wait_for_load_state('load', timeout=timeout * 1000))
+                return True
+            except Exception:
+                logger.warning("等待页面加载超时")
+                return False
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._find_cdp_event('Page.loadEventFired', since):
+                return True
+            time.sleep(0.05)
+
+        logger.warning("等待页面加载超时")
+        return False
+
+    def wait_for_network_idle(self, quiet_ms: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        等待网络空闲：没有进行中的请求，并且持续quiet_ms毫秒没有新的网络活动
+
+        Args:
+            quiet_ms: 静默窗口（毫秒）
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否在超时前进入空闲状态
+        """
+        quiet = (quiet_ms if quiet_ms is not None else self.network_idle_ms) / 1000
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            if self._network_quiet(quiet):
+                return True
+            time.sleep(0.05)
+
+        logger.warning(f"等待网络空闲超时，仍有 {len(self._inflight_requests)} 个请求未完成")
+        return False
+
+    def _network_quiet(self, quiet: float) -> bool:
+        """
+        判断当前是否没有进行中的请求，并且持续quiet秒没有新的网络活动
+
+        Args:
+            quiet: 静默窗口（秒）
+
+        Returns:
+            网络是否空闲
+        """
+        now = time.monotonic()
+        active = [start for start in list(self._inflight_requests.values())
+                  if now - start < self.long_request_seconds]
+        return not active and now - self._last_network_activity >= quiet
+
+    def wait_for_response(self, url_part: str, since: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        等待URL包含指定片段的响应
+
+        Args:
+            url_part: URL片段，如 /api/account/signIn
+            since: 只匹配该事件序号之后的响应，通常在触发请求前调用cdp_mark获得
+            timeout: 超时时间（秒）
+
+        Returns:
+            响应信息（包含url和status），超时返回None
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            params = self._find_cdp_event('Network.responseReceived', since, url_part)
+            if params:
+                response = params['response']
+                logger.debug(f"收到响应: {response.get('status')} {response.get('url')}")
+                return response
+            time.sleep(0.05)
+
+        logger.warning(f"等待响应超时: {url_part}")
+        return None
+
+    def _get_selector(self, locator_type: str, locator_value: str) -> str:
+        """
+        把元素定位配置转换为Playwright选择器
+
+        Args:
+            locator_type: 定位器类型
+            locator_value: 定位值
+
+        Returns:
+            Playwright选择器
+        """
+        quoted = json.dumps(locator_value, ensure_ascii=False)
+        selector_map = {
+            'id': f"[id={quoted}]",
+            'name': f"[name={quoted}]",
+            'class': f".{locator_value}",
+            'tag': locator_value,
+            'link_text': f"a:text-is({quoted})",
+            'partial_link_text': f"a:has-text({quoted})",
+            'xpath': f"xpath={locator_value}",
+        }
+        return selector_map.get(locator_type, f"css={locator_value}")
+
+    def find_element(self, element_config: Dict[str, str], wait_time: Optional[int] = None) -> Optional['ElementHandle']:
+        """
+        查找网页元素
+
+        Args:
+            element_config: 元素定位配置
+            wait_time: 等待时间（秒）
+
+        Returns:
+            找到的元素或None
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        if not element_config:
+            logger.error("元素配置为空")
+            return None
+
+        locator_type = element_config.get('type', '').lower()
+        locator_value = element_config.get('value', '')
+
+        if not locator_type or not locator_value:
+            logger.error(f"元素定位信息不完整: {element_config}")
+            return None
+
+        wait_time = wait_time or self.timeout
+
+        with span('find_element', locator=f"{locator_type}={locator_value}", wait_time=wait_time) as attributes:
+            try:
+                return self._run(self.page.wait_for_selector(
+                    self._get_selector(locator_type, locator_value), state='attached', timeout=wait_time * 1000))
+            except PlaywrightTimeoutError:
+                attributes['status'] = 'timeout'
+                logger.warning(f"超时: 未找到元素 {locator_type}='{locator_value}'")
+                return None
+            except Exception as e:
+                attributes['status'] = 'error'
+                logger.error(f"查找元素时出错: {e}")
+                return None
+
+    def click_element(self, element_config: Dict[str, str], retry_count: int = 1, ready: bool = False) -> bool:
+        """
+        点击指定元素，Playwright会等待元素可见、可用且位置稳定后再点击
+
+        Args:
+            element_config: 元素定位配置
+            retry_count: 重试次数
+            ready: 调用方已通过probe确认元素可点击，直接按选择器点击而不先查找元素
+
+        Returns:
+            是否成功点击
+        """
+        if ready:
+            selector = self._get_selector(element_config.get('type', '').lower(), element_config.get('value', ''))
+            try:
+                self._run(self.page.click(selector, timeout=self.timeout * 1000))
+                logger.info(f"成功点击元素: {element_config.get('value')}")
+                return True
+            except Exception as e:
+                logger.debug(f"直接点击失败，查找元素后重试: {e}")
+
+        for attempt in range(retry_count):
+            try:
+                element = self.find_element(element_config)
+                if element:
+                    self._run(element.click(timeout=self.timeout * 1000))
+                    logger.info(f"成功点击元素: {element_config.get('value')}")
+                    return True
+
+            except Exception as e:
+                logger.warning(f"点击失败 (尝试 {attempt + 1}/{retry_count}): {e}")
+
+            if attempt < retry_count - 1:
+                time.sleep(1)
+
+        return False
+
+    def fill_input(self, element_config: Dict[str, str], text: str) -> bool:
+        """
+        填写输入框
+
+        Args:
+            element_config: 元素定位配置
+            text: 要输入的文本
+
+        Returns:
+            是否成功填写
+        """
+        try:
+            element = self.find_element(element_config)
+            if element:
+                # fill会先清空输入框
+                self._run(element.fill(text))
+                logger.info(f"已在 {element_config.get('value')} 输入文本")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"填写输入框时出错: {e}")
+            return False
+
+    def is_element_present(self, element_config: Dict[str, str], wait_time: Optional[int] = None,
+                           settle: bool = False) -> bool:
+        """
+        检查元素是否存在
+
+        Args:
+            element_config: 元素定位配置
+            wait_time: 等待时间（秒）
+            settle: 页面稳定后元素仍不存在时立即返回False，不等待到超时
+
+        Returns:
+            元素是否存在
+        """
+        if settle:
+            return self.probe({'element': element_config}, wait_time or self.timeout, settle=True)['element']['present']
+        return self.find_element(element_config, wait_time) is not None
+
+    def get_element_text(self, element_config: Dict[str, str]) -> Optional[str]:
+        """
+        获取元素文本内容
+
+        Args:
+            element_config: 元素定位配置
+
+        Returns:
+            元素文本或None
+        """
+        element = self.find_element(element_config)
+        if element:
+            return self._run(element.inner_text())
+        return None
+
+    def probe(self, locators: Dict[str, Optional[Dict[str, str]]], wait_time: Optional[float] = None,
+              settle: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        在一次脚本调用中同时检查多个元素，返回每个元素是否存在、文本和是否可点击
+
+        read_mode为snapshot时等待期间找到元素即返回，否则在页面稳定（settle为True时）或到达等待时间后
+        获取一次页面HTML在本地计算所有元素
+
+        Args:
+            locators: 名称 -> 元素定位配置，值为空的项会被忽略
+            wait_time: 所有元素都不存在时最多等待的时间（秒），为空时只检查一次
+            settle: 页面已稳定（加载完成、DOM和网络静默并出现终态标记）时不再等待，
+                    此时元素仍不存在即视为不存在
+
+        Returns:
+            名称 -> {'present': 是否存在, 'text': 文本, 'clickable': 是否可点击}
+        """
+        locators = {name: locator for name, locator in locators.items() if locator}
+        missing = {name: {'present': False, 'text': None, 'clickable': False} for name in locators}
+        deadline = time.monotonic() + (wait_time or 0)
+        markers = self.settle_markers if settle else None
+        use_snapshot = (self.read_mode == 'snapshot' and LXML_AVAILABLE
+                        and all(is_supported(locator) for locator in locators.values()))
+
+        with span('probe', locators=','.join(locators), wait_time=wait_time or 0, snapshot=use_snapshot) as attributes:
+            if use_snapshot:
+                try:
+                    return self._probe_snapshot(locators, missing, deadline, settle, attributes)
+                except Exception as e:
+                    attributes['status'] = 'error'
+                    logger.error(f"检查页面元素时出错: {e}")
+                    return missing
+
+            while True:
+                try:
+                    response = self.execute_script(PROBE_SCRIPT, locators, markers) or {}
+                except Exception as e:
+                    attributes['status'] = 'error'
+                    logger.error(f"检查页面元素时出错: {e}")
+                    return missing
+
+                result = {**missing, **response.get('elements', {})}
+                attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+                remaining = deadline - time.monotonic()
+                if attributes['found'] or remaining <= 0:
+                    return result
+                if settle and self._is_settled(response.get('settle')):
+                    # 页面已稳定，元素不会再出现，剩余的等待时间计入节省的时间
+                    attributes['saved_seconds'] = round(remaining, 3)
+                    logger.debug(f"页面已稳定，未找到 {','.join(locators)}，提前 {remaining:.1f} 秒结束等待")
+                    return result
+                time.sleep(PROBE_INTERVAL)
+
+    def _probe_snapshot(self, locators: Dict[str, Dict[str, str]], missing: Dict[str, Dict[str, Any]],
+                        deadline: float, settle: bool, attributes: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        等待元素出现或页面稳定，元素仍不存在时获取一次页面HTML，在同一个快照上计算所有元素
+
+        等待期间在页面中检查元素，找到后直接返回，不再获取页面HTML
+
+        Args:
+            locators: 名称 -> 元素定位配置
+            missing: 所有元素都不存在时的结果
+            deadline: 等待截止时间（time.monotonic）
+            settle: 页面已稳定时不再等待
+            attributes: probe span的附加信息
+
+        Returns:
+            名称 -> 元素状态
+        """
+        markers = self.settle_markers if settle else None
+        settled = False
+        while time.monotonic() < deadline:
+            response = self.execute_script(PROBE_SCRIPT, locators, markers) or {}
+            result = {**missing, **response.get('elements', {})}
+            attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+            if attributes['found']:
+                return result
+            settled = settle and self._is_settled(response.get('settle'))
+            if settled:
+                break
+            time.sleep(PROBE_INTERVAL)
+
+        snapshot = self.snapshot()
+        if snapshot.available:
+            elements = snapshot.evaluate(locators)
+        else:
+            # 获取页面HTML失败时改为在页面中检查一次
+            elements = (self.execute_script(PROBE_SCRIPT, locators, None) or {}).get('elements', {})
+        result = {**missing, **elements}
+        attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+        remaining = deadline - time.monotonic()
+        if settled and not attributes['found'] and remaining > 0:
+            attributes['saved_seconds'] = round(remaining, 3)
+            logger.debug(f"页面已稳定，未找到 {','.join(locators)}，提前 {remaining:.1f} 秒结束等待")
+        return result
+
+    def snapshot(self) -> DomSnapshot:
+        """
+        获取当前页面的HTML快照，用于在本地计算多个只读检查
+
+        Returns:
+            页面快照，获取页面源码失败或lxml不可用时快照不可用
+        """
+        return DomSnapshot(self.get_page_source() if LXML_AVAILABLE else None)
+
+    def _is_settled(self, state: Optional[Dict[str, Any]]) -> bool:
+        """
+        判断页面是否已稳定
+
+        Args:
+            state: PROBE_SCRIPT返回的页面稳定状态
+
+        Returns:
+            页面已加载完成、出现终态标记，并且DOM和网络都已静默settle_quiet_ms
+        """
+        return bool(state and state.get('ready') and state.get('marker')
+                    and state.get('quietMs', 0) >= self.settle_quiet_ms
+                    and self._network_quiet(self.settle_quiet_ms / 1000))
+
+    def take_screenshot(self, filename: str, element_config: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        截取当前页面的屏幕截图，裁剪、缩放和编码在后台线程完成
+
+        Args:
+            filename: 保存的文件名（扩展名由截图格式决定）
+            element_config: 只截取该元素周围区域时的元素定位配置(可选)
+
+        Returns:
+            截图最终保存的路径，失败时返回None
+        """
+        with span('screenshot', element_only=bool(element_config and self.screenshot_element_only)) as attributes:
+            try:
+                png_data = self._run(self.page.screenshot(type='png'))
+                crop_box = None
+                if element_config and self.screenshot_element_only:
+                    crop_box = self._get_element_crop_box(element_config)
+                return self.screenshot_processor.submit(png_data, filename, crop_box)
+            except Exception as e:
+                attributes['status'] = 'error'
+                logger.error(f"截图失败: {e}")
+                return None
+
+    def _get_element_crop_box(self, element_config: Dict[str, str]) -> Optional[tuple]:
+        """
+        计算元素在截图中的区域
+
+        Args:
+            element_config: 元素定位配置
+
+        Returns:
+            (left, top, right, bottom)，找不到元素时返回None
+        """
+        element = self.find_element(element_config, wait_time=1)
+        if not element:
+            return None
+
+        left, top, right, bottom, ratio = self.execute_script("""
+            const rect = arguments[0].getBoundingClientRect();
+            return [rect.left, rect.top, rect.right, rect.bottom, window.devicePixelRatio || 1];
+        """, element)
+        padding = self.screenshot_padding
+        return (
+            max(0, int((left - padding) * ratio)),
+            max(0, int((top - padding) * ratio)),
+            int((right + padding) * ratio),
+            int((bottom + padding) * ratio),
+        )
+
+    @staticmethod
+    def _to_selenium_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+        """把Playwright格式的Cookie转换为Selenium格式，两个后端共用同一份Cookie文件"""
+        converted = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+                     if key in cookie}
+        if cookie.get('expires', -1) > 0:
+            converted['expiry'] = int(cookie['expires'])
+        return converted
+
+    @staticmethod
+    def _to_playwright_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+        """把Selenium格式的Cookie转换为Playwright格式"""
+        converted = {key: cookie[key] for key in ('name', 'value', 'domain', 'secure', 'httpOnly') if key in cookie}
+        converted['path'] = cookie.get('path', '/')
+        if cookie.get('expiry'):
+            converted['expires'] = int(cookie['expiry'])
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            converted['sameSite'] = cookie['sameSite']
+        return converted
+
+    def save_cookies(self, filename: str, account: Optional[str] = None) -> bool:
+        """
+        保存cookies到文件，配置了Cookie数据库且指定账号时保存到数据库
+
+        Args:
+            filename: 保存的文件名
+            account: 账号名称
+
+        Returns:
+            是否保存成功
+        """
+        try:
+            cookies = [self._to_selenium_cookie(cookie) for cookie in self._run(self.context.cookies())]
+
+            if self.cookie_store and account:
+                self.cookie_store.save(account, cookies)
+                logger.info(f"Cookies已保存至数据库 (账号: {account})")
+                return True
+
+            if os.path.dirname(filename):
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+            temp_filename = f"{filename}.tmp"
+            with open(temp_filename, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f, ensure_ascii=False, indent=2)
+            os.replace(temp_filename, filename)
+
+            logger.info(f"Cookies已保存至 {filename}")
+            return True
+        except Exception as e:
+            logger.error(f"保存cookies失败: {e}")
+            return False
+
+    def load_cookies(self, filename: str, account: Optional[str] = None) -> bool:
+        """
+        从文件加载cookies，配置了Cookie数据库且指定账号时从数据库加载
+
+        Args:
+            filename: cookies文件路径
+            account: 账号名称
+
+        Returns:
+            是否加载成功
+        """
+        try:
+            if self.cookie_store and account:
+                cookies = self.cookie_store.load(account)
+                if not cookies:
+                    logger.error(f"数据库中没有账号 {account} 的Cookies")
+                    return False
+                source = f"数据库 (账号: {account})"
+            else:
+                if not os.path.exists(filename):
+                    logger.error(f"Cookies文件不存在: {filename}")
+                    return False
+
+                with open(filename, 'r', encoding='utf-8') as f:
+                    cookies = json.load(f)
+                source = filename
+
+            self._run(self.context.add_cookies([self._to_playwright_cookie(cookie) for cookie in cookies]))
+            logger.info(f"已从 {source} 加载cookies")
+            return True
+        except Exception as e:
+            logger.error(f"加载cookies失败: {e}")
+            return False
+
+    def verify_login_status(self) -> bool:
+        # 验证登录状态  查找<a href="/api/account/signOut" title="登出">，页面稳定后仍不存在即视为未登录
+        return self.is_element_present(LOGOUT_LINK, wait_time=3, settle=True)
+
+    def is_alive(self) -> bool:
+        """
+        检查浏览器上下文是否仍可正常响应
+
+        Returns:
+            浏览器是否可用
+        """
+        if not self.page or self.page.is_closed():
+            return False
+        try:
+            return self._run(self.page.evaluate('1')) == 1
+        except Exception as e:
+            logger.warning(f"浏览器健康检查失败: {e}")
+            return False
+
+    def reset_session(self) -> None:
+        """清除所有Cookie并回到空白页，供下一个账号复用浏览器上下文"""
+        self._run(self.context.clear_cookies())
+        self._run(self.page.goto('about:blank'))
+
+    def close(self) -> None:
+        """关闭本账号的浏览器上下文，共享的Chromium在进程退出时关闭"""
+        try:
+            if self.context:
+                logger.info("关闭浏览器上下文")
+                self._run(self.context.close())
+        except Exception as e:
+            logger.error(f"关闭浏览器上下文时出错: {e}")
+        finally:
+            self.context = self.page = self.driver = None
+            self.cdp_events_enabled = False
+
+    def execute_script(self, script: str, *args) -> Any:
+        """
+        在页面中执行JavaScript，脚本写法与Selenium的execute_script相同（使用arguments和return）
+
+        Args:
+            script: JavaScript代码
+            *args: 传给脚本的参数，可以包含元素
+
+        Returns:
+            脚本的返回值
+        """
+        wrapped = f"args => (function() {{ {script} \n}}).apply(null, args)"
+        return self._run(self.page.evaluate(wrapped, list(args)))
+
+    @property
+    def current_url(self) -> str:
+        """当前页面的URL"""
+        return self.page.url
+
+    def solve_turnstile(self, site_key: str, url: str) -> Optional[str]:
+        """
+        解决Cloudflare Turnstile验证码
+
+        Args:
+            site_key: Turnstile site key
+            url: 页面URL
+
+        Returns:
+            验证码解决方案或None（如果解决失败）
+        """
+        if not self.capsolver_config.get('enabled', False):
+            logger.warning("Capsolver未启用，无法解决Turnstile")
+            return None
+
+        api_key = self.capsolver_config.get('api_key')
+        if not api_key:
+            logger.error("未配置Capsolver API密钥")
+            return None
+
+        from utils.captcha_solver import get_solver_service
+
+        logger.info(f"正在使用Capsolver解决Turnstile (site_key: {site_key})")
+        return get_solver_service(self.capsolver_config).solve_turnstile(site_key, url)
+
+    def inject_token(self, token: str) -> None:
+        """
+        注入Cloudflare Turnstile验证码解决方案
+
+        Args:
+            token: 验证码解决方案
+        """
+        self.execute_script("document.getElementsByName('cf-turnstile-response')[0].value = arguments[0];", token)
+        logger.info(f"已注入Cloudflare Turnstile验证码解决方案: {token}")
+
+    def get_page_source(self) -> Optional[str]:
+        """
+        获取当前页面的HTML源码
+
+        Returns:
+            HTML源码字符串
+        """
+        try:
+            return self._run(self.page.content())
+        except Exception as e:
+            logger.error(f"获取页面源码时出错: {e}")
+            return None
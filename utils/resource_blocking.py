@@ -0,0 +1,166 @@
+"""
+资源拦截配置模块
+根据配置生成 CDP Network.setBlockedURLs 使用的URL模式，拦截签到流程用不到的图片、字体和第三方统计脚本，
+Cloudflare/Turnstile相关的来源始终放行
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Pattern
+from urllib.parse import urlparse
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 各资源类型对应的文件扩展名
+RESOURCE_EXTENSIONS = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'mp3', 'ogg', 'wav', 'm4a'),
+}
+
+# 默认拦截的第三方统计和广告来源
+DEFAULT_THIRD_PARTY = (
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*hm.baidu.com*',
+    '*clarity.ms*',
+)
+
+# 始终放行的来源，Turnstile验证依赖这些地址（包括Cloudflare在网站自身域名下的/cdn-cgi/资源，如trace图片）
+DEFAULT_ALLOWLIST = ('challenges.cloudflare.com', '/cdn-cgi/', 'turnstile')
+
+# 按扩展名拦截网站自身资源的路径前缀，Network.setBlockedURLs不支持排除规则，
+# 只在这些路径下拦截才不会误拦放行的/cdn-cgi/资源
+DEFAULT_FIRST_PARTY_PATHS = ('/static/', '/avatar/')
+
+# 被拦截请求的预估大小（字节），按CDP的资源类型统计节省的流量
+DEFAULT_ESTIMATED_BYTES = {
+    'image': 40 * 1024,
+    'font': 60 * 1024,
+    'media': 500 * 1024,
+    'script': 30 * 1024,
+    'other': 10 * 1024,
+}
+
+
+def first_party_hosts(website_config: Dict[str, Any]) -> List[str]:
+    """
+    获取网站自身的域名
+
+    Args:
+        website_config: 网站配置
+
+    Returns:
+        域名列表（包含端口）
+    """
+    hosts = []
+    for key in ('url', 'login_url', 'signin_url'):
+        host = urlparse(website_config.get(key, '')).netloc
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
+
+def get_allowlist(config: Dict[str, Any]) -> List[str]:
+    """
+    获取始终放行的来源
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        放行来源列表，URL中包含其中任意一项即放行
+    """
+    return list(config.get('RESOURCE_BLOCKING', {}).get('allowlist', DEFAULT_ALLOWLIST))
+
+
+def is_allowed(url: str, allowlist: List[str]) -> bool:
+    """
+    URL是否属于放行来源
+
+    Args:
+        url: 请求URL
+        allowlist: 放行来源列表
+
+    Returns:
+        是否放行
+    """
+    return any(allowed in url for allowed in allowlist)
+
+
+def build_blocked_patterns(config: Dict[str, Any]) -> List[str]:
+    """
+    生成需要拦截的URL模式
+
+    按扩展名拦截的模式只作用于网站自身域名下的first_party_paths，可能包含放行路径的前缀会被忽略；
+    第三方模式中包含放行来源的会被忽略
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        Network.setBlockedURLs使用的URL模式列表，未启用时为空
+    """
+    blocking_config = config.get('RESOURCE_BLOCKING', {})
+    if not blocking_config.get('enabled', False):
+        return []
+
+    allowlist = get_allowlist(config)
+    # 放行列表中的路径（如/cdn-cgi/），位于其上级的路径前缀下的扩展名模式会误拦这些资源
+    allowed_paths = ['/' + allowed.strip('/') + '/' for allowed in allowlist if allowed.startswith('/')]
+    paths = []
+    for path in blocking_config.get('first_party_paths', DEFAULT_FIRST_PARTY_PATHS):
+        path = '/' + path.strip('/') + '/' if path.strip('/') else '/'
+        if any(allowed.startswith(path) for allowed in allowed_paths):
+            logger.warning(f"拦截路径包含放行路径，已忽略: {path}")
+            continue
+        paths.append(path)
+
+    patterns = []
+    for host in first_party_hosts(config.get('WEBSITE', {})):
+        for path in paths:
+            for resource_type in blocking_config.get('resource_types', ('image', 'font', 'media')):
+                for extension in RESOURCE_EXTENSIONS.get(resource_type, ()):
+                    patterns.append(f"*://{host}{path}*.{extension}")
+                    patterns.append(f"*://{host}{path}*.{extension}?*")
+
+    for pattern in [*blocking_config.get('third_party', DEFAULT_THIRD_PARTY),
+                    *blocking_config.get('extra_patterns', [])]:
+        if is_allowed(pattern, allowlist):
+            logger.warning(f"拦截规则与放行来源冲突，已忽略: {pattern}")
+            continue
+        patterns.append(pattern)
+
+    return patterns
+
+
+def compile_patterns(patterns: List[str]) -> Optional[Pattern]:
+    """
+    把URL模式编译为一个正则表达式，*匹配任意字符，其余字符按原样匹配（与setBlockedURLs一致）
+
+    Args:
+        patterns: URL模式列表
+
+    Returns:
+        正则表达式，模式列表为空时返回None
+    """
+    if not patterns:
+        return None
+    alternatives = ('.*'.join(re.escape(part) for part in pattern.split('*')) for pattern in patterns)
+    return re.compile(f"^(?:{'|'.join(alternatives)})$")
+
+
+def estimated_bytes(config: Dict[str, Any]) -> Dict[str, int]:
+    """
+    获取被拦截请求的预估大小
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        资源类型 -> 预估大小（字节）
+    """
+    return {**DEFAULT_ESTIMATED_BYTES, **config.get('RESOURCE_BLOCKING', {}).get('estimated_bytes', {})}
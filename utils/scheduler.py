@@ -0,0 +1,281 @@
+"""
+定时任务调度模块
+按每天的多个时间点和账号偏移量计算下一次运行时间，空闲时阻塞等待到截止时间，
+支持随机延迟、提前准备回调以及容器重启后补跑错过的任务
+"""
+
+import datetime
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.metrics import set_next_run
+
+logger = get_logger()
+
+# 单次等待的最长时间（秒），用于应对系统时间调整或休眠
+MAX_WAIT_SECONDS = 300
+
+
+def parse_slot(slot: str) -> Tuple[int, int]:
+    """
+    解析HH:MM格式的时间点
+
+    Args:
+        slot: 时间点
+
+    Returns:
+        (小时, 分钟)
+    """
+    hour, minute = (int(part) for part in slot.strip().split(':'))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"时间格式不正确: {slot}")
+    return hour, minute
+
+
+class ScheduledJob:
+    """每天在固定时间点（加上账号偏移量）运行的任务"""
+
+    def __init__(self, slot: str, offset: int = 0, accounts: Optional[List[str]] = None):
+        """
+        初始化任务
+
+        Args:
+            slot: HH:MM格式的时间点
+            offset: 相对时间点的偏移量（秒）
+            accounts: 本任务签到的账号名称，None表示所有账号
+        """
+        self.slot = slot
+        self.hour, self.minute = parse_slot(slot)
+        self.offset = offset
+        self.accounts = accounts
+        self.key = f"{slot}+{offset}"
+
+    def occurrence(self, day: datetime.date) -> float:
+        """
+        获取某一天的计划运行时间（不含随机延迟）
+
+        Args:
+            day: 日期
+
+        Returns:
+            Unix时间戳
+        """
+        moment = datetime.datetime.combine(day, datetime.time(self.hour, self.minute))
+        return moment.timestamp() + self.offset
+
+    def next_after(self, timestamp: float) -> float:
+        """获取晚于timestamp的下一次计划运行时间"""
+        day = datetime.date.fromtimestamp(timestamp - self.offset) - datetime.timedelta(days=1)
+        while self.occurrence(day) <= timestamp:
+            day += datetime.timedelta(days=1)
+        return self.occurrence(day)
+
+    def last_before(self, timestamp: float) -> float:
+        """获取不晚于timestamp的上一次计划运行时间"""
+        day = datetime.date.fromtimestamp(timestamp - self.offset) + datetime.timedelta(days=1)
+        while self.occurrence(day) > timestamp:
+            day -= datetime.timedelta(days=1)
+        return self.occurrence(day)
+
+
+def build_jobs(schedule_config: Dict[str, Any], accounts: List[Dict[str, Any]]) -> List[ScheduledJob]:
+    """
+    根据配置生成任务，偏移量相同的账号合并为一个任务
+
+    Args:
+        schedule_config: 定时任务配置
+        accounts: 账号列表
+
+    Returns:
+        任务列表
+    """
+    slots = schedule_config.get('times') or [schedule_config.get('time', '08:00')]
+
+    groups: Dict[int, List[str]] = {}
+    for account in accounts:
+        groups.setdefault(int(account.get('offset_seconds', 0)), []).append(account['name'])
+    # 所有账号偏移量相同时，不限定账号，保持与单账号运行一致
+    if len(groups) <= 1:
+        groups = {next(iter(groups), 0): None}
+
+    return [ScheduledJob(slot, offset, names) for slot in slots for offset, names in sorted(groups.items())]
+
+
+class DailyScheduler:
+    """定时调度器，空闲时阻塞等待到下一个截止时间"""
+
+    def __init__(self, schedule_config: Dict[str, Any], jobs: List[ScheduledJob],
+                 run: Callable[[Optional[List[str]]], None],
+                 prepare: Optional[Callable[[Optional[List[str]]], None]] = None):
+        """
+        初始化调度器
+
+        Args:
+            schedule_config: 定时任务配置
+            jobs: 任务列表
+            run: 运行任务的回调，参数为账号名称列表（None表示所有账号）
+            prepare: 在运行前prepare_seconds秒调用的准备回调，参数同run
+        """
+        self.jobs = jobs
+        self.run = run
+        self.prepare = prepare
+        self.jitter_seconds = schedule_config.get('jitter_seconds', 0)
+        self.prepare_seconds = schedule_config.get('prepare_seconds', 60)
+        self.catch_up = schedule_config.get('catch_up', True)
+        self.catch_up_hours = schedule_config.get('catch_up_hours', 12)
+        self.state_path = schedule_config.get('state_path', 'records/schedule_state.json')
+        self._stop = threading.Event()
+        # 任务 -> (计划运行时间, 加上随机延迟后的运行时间, 是否已调用准备回调)
+        self._planned: Dict[str, Tuple[float, float, bool]] = {}
+
+    def _load_state(self) -> Dict[str, float]:
+        """读取各任务最近一次完成的计划时间"""
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('last_runs', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取调度状态失败: {e}")
+            return {}
+
+    def _save_state(self, job: ScheduledJob, scheduled_at: float) -> None:
+        """记录任务已完成的计划时间"""
+        state = self._load_state()
+        state[job.key] = scheduled_at
+        try:
+            if os.path.dirname(self.state_path):
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'last_runs': state}, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"保存调度状态失败: {e}")
+
+    def _plan(self, job: ScheduledJob, scheduled_at: float) -> None:
+        """安排任务的下一次运行，随机延迟在安排时确定"""
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0
+        self._planned[job.key] = (scheduled_at, scheduled_at + jitter, False)
+
+    def missed_jobs(self, now: Optional[float] = None) -> List[Tuple[ScheduledJob, float]]:
+        """
+        获取在补跑时间范围内错过的任务
+
+        首次启动（没有调度状态）时视为所有任务都已错过，与以往启动时立即签到一次的行为一致
+
+        Args:
+            now: 当前时间戳
+
+        Returns:
+            (任务, 错过的计划时间)列表
+        """
+        if not self.catch_up:
+            return []
+
+        now = now or time.time()
+        state = self._load_state()
+        missed = []
+        for job in self.jobs:
+            scheduled_at = job.last_before(now)
+            if not state:
+                missed.append((job, scheduled_at))
+            elif state.get(job.key, 0) < scheduled_at and now - scheduled_at <= self.catch_up_hours * 3600:
+                missed.append((job, scheduled_at))
+        return missed
+
+    def _run_job(self, job: ScheduledJob, scheduled_at: float) -> None:
+        """运行任务并记录完成状态"""
+        delay = time.time() - scheduled_at
+        if delay > 60:
+            logger.info(f"执行定时任务 {job.key}（比计划时间晚 {delay:.0f} 秒）")
+        else:
+            logger.info(f"执行定时任务 {job.key}")
+        try:
+            self.run(job.accounts)
+        except Exception as e:
+            logger.error(f"定时任务 {job.key} 执行出错: {e}")
+        self._save_state(job, scheduled_at)
+
+    def run_pending_catch_up(self) -> None:
+        """补跑错过的任务，同一时间点的多个任务合并为一次全部账号的运行"""
+        missed = self.missed_jobs()
+        if not missed:
+            return
+
+        logger.info(f"补跑错过的定时任务: {', '.join(job.key for job, _ in missed)}")
+        accounts = [job.accounts for job, _ in missed]
+        if any(names is None for names in accounts):
+            names = None
+        else:
+            names = sorted({name for group in accounts for name in group})
+        try:
+            self.run(names)
+        except Exception as e:
+            logger.error(f"补跑定时任务出错: {e}")
+        for job, scheduled_at in missed:
+            self._save_state(job, scheduled_at)
+
+    def next_deadline(self) -> Tuple[float, Optional[str]]:
+        """
+        获取下一个需要唤醒的时间
+
+        Returns:
+            (唤醒时间, 任务key)
+        """
+        deadline, key = float('inf'), None
+        for job_key, (_, run_at, prepared) in self._planned.items():
+            wake_at = run_at if prepared or not self.prepare else run_at - self.prepare_seconds
+            if wake_at < deadline:
+                deadline, key = wake_at, job_key
+        return deadline, key
+
+    def run_forever(self) -> None:
+        """运行调度循环，直到调用stop"""
+        now = time.time()
+        for job in self.jobs:
+            self._plan(job, job.next_after(now))
+        jobs = {job.key: job for job in self.jobs}
+
+        while not self._stop.is_set():
+            set_next_run(min(run_at for _, run_at, _ in self._planned.values()))
+            deadline, key = self.next_deadline()
+            remaining = deadline - time.time()
+            if remaining > 0:
+                self._stop.wait(min(remaining, MAX_WAIT_SECONDS))
+                continue
+
+            job = jobs[key]
+            scheduled_at, run_at, prepared = self._planned[key]
+            if not prepared and self.prepare and time.time() < run_at:
+                self._planned[key] = (scheduled_at, run_at, True)
+                logger.info(f"定时任务 {job.key} 将在 {run_at - time.time():.0f} 秒后执行，开始准备")
+                try:
+                    self.prepare(job.accounts)
+                except Exception as e:
+                    logger.error(f"定时任务准备出错: {e}")
+                continue
+
+            self._run_job(job, scheduled_at)
+            self._plan(job, job.next_after(max(time.time(), scheduled_at)))
+
+        set_next_run(None)
+
+    def stop(self) -> None:
+        """停止调度循环"""
+        self._stop.set()
+
+    def describe(self) -> str:
+        """返回任务说明"""
+        parts = []
+        for job in self.jobs:
+            accounts = '所有账号' if job.accounts is None else ', '.join(job.accounts)
+            offset = f" +{job.offset}秒" if job.offset else ''
+            parts.append(f"{job.slot}{offset}（{accounts}）")
+        jitter = f"，随机延迟不超过 {self.jitter_seconds} 秒" if self.jitter_seconds else ''
+        return f"每天 {'; '.join(parts)}{jitter}"
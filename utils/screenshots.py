@@ -0,0 +1,186 @@
+"""
+截图后处理模块
+在后台线程中完成裁剪、缩放和WebP/JPEG编码，并按目录总大小和保存天数清理旧截图
+"""
+
+import importlib.util
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Pillow可用时在后台线程处理第一张截图时才导入，否则直接保存原始PNG
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+# 输出格式对应的文件扩展名和Pillow格式名
+FORMATS = {
+    'webp': ('.webp', 'WEBP'),
+    'jpeg': ('.jpg', 'JPEG'),
+    'png': ('.png', 'PNG'),
+}
+
+
+class ScreenshotProcessor:
+    """截图后处理器，编码和清理在单独的工作线程中进行"""
+
+    def __init__(self, screenshot_config: Dict[str, Any]):
+        """
+        初始化截图后处理器
+
+        Args:
+            screenshot_config: 截图配置
+        """
+        self.directory = screenshot_config.get('dir', 'Screenshots')
+        self.format = screenshot_config.get('format', 'webp').lower()
+        self.quality = screenshot_config.get('quality', 80)
+        self.max_width = screenshot_config.get('max_width', 1280)
+        self.max_dir_mb = screenshot_config.get('max_dir_mb', 200)
+        self.max_age_days = screenshot_config.get('max_age_days', 30)
+
+        if self.format not in FORMATS:
+            logger.warning(f"不支持的截图格式: {self.format}，使用png")
+            self.format = 'png'
+        if not PILLOW_AVAILABLE and self.format != 'png':
+            logger.warning("未安装Pillow，截图将以原始PNG保存")
+            self.format = 'png'
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot')
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def output_path(self, filename: str) -> str:
+        """
+        获取截图最终保存的路径（扩展名由输出格式决定）
+
+        Args:
+            filename: 截图文件名
+
+        Returns:
+            最终保存路径
+        """
+        return os.path.splitext(filename)[0] + FORMATS[self.format][0]
+
+    def submit(self, png_data: bytes, filename: str, crop_box: Optional[Tuple[int, int, int, int]] = None) -> str:
+        """
+        提交截图到后台处理
+
+        Args:
+            png_data: 浏览器返回的PNG数据
+            filename: 截图文件名
+            crop_box: 裁剪区域(left, top, right, bottom)，单位为截图像素
+
+        Returns:
+            截图最终保存的路径
+        """
+        path = self.output_path(filename)
+        future = self._executor.submit(self._process, png_data, path, crop_box)
+        with self._lock:
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+        return path
+
+    def _process(self, png_data: bytes, path: str, crop_box: Optional[Tuple[int, int, int, int]]) -> None:
+        """
+        裁剪、缩放、编码并保存截图
+
+        Args:
+            png_data: PNG数据
+            path: 保存路径
+            crop_box: 裁剪区域
+        """
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            if not PILLOW_AVAILABLE:
+                with open(path, 'wb') as f:
+                    f.write(png_data)
+            else:
+                from PIL import Image
+
+                image = Image.open(io.BytesIO(png_data))
+                if crop_box:
+                    image = image.crop(crop_box)
+                if self.max_width and image.width > self.max_width:
+                    height = round(image.height * self.max_width / image.width)
+                    image = image.resize((self.max_width, height), Image.LANCZOS)
+
+                pil_format = FORMATS[self.format][1]
+                if pil_format == 'JPEG':
+                    image = image.convert('RGB')
+                image.save(path, pil_format, quality=self.quality, optimize=True)
+
+            logger.info(f"截图已保存至 {path} ({os.path.getsize(path) // 1024} KB)")
+            self.enforce_retention()
+        except Exception as e:
+            logger.error(f"处理截图失败: {e}")
+
+    def enforce_retention(self) -> None:
+        """删除超过保存天数的截图，并在目录总大小超过上限时从最旧的截图开始删除"""
+        if not os.path.isdir(self.directory):
+            return
+
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        now = time.time()
+        total_size = sum(size for _, size, _ in files)
+        max_size = self.max_dir_mb * 1024 * 1024 if self.max_dir_mb else None
+        removed = 0
+        for mtime, size, path in files:
+            expired = self.max_age_days and now - mtime > self.max_age_days * 86400
+            oversized = max_size and total_size > max_size
+            if not expired and not oversized:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+                removed += 1
+            except OSError as e:
+                logger.warning(f"删除旧截图失败: {e}")
+
+        if removed:
+            logger.info(f"已清理 {removed} 张旧截图")
+
+    def flush(self, timeout: Optional[float] = 30) -> None:
+        """
+        等待已提交的截图处理完成
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            wait(pending, timeout=timeout)
+
+
+_processor: Optional[ScreenshotProcessor] = None
+_processor_lock = threading.Lock()
+
+
+def get_screenshot_processor(config: Dict[str, Any]) -> ScreenshotProcessor:
+    """
+    获取共享的截图后处理器
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        截图后处理器
+    """
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            _processor = ScreenshotProcessor(config.get('SCREENSHOT', {}))
+        return _processor
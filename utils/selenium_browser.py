@@ -1,42 +1,42 @@
 """
 使用 Selenium 实现的浏览器管理模块
+selenium、undetected_chromedriver和webdriver_manager在首次启动浏览器或查找元素时才导入，
+不需要浏览器的运行（如HTTP签到）不会加载它们
 """
 
 import os
 import json
+import threading
 import time
-from typing import Dict, Any, Optional, Union
-
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.common.exceptions import TimeoutException, WebDriverException
-import undetected_chromedriver as uc
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
 
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+from utils.cookie_store import get_cookie_store
+from utils.dom_snapshot import DomSnapshot, LXML_AVAILABLE, is_supported
+from utils.driver_cache import get_driver_cache
+from utils.http_client import DEFAULT_USER_AGENT
 from utils.logger import get_logger
+from utils.page_scripts import LOGOUT_LINK, PROBE_SCRIPT, build_settle_markers, WAIT_FOR_ELEMENT_SCRIPT
+from utils.resource_blocking import build_blocked_patterns, estimated_bytes
+from utils.screenshots import get_screenshot_processor
+from utils.timing import span
 
 logger = get_logger()
-# 当Capsolver启用时导入
-try:
-    import capsolver
-except ImportError:
-    capsolver = None
+
+# probe等待元素出现时的轮询间隔（秒）
+PROBE_INTERVAL = 0.1
 
 
 class SeleniumBrowserManager:
     """Selenium浏览器管理类"""
 
+    # undetected_chromedriver启动时会修补同一个驱动文件，多线程并发启动需要串行化
+    _driver_init_lock = threading.Lock()
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化浏览器管理器
@@ -49,18 +49,60 @@ class SeleniumBrowserManager:
         self.timeout = browser_config.get('timeout', 30)
         self.browser_type = browser_config.get('type', 'chrome').lower()
         self.headless = browser_config.get('headless', False)
+        self.user_agent = browser_config.get('user_agent') or DEFAULT_USER_AGENT
+        # 页面加载策略：normal(driver.get等待load事件) 或 none(立即返回，由CDP事件判断加载完成)
+        self.page_load_strategy = browser_config.get('page_load_strategy', 'normal')
         self.driver = None
         self.wait = None
+        # 元素等待方式：observer(页面内MutationObserver推送) 或 poll(WebDriverWait轮询)
+        self.wait_strategy = browser_config.get('wait_strategy', 'observer')
+        self._script_timeout = self.timeout + 5
+
+        # Chrome可执行文件、固定的主版本号和修补过的驱动缓存
+        self.binary_path = browser_config.get('binary_path')
+        self.version_main = browser_config.get('version_main')
+        self.driver_cache = get_driver_cache(browser_config)
+
+        # 网络空闲判定：没有进行中的请求并持续quiet窗口即视为空闲
+        self.network_idle_ms = browser_config.get('network_idle_ms', 500)
+        # 超过该时长仍未结束的请求（长轮询、统计上报等）不再阻塞空闲判定
+        self.long_request_seconds = browser_config.get('long_request_seconds', 5)
+        # CDP事件状态，由_drain_cdp_events从performance日志中更新
+        self.cdp_events_enabled = False
+        self._cdp_seq = 0
+        self._cdp_events = deque(maxlen=1000)
+        self._inflight_requests: Dict[str, float] = {}
+        self._last_network_activity = time.monotonic()
+
+        # 页面稳定判定：DOM和网络静默的时长，以及表示页面已渲染出最终状态的元素
+        self.settle_quiet_ms = browser_config.get('settle_quiet_ms', 500)
+        self.settle_markers = build_settle_markers(config)
+        # 只读检查的计算方式：script(页面内脚本) 或 snapshot(获取一次页面HTML后用lxml在本地计算)
+        self.read_mode = browser_config.get('read_mode', 'script')
+
+        # 资源拦截：通过Network.setBlockedURLs拦截图片、字体和第三方统计脚本
+        self.blocked_patterns = build_blocked_patterns(config)
+        self._estimated_bytes = estimated_bytes(config)
+        # 本浏览器累计的网络流量统计，由_drain_cdp_events更新
+        self.network_stats = {'requests': 0, 'transferred_bytes': 0, 'blocked_requests': 0, 'saved_bytes': 0}
+
+        # 截图后处理
+        screenshot_config = config.get('SCREENSHOT', {})
+        self.screenshot_processor = get_screenshot_processor(config)
+        self.screenshot_element_only = screenshot_config.get('element_only', True)
+        self.screenshot_padding = screenshot_config.get('padding', 40)
+
+        # Cookie数据库，未配置时使用JSON文件
+        self.cookie_store = get_cookie_store(config.get('LOGIN', {}))
 
         # Capsolver配置
         self.capsolver_config = config.get('CAPSOLVER', {})
-        if self.capsolver_config.get('enabled', False) and capsolver:
-            capsolver.api_key = self.capsolver_config.get('api_key', '')
+        if self.capsolver_config.get('enabled', False):
             logger.info("Capsolver已启用")
         else:
-            logger.debug("Capsolver未启用或未安装")
+            logger.debug("Capsolver未启用")
 
-    def initialize_driver(self) -> webdriver.Remote:
+    def initialize_driver(self) -> 'webdriver.Remote':
         """
         初始化WebDriver
         
@@ -69,13 +111,17 @@ class SeleniumBrowserManager:
         """
         try:
             logger.info(f"初始化{self.browser_type}浏览器 (无头模式: {self.headless})")
-            return self._init_chrome_driver()
+            with span('driver_init', browser=self.browser_type, headless=self.headless):
+                return self._init_chrome_driver()
         except Exception as e:
             logger.error(f"初始化WebDriver失败: {e}")
             raise
 
-    def _init_chrome_driver(self) -> webdriver.Chrome:
+    def _init_chrome_driver(self) -> 'webdriver.Chrome':
         """初始化Chrome WebDriver，使用undetected_chromedriver"""
+        import undetected_chromedriver as uc
+        from selenium.webdriver.support.ui import WebDriverWait
+
         try:
             # 从配置文件获取所有Chrome选项
             options = uc.ChromeOptions()
@@ -92,25 +138,39 @@ class SeleniumBrowserManager:
             # 设置窗口大小为普通显示器尺寸
             options.add_argument('--window-size=1920,1080')
 
-            # 默认使用最新的Chrome User-Agent
-            options.add_argument(
-                '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
+            # 与HTTP签到共用同一个User-Agent，保证Cookie在两条路径上都有效
+            options.add_argument(f'--user-agent={self.user_agent}')
+
+            options.page_load_strategy = self.page_load_strategy
+
+            # 开启performance日志，用于读取CDP的Network/Page事件
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+            # 使用缓存中已修补的驱动，避免每次启动都解析版本、下载和修补
+            version_main = self.version_main
+            driver_path = None
+            if self.driver_cache:
+                version_main = version_main or self.driver_cache.detect_version()
+                driver_path = self.driver_cache.get_driver(version_main)
 
             # 创建undetected_chromedriver实例 - 不在选项中设置headless，而是通过参数传递
-            driver = uc.Chrome(
-                options=options,
-                driver_executable_path=None,
-                headless=self.headless,
-                use_subprocess=True,  # 使用子进程可以提高稳定性
-                version_main=None,  # None表示使用最新版本
-            )
+            with self._driver_init_lock:
+                driver = uc.Chrome(
+                    options=options,
+                    driver_executable_path=driver_path,  # None表示由undetected_chromedriver下载并修补
+                    browser_executable_path=self.binary_path,
+                    headless=self.headless,
+                    use_subprocess=True,  # 使用子进程可以提高稳定性
+                    version_main=version_main,  # None表示使用最新版本
+                )
 
             # 获取chome浏览器版本
             version = driver.capabilities['browserVersion']
             logger.info(f"Chrome浏览器版本: {version}")
 
-            # 设置页面加载超时
+            # 设置页面加载超时，异步脚本超时需要覆盖MutationObserver等待
             driver.set_page_load_timeout(self.timeout)
+            driver.set_script_timeout(self._script_timeout)
 
             # 如果使用无头模式，添加额外的反检测脚本
             if self.headless:
@@ -118,6 +178,7 @@ class SeleniumBrowserManager:
 
             self.driver = driver
             self.wait = WebDriverWait(driver, self.timeout)
+            self._enable_cdp_events()
             return driver
 
         except Exception as e:
@@ -156,8 +217,14 @@ class SeleniumBrowserManager:
         except Exception as e:
             logger.error(f"注入反检测脚本失败: {e}")
 
-    def _init_firefox_driver(self) -> webdriver.Firefox:
+    def _init_firefox_driver(self) -> 'webdriver.Firefox':
         """初始化Firefox WebDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        from selenium.webdriver.support.ui import WebDriverWait
+        from webdriver_manager.firefox import GeckoDriverManager
+
         try:
             options = FirefoxOptions()
 
@@ -177,8 +244,14 @@ class SeleniumBrowserManager:
             logger.error(f"初始化Firefox WebDriver失败: {e}")
             raise
 
-    def _init_edge_driver(self) -> webdriver.Edge:
+    def _init_edge_driver(self) -> 'webdriver.Edge':
         """初始化Edge WebDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.edge.options import Options as EdgeOptions
+        from selenium.webdriver.edge.service import Service as EdgeService
+        from selenium.webdriver.support.ui import WebDriverWait
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
         try:
             options = EdgeOptions()
 
@@ -206,12 +279,210 @@ class SeleniumBrowserManager:
             url: 目标网页URL
         """
         logger.info(f"导航至: {url}")
-        self.driver.get(url)
-        # 等待页面加载完成
-        self.driver.execute_script("return document.readyState") == "complete"
+        with span('navigate', url=url) as attributes:
+            stats_before = dict(self.network_stats)
+            self.driver.get(url)
+            # driver.get在load事件后返回，再等待页面脚本发起的请求结束
+            if not self.cdp_events_enabled:
+                self.wait_for_load()
+            attributes['network_idle'] = self.wait_for_network_idle()
+            if self.cdp_events_enabled:
+                attributes.update({key: value - stats_before[key] for key, value in self.network_stats.items()})
+
+    def _enable_cdp_events(self) -> None:
+        """启用CDP的Network和Page事件，不支持时回退到轮询document.readyState"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Page.enable', {})
+            self.driver.get_log('performance')
+            self.cdp_events_enabled = True
+        except Exception as e:
+            logger.debug(f"当前浏览器不支持CDP事件，使用轮询等待: {e}")
+            self.cdp_events_enabled = False
+
+        if self.cdp_events_enabled and self.blocked_patterns:
+            try:
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns})
+                logger.debug(f"已启用资源拦截，共 {len(self.blocked_patterns)} 条规则")
+            except Exception as e:
+                logger.warning(f"启用资源拦截失败: {e}")
+        self._cdp_events.clear()
+        self._inflight_requests.clear()
+        self._last_network_activity = time.monotonic()
+
+    def _drain_cdp_events(self) -> None:
+        """读取performance日志中积累的CDP事件并更新网络状态"""
+        if not self.cdp_events_enabled:
+            return
+
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"读取CDP事件失败: {e}")
+            return
+
+        now = time.monotonic()
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method', '')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+
+            if method == 'Network.requestWillBeSent':
+                if not params.get('request', {}).get('url', '').startswith('data:'):
+                    self._inflight_requests[request_id] = now
+                    self._last_network_activity = now
+                    self.network_stats['requests'] += 1
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                if self._inflight_requests.pop(request_id, None) is not None:
+                    self._last_network_activity = now
+                if method == 'Network.loadingFinished':
+                    self.network_stats['transferred_bytes'] += int(params.get('encodedDataLength', 0))
+                elif params.get('blockedReason') == 'inspector':
+                    # 被setBlockedURLs拦截的请求，按资源类型估算节省的流量
+                    resource_type = params.get('type', 'Other').lower()
+                    self.network_stats['blocked_requests'] += 1
+                    self.network_stats['saved_bytes'] += self._estimated_bytes.get(
+                        resource_type, self._estimated_bytes['other'])
+            elif method not in ('Network.responseReceived', 'Page.loadEventFired',
+                                'Page.domContentEventFired', 'Page.frameNavigated'):
+                continue
+
+            self._cdp_seq += 1
+            self._cdp_events.append((self._cdp_seq, method, params))
+
+    def cdp_mark(self) -> int:
+        """
+        记录当前的CDP事件位置，之后的等待只匹配该位置之后发生的事件
+
+        Returns:
+            事件序号
+        """
+        self._drain_cdp_events()
+        return self._cdp_seq
+
+    def _find_cdp_event(self, method: str, since: int, url_part: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        在已记录的事件中查找指定事件
+
+        Args:
+            method: CDP事件名
+            since: 只匹配该序号之后的事件
+            url_part: 响应URL需要包含的片段
+
+        Returns:
+            事件参数或None
+        """
+        for seq, event_method, params in self._cdp_events:
+            if seq <= since or event_method != method:
+                continue
+            if url_part and url_part not in params.get('response', {}).get('url', ''):
+                continue
+            return params
+        return None
+
+    def wait_for_load(self, timeout: Optional[float] = None, since: Optional[int] = None) -> bool:
+        """
+        等待页面load事件
+
+        Args:
+            timeout: 超时时间（秒）
+            since: 只匹配该事件序号之后的load事件，为None时检查当前页面是否已加载完成
+
+        Returns:
+            是否在超时前完成加载
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            if since is not None and self.cdp_events_enabled:
+                self._drain_cdp_events()
+                if self._find_cdp_event('Page.loadEventFired', since):
+                    return True
+            elif self.driver.execute_script("return document.readyState") == "complete":
+                return True
+            time.sleep(0.05)
+
+        logger.warning("等待页面加载超时")
+        return False
+
+    def wait_for_network_idle(self, quiet_ms: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        等待网络空闲：没有进行中的请求，并且持续quiet_ms毫秒没有新的网络活动
+
+        Args:
+            quiet_ms: 静默窗口（毫秒）
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否在超时前进入空闲状态
+        """
+        quiet = (quiet_ms if quiet_ms is not None else self.network_idle_ms) / 1000
+        if not self.cdp_events_enabled:
+            # 无法获取网络事件时只能等待一个静默窗口
+            time.sleep(quiet)
+            return True
+
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            if self._network_quiet(quiet):
+                return True
+            time.sleep(0.05)
+
+        logger.warning(f"等待网络空闲超时，仍有 {len(self._inflight_requests)} 个请求未完成")
+        return False
+
+    def _network_quiet(self, quiet: float) -> bool:
+        """
+        判断当前是否没有进行中的请求，并且持续quiet秒没有新的网络活动
+
+        Args:
+            quiet: 静默窗口（秒）
+
+        Returns:
+            网络是否空闲，无法获取网络事件时返回True
+        """
+        if not self.cdp_events_enabled:
+            return True
+        self._drain_cdp_events()
+        now = time.monotonic()
+        active = [start for start in self._inflight_requests.values()
+                  if now - start < self.long_request_seconds]
+        return not active and now - self._last_network_activity >= quiet
+
+    def wait_for_response(self, url_part: str, since: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        等待URL包含指定片段的响应
+
+        Args:
+            url_part: URL片段，如 /api/account/signIn
+            since: 只匹配该事件序号之后的响应，通常在触发请求前调用cdp_mark获得
+            timeout: 超时时间（秒）
+
+        Returns:
+            响应信息（包含url和status），超时或不支持CDP事件时返回None
+        """
+        if not self.cdp_events_enabled:
+            self.wait_for_network_idle(timeout=timeout)
+            return None
+
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            self._drain_cdp_events()
+            params = self._find_cdp_event('Network.responseReceived', since, url_part)
+            if params:
+                response = params.get('response', {})
+                logger.debug(f"收到响应: {response.get('status')} {response.get('url')}")
+                return response
+            time.sleep(0.05)
+
+        logger.warning(f"等待响应超时: {url_part}")
+        return None
 
-    def find_element(self, element_config: Dict[str, str], wait_time: Optional[int] = None) -> Optional[
-        webdriver.remote.webelement.WebElement]:
+    def find_element(self, element_config: Dict[str, str], wait_time: Optional[int] = None) -> Optional['WebElement']:
         """
         查找网页元素
         
@@ -222,6 +493,10 @@ class SeleniumBrowserManager:
         Returns:
             找到的元素或None
         """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         if not element_config:
             logger.error("元素配置为空")
             return None
@@ -235,23 +510,58 @@ class SeleniumBrowserManager:
 
         wait_time = wait_time or self.timeout
 
-        try:
-            # 转换定位器类型
-            by_type = self._get_selenium_by(locator_type)
+        with span('find_element', locator=f"{locator_type}={locator_value}", wait_time=wait_time,
+                  strategy=self.wait_strategy) as attributes:
+            start = time.monotonic()
+            if self.wait_strategy == 'observer':
+                try:
+                    element = self._wait_with_observer(element_config, wait_time)
+                    if element is None:
+                        attributes['status'] = 'timeout'
+                        logger.warning(f"超时: 未找到元素 {locator_type}='{locator_value}'")
+                    return element
+                except Exception as e:
+                    # 页面跳转会中断异步脚本，剩余时间改用轮询
+                    logger.debug(f"MutationObserver等待中断，改为轮询: {e}")
+                    attributes['strategy'] = 'poll'
+                    wait_time = max(0.5, wait_time - (time.monotonic() - start))
+
+            try:
+                # 转换定位器类型
+                by_type = self._get_selenium_by(locator_type)
 
-            # 使用显式等待查找元素
-            element = WebDriverWait(self.driver, wait_time).until(
-                EC.presence_of_element_located((by_type, locator_value))
-            )
+                # 使用显式等待查找元素
+                element = WebDriverWait(self.driver, wait_time).until(
+                    EC.presence_of_element_located((by_type, locator_value))
+                )
 
-            return element
+                return element
 
-        except TimeoutException:
-            logger.warning(f"超时: 未找到元素 {locator_type}='{locator_value}'")
-            return None
-        except Exception as e:
-            logger.error(f"查找元素时出错: {e}")
-            return None
+            except TimeoutException:
+                attributes['status'] = 'timeout'
+                logger.warning(f"超时: 未找到元素 {locator_type}='{locator_value}'")
+                return None
+            except Exception as e:
+                attributes['status'] = 'error'
+                logger.error(f"查找元素时出错: {e}")
+                return None
+
+    def _wait_with_observer(self, element_config: Dict[str, str], wait_time: float) -> Optional['WebElement']:
+        """
+        在页面中安装MutationObserver等待元素出现，整个等待只需要一次WebDriver调用
+
+        Args:
+            element_config: 元素定位配置
+            wait_time: 等待时间（秒）
+
+        Returns:
+            找到的元素，超时返回None
+        """
+        if wait_time + 1 > self._script_timeout:
+            self._script_timeout = wait_time + 5
+            self.driver.set_script_timeout(self._script_timeout)
+        locator = {'type': element_config.get('type', '').lower(), 'value': element_config.get('value', '')}
+        return self.driver.execute_async_script(WAIT_FOR_ELEMENT_SCRIPT, locator, int(wait_time * 1000))
 
     def _get_selenium_by(self, locator_type: str) -> str:
         """
@@ -263,6 +573,8 @@ class SeleniumBrowserManager:
         Returns:
             Selenium的By类型
         """
+        from selenium.webdriver.common.by import By
+
         locator_map = {
             'id': By.ID,
             'name': By.NAME,
@@ -275,17 +587,29 @@ class SeleniumBrowserManager:
         }
         return locator_map.get(locator_type, By.CSS_SELECTOR)
 
-    def click_element(self, element_config: Dict[str, str], retry_count: int = 1) -> bool:
+    def click_element(self, element_config: Dict[str, str], retry_count: int = 1, ready: bool = False) -> bool:
         """
         点击指定元素
         
         Args:
             element_config: 元素定位配置
             retry_count: 重试次数
+            ready: 调用方已通过probe确认元素可点击，直接点击而不再等待，失败时再按原方式等待后点击
             
         Returns:
             是否成功点击
         """
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if ready:
+            try:
+                self.driver.find_element(self._get_selenium_by(element_config['type']), element_config['value']).click()
+                logger.info(f"成功点击元素: {element_config.get('value')}")
+                return True
+            except Exception as e:
+                logger.debug(f"直接点击失败，等待元素可点击后重试: {e}")
+
         for attempt in range(retry_count):
             try:
                 element = self.find_element(element_config)
@@ -337,17 +661,21 @@ class SeleniumBrowserManager:
             logger.error(f"填写输入框时出错: {e}")
             return False
 
-    def is_element_present(self, element_config: Dict[str, str], wait_time: Optional[int] = None) -> bool:
+    def is_element_present(self, element_config: Dict[str, str], wait_time: Optional[int] = None,
+                           settle: bool = False) -> bool:
         """
         检查元素是否存在
         
         Args:
             element_config: 元素定位配置
             wait_time: 等待时间（秒）
-            
+            settle: 页面稳定后元素仍不存在时立即返回False，不等待到超时
+
         Returns:
             元素是否存在
         """
+        if settle:
+            return self.probe({'element': element_config}, wait_time or self.timeout, settle=True)['element']['present']
         element = self.find_element(element_config, wait_time)
         return element is not None
 
@@ -366,33 +694,183 @@ class SeleniumBrowserManager:
             return element.text
         return None
 
-    def take_screenshot(self, filename: str) -> bool:
+    def probe(self, locators: Dict[str, Optional[Dict[str, str]]], wait_time: Optional[float] = None,
+              settle: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        在一次脚本调用中同时检查多个元素，返回每个元素是否存在、文本和是否可点击
+
+        read_mode为snapshot时等待期间找到元素即返回，否则在页面稳定（settle为True时）或到达等待时间后
+        获取一次页面HTML在本地计算所有元素
+
+        Args:
+            locators: 名称 -> 元素定位配置，值为空的项会被忽略
+            wait_time: 所有元素都不存在时最多等待的时间（秒），为空时只检查一次
+            settle: 页面已稳定（加载完成、DOM和网络静默并出现终态标记）时不再等待，
+                    此时元素仍不存在即视为不存在
+
+        Returns:
+            名称 -> {'present': 是否存在, 'text': 文本, 'clickable': 是否可点击}
+        """
+        locators = {name: locator for name, locator in locators.items() if locator}
+        missing = {name: {'present': False, 'text': None, 'clickable': False} for name in locators}
+        deadline = time.monotonic() + (wait_time or 0)
+        markers = self.settle_markers if settle else None
+        use_snapshot = (self.read_mode == 'snapshot' and LXML_AVAILABLE
+                        and all(is_supported(locator) for locator in locators.values()))
+
+        with span('probe', locators=','.join(locators), wait_time=wait_time or 0, snapshot=use_snapshot) as attributes:
+            if use_snapshot:
+                try:
+                    return self._probe_snapshot(locators, missing, deadline, settle, attributes)
+                except Exception as e:
+                    attributes['status'] = 'error'
+                    logger.error(f"检查页面元素时出错: {e}")
+                    return missing
+
+            while True:
+                try:
+                    response = self.execute_script(PROBE_SCRIPT, locators, markers) or {}
+                except Exception as e:
+                    attributes['status'] = 'error'
+                    logger.error(f"检查页面元素时出错: {e}")
+                    return missing
+
+                result = {**missing, **response.get('elements', {})}
+                attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+                remaining = deadline - time.monotonic()
+                if attributes['found'] or remaining <= 0:
+                    return result
+                if settle and self._is_settled(response.get('settle')):
+                    # 页面已稳定，元素不会再出现，剩余的等待时间计入节省的时间
+                    attributes['saved_seconds'] = round(remaining, 3)
+                    logger.debug(f"页面已稳定，未找到 {','.join(locators)}，提前 {remaining:.1f} 秒结束等待")
+                    return result
+                time.sleep(PROBE_INTERVAL)
+
+    def _probe_snapshot(self, locators: Dict[str, Dict[str, str]], missing: Dict[str, Dict[str, Any]],
+                        deadline: float, settle: bool, attributes: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        等待元素出现或页面稳定，元素仍不存在时获取一次页面HTML，在同一个快照上计算所有元素
+
+        等待期间在页面中检查元素，找到后直接返回，不再获取页面HTML
+
+        Args:
+            locators: 名称 -> 元素定位配置
+            missing: 所有元素都不存在时的结果
+            deadline: 等待截止时间（time.monotonic）
+            settle: 页面已稳定时不再等待
+            attributes: probe span的附加信息
+
+        Returns:
+            名称 -> 元素状态
+        """
+        markers = self.settle_markers if settle else None
+        settled = False
+        while time.monotonic() < deadline:
+            response = self.execute_script(PROBE_SCRIPT, locators, markers) or {}
+            result = {**missing, **response.get('elements', {})}
+            attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+            if attributes['found']:
+                return result
+            settled = settle and self._is_settled(response.get('settle'))
+            if settled:
+                break
+            time.sleep(PROBE_INTERVAL)
+
+        snapshot = self.snapshot()
+        if snapshot.available:
+            elements = snapshot.evaluate(locators)
+        else:
+            # 获取页面HTML失败时改为在页面中检查一次
+            elements = (self.execute_script(PROBE_SCRIPT, locators, None) or {}).get('elements', {})
+        result = {**missing, **elements}
+        attributes['found'] = ','.join(name for name, item in result.items() if item['present'])
+        remaining = deadline - time.monotonic()
+        if settled and not attributes['found'] and remaining > 0:
+            attributes['saved_seconds'] = round(remaining, 3)
+            logger.debug(f"页面已稳定，未找到 {','.join(locators)}，提前 {remaining:.1f} 秒结束等待")
+        return result
+
+    def snapshot(self) -> DomSnapshot:
+        """
+        获取当前页面的HTML快照，用于在本地计算多个只读检查
+
+        Returns:
+            页面快照，获取页面源码失败或lxml不可用时快照不可用
+        """
+        return DomSnapshot(self.get_page_source() if LXML_AVAILABLE else None)
+
+    def _is_settled(self, state: Optional[Dict[str, Any]]) -> bool:
+        """
+        判断页面是否已稳定
+
+        Args:
+            state: PROBE_SCRIPT返回的页面稳定状态
+
+        Returns:
+            页面已加载完成、出现终态标记，并且DOM和网络都已静默settle_quiet_ms
+        """
+        return bool(state and state.get('ready') and state.get('marker')
+                    and state.get('quietMs', 0) >= self.settle_quiet_ms
+                    and self._network_quiet(self.settle_quiet_ms / 1000))
+
+    def take_screenshot(self, filename: str, element_config: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
-        截取当前页面的屏幕截图
+        截取当前页面的屏幕截图，裁剪、缩放和编码在后台线程完成
         
         Args:
-            filename: 保存的文件名
+            filename: 保存的文件名（扩展名由截图格式决定）
+            element_config: 只截取该元素周围区域时的元素定位配置(可选)
             
         Returns:
-            是否成功截图
+            截图最终保存的路径，失败时返回None
         """
-        try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            # 截图
-            self.driver.save_screenshot(filename)
-            logger.info(f"截图已保存至 {filename}")
-            return True
-        except Exception as e:
-            logger.error(f"截图失败: {e}")
-            return False
+        with span('screenshot', element_only=bool(element_config and self.screenshot_element_only)) as attributes:
+            try:
+                # 截图
+                png_data = self.driver.get_screenshot_as_png()
+                crop_box = None
+                if element_config and self.screenshot_element_only:
+                    crop_box = self._get_element_crop_box(element_config)
+                return self.screenshot_processor.submit(png_data, filename, crop_box)
+            except Exception as e:
+                attributes['status'] = 'error'
+                logger.error(f"截图失败: {e}")
+                return None
 
-    def save_cookies(self, filename: str) -> bool:
+    def _get_element_crop_box(self, element_config: Dict[str, str]) -> Optional[tuple]:
         """
-        保存cookies到文件
+        计算元素在截图中的区域
+
+        Args:
+            element_config: 元素定位配置
+
+        Returns:
+            (left, top, right, bottom)，找不到元素时返回None
+        """
+        element = self.find_element(element_config, wait_time=1)
+        if not element:
+            return None
+
+        left, top, right, bottom, ratio = self.driver.execute_script("""
+            const rect = arguments[0].getBoundingClientRect();
+            return [rect.left, rect.top, rect.right, rect.bottom, window.devicePixelRatio || 1];
+        """, element)
+        padding = self.screenshot_padding
+        return (
+            max(0, int((left - padding) * ratio)),
+            max(0, int((top - padding) * ratio)),
+            int((right + padding) * ratio),
+            int((bottom + padding) * ratio),
+        )
+
+    def save_cookies(self, filename: str, account: Optional[str] = None) -> bool:
+        """
+        保存cookies到文件，配置了Cookie数据库且指定账号时保存到数据库
         
         Args:
             filename: 保存的文件名
+            account: 账号名称
             
         Returns:
             是否保存成功
@@ -401,12 +879,20 @@ class SeleniumBrowserManager:
             # 获取所有cookies
             cookies = self.driver.get_cookies()
 
-            # # 确保目录存在
-            # os.makedirs(os.path.dirname(filename), exist_ok=True)
+            if self.cookie_store and account:
+                self.cookie_store.save(account, cookies)
+                logger.info(f"Cookies已保存至数据库 (账号: {account})")
+                return True
+
+            # 确保目录存在
+            if os.path.dirname(filename):
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-            # 保存cookies到文件
-            with open(filename, 'w', encoding='utf-8') as f:
+            # 先写临时文件再替换，避免中断时留下不完整的文件
+            temp_filename = f"{filename}.tmp"
+            with open(temp_filename, 'w', encoding='utf-8') as f:
                 json.dump(cookies, f, ensure_ascii=False, indent=2)
+            os.replace(temp_filename, filename)
 
             logger.info(f"Cookies已保存至 {filename}")
             return True
@@ -414,42 +900,74 @@ class SeleniumBrowserManager:
             logger.error(f"保存cookies失败: {e}")
             return False
 
-    def load_cookies(self, filename: str) -> bool:
+    def load_cookies(self, filename: str, account: Optional[str] = None) -> bool:
         """
-        从文件加载cookies
+        从文件加载cookies，配置了Cookie数据库且指定账号时从数据库加载
         
         Args:
             filename: cookies文件路径
+            account: 账号名称
             
         Returns:
             是否加载成功
         """
         try:
-            if not os.path.exists(filename):
-                logger.error(f"Cookies文件不存在: {filename}")
-                return False
-
-            # 读取cookies文件
-            with open(filename, 'r', encoding='utf-8') as f:
-                cookies = json.load(f)
+            if self.cookie_store and account:
+                cookies = self.cookie_store.load(account)
+                if not cookies:
+                    logger.error(f"数据库中没有账号 {account} 的Cookies")
+                    return False
+                source = f"数据库 (账号: {account})"
+            else:
+                if not os.path.exists(filename):
+                    logger.error(f"Cookies文件不存在: {filename}")
+                    return False
+
+                # 读取cookies文件
+                with open(filename, 'r', encoding='utf-8') as f:
+                    cookies = json.load(f)
+                source = filename
 
             # 添加cookies
             for cookie in cookies:
                 self.driver.add_cookie(cookie)
 
-            logger.info(f"已从 {filename} 加载cookies")
+            logger.info(f"已从 {source} 加载cookies")
             return True
         except Exception as e:
             logger.error(f"加载cookies失败: {e}")
             return False
 
     def verify_login_status(self) -> bool:
-        # 验证登录状态  查找<a href="/api/account/signOut" title="登出">
-        if self.is_element_present({'type': 'xpath', 'value': '//a[@href="/api/account/signOut" and @title="登出"]'}, wait_time=3):
+        # 验证登录状态  查找<a href="/api/account/signOut" title="登出">，页面稳定后仍不存在即视为未登录
+        if self.is_element_present(LOGOUT_LINK, wait_time=3, settle=True):
             return True
         else:
             return False
 
+    def is_alive(self) -> bool:
+        """
+        检查浏览器是否仍可正常响应
+
+        Returns:
+            浏览器是否可用
+        """
+        if not self.driver:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"浏览器健康检查失败: {e}")
+            return False
+
+    def reset_session(self) -> None:
+        """清除所有Cookie并回到空白页，供下一个账号复用浏览器"""
+        try:
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            self.driver.delete_all_cookies()
+        self.driver.get('about:blank')
+
     def close(self) -> None:
         """关闭浏览器"""
         try:
@@ -460,6 +978,24 @@ class SeleniumBrowserManager:
         except Exception as e:
             logger.error(f"关闭浏览器时出错: {e}")
 
+    def execute_script(self, script: str, *args) -> Any:
+        """
+        在页面中执行JavaScript
+
+        Args:
+            script: JavaScript代码（使用arguments获取参数，return返回结果）
+            *args: 传给脚本的参数，可以包含元素
+
+        Returns:
+            脚本的返回值
+        """
+        return self.driver.execute_script(script, *args)
+
+    @property
+    def current_url(self) -> str:
+        """当前页面的URL"""
+        return self.driver.current_url
+
     def solve_turnstile(self, site_key: str, url: str) -> Optional[str]:
         """
         解决Cloudflare Turnstile验证码
@@ -480,89 +1016,10 @@ class SeleniumBrowserManager:
             logger.error("未配置Capsolver API密钥")
             return None
 
-        # 检查是否已导入新版Cloudflare模块
-        try:
-            from python3_capsolver.cloudflare import Cloudflare
-            from python3_capsolver.core.enum import CaptchaTypeEnm
-            is_new_api = True
-        except ImportError:
-            is_new_api = False
+        from utils.captcha_solver import get_solver_service
 
         logger.info(f"正在使用Capsolver解决Turnstile (site_key: {site_key})")
-
-        try:
-            # 创建任务参数
-            task_payload = {
-                "websiteURL": url,
-                "websiteKey": site_key
-            }
-
-            # 使用新版API
-            if is_new_api:
-                try:
-                    # 使用异步API
-                    import asyncio
-
-                    # 创建Cloudflare对象
-                    cloudflare = Cloudflare(
-                        api_key=api_key,
-                        captcha_type=CaptchaTypeEnm.AntiTurnstileTaskProxyLess
-                    )
-
-                    # 执行验证码任务
-                    response = asyncio.run(cloudflare.aio_captcha_handler(task_payload=task_payload))
-
-                    # 获取任务ID
-                    while True:
-                        time.sleep(1)  # delay
-                        payload = {"clientKey": api_key, "taskId": response.get("taskId")}
-                        res = requests.post("https://api.capsolver.com/getTaskResult", json=payload)
-                        resp = res.json()
-                        status = resp.get("status")
-                        if status == "ready":
-                            solution = resp.get("solution", {}).get('token')
-                            logger.info("成功解决Turnstile")
-                            return solution
-                        elif status == "failed" or resp.get("errorId"):
-                            logger.error(f"解决Turnstile时出错: {resp.get('errorId')}")
-                            return None
-                        else:
-                            logger.debug("等待验证码识别结果...")
-
-                except Exception as e:
-                    logger.error(f"使用新版API解决Turnstile时出错: {e}")
-                    # 如果新API失败，尝试回退到旧API
-
-            # 使用旧版API
-            if not is_new_api or 'solution' not in locals():
-                # 添加任务类型
-                task_payload["type"] = "TurnstileTaskProxyLess"
-
-                timeout = self.capsolver_config.get('timeout', 60)
-                task_id = capsolver.create_task(task_payload)
-                logger.debug(f"已创建Turnstile任务 (ID: {task_id})")
-
-                start_time = time.time()
-                solution = None
-
-                # 等待验证码解决结果
-                while time.time() - start_time < timeout:
-                    # 获取任务结果
-                    response = capsolver.get_task_result(task_id)
-
-                    if response.get('status') == 'ready':
-                        solution = response.get('solution', {}).get('token')
-                        logger.info("成功解决Turnstile")
-                        break
-
-                    # 等待后再次查询
-                    time.sleep(5)
-
-            return solution
-
-        except Exception as e:
-            logger.error(f"解决Turnstile时出错: {e}")
-            return None
+        return get_solver_service(self.capsolver_config).solve_turnstile(site_key, url)
 
     def inject_token(self, token: str) -> None:
         """
@@ -0,0 +1,302 @@
+"""
+共享Chrome模块
+所有账号共用一个undetected Chrome实例，每个账号通过 Target.createBrowserContext 获得独立的浏览器上下文
+（Cookie、缓存和存储互相隔离）和标签页。WebDriver同一时间只能操作一个窗口，
+因此每条命令都在共享锁内先切换到该账号的标签页再执行，performance日志按标签页分发
+"""
+
+import json
+import threading
+from typing import TYPE_CHECKING, Dict, Any, Callable, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.selenium_browser import SeleniumBrowserManager
+from utils.timing import span
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+logger = get_logger()
+
+
+class SharedChrome:
+    """一个共享的undetected Chrome实例，为每个账号创建独立的浏览器上下文"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化共享Chrome
+
+        Args:
+            config: 配置信息，浏览器启动参数以第一个使用者的配置为准
+        """
+        self.config = config
+        self.lock = threading.RLock()
+        self._owner: Optional[SeleniumBrowserManager] = None
+        self._home_handle: Optional[str] = None
+        self._current_handle: Optional[str] = None
+        # 标签页targetId -> 尚未被读取的performance日志
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+
+    @property
+    def driver(self) -> Optional['webdriver.Chrome']:
+        return self._owner.driver if self._owner else None
+
+    def _switch(self, handle: str) -> None:
+        if self._current_handle != handle:
+            self._owner.driver.switch_to.window(handle)
+            self._current_handle = handle
+
+    def _ensure_started(self) -> None:
+        """启动Chrome，已退出或无响应时重新启动"""
+        if self._owner and self._owner.driver:
+            try:
+                self._switch(self._home_handle)
+                if self._owner.is_alive():
+                    return
+            except Exception as e:
+                logger.warning(f"共享Chrome已失效: {e}")
+            self.shutdown()
+
+        logger.info("启动共享的Chrome实例")
+        # 导航和点击不阻塞chromedriver，其他账号的命令可以在页面加载期间执行
+        browser_config = {**self.config.get('BROWSER', {}), 'page_load_strategy': 'none'}
+        owner = SeleniumBrowserManager({**self.config, 'BROWSER': browser_config})
+        owner.initialize_driver()
+        self._owner = owner
+        self._home_handle = self._current_handle = owner.driver.current_window_handle
+        self._buffers.clear()
+
+    def open_context(self) -> Tuple[str, str, str]:
+        """
+        创建一个浏览器上下文及其标签页
+
+        Returns:
+            (browserContextId, targetId, 窗口句柄)
+        """
+        with self.lock:
+            self._ensure_started()
+            driver = self._owner.driver
+            context_id = driver.execute_cdp_cmd('Target.createBrowserContext', {})['browserContextId']
+            target_id = driver.execute_cdp_cmd('Target.createTarget', {
+                'url': 'about:blank',
+                'browserContextId': context_id,
+            })['targetId']
+            # chromedriver的窗口句柄就是targetId，个别版本带有前缀
+            handle = next((handle for handle in driver.window_handles if handle.endswith(target_id)), target_id)
+            self._buffers[target_id] = []
+            logger.debug(f"已创建浏览器上下文 {context_id}，当前共 {len(self._buffers)} 个")
+            return context_id, target_id, handle
+
+    def close_context(self, context_id: str, target_id: str) -> None:
+        """
+        关闭浏览器上下文及其中的标签页
+
+        Args:
+            context_id: browserContextId
+            target_id: 标签页的targetId
+        """
+        with self.lock:
+            if self._buffers.pop(target_id, None) is None or not self.driver:
+                return
+            self._switch(self._home_handle)
+            self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+
+    def call(self, handle: str, function: Callable, *args, **kwargs) -> Any:
+        """
+        切换到指定标签页后执行WebDriver调用
+
+        Args:
+            handle: 窗口句柄
+            function: 要执行的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            函数的返回值
+        """
+        with self.lock:
+            self._switch(handle)
+            return function(*args, **kwargs)
+
+    def performance_entries(self, target_id: str) -> List[Dict[str, Any]]:
+        """
+        读取performance日志并按标签页分发，返回属于指定标签页的日志
+
+        Args:
+            target_id: 标签页的targetId
+
+        Returns:
+            日志条目列表
+        """
+        with self.lock:
+            for entry in self.driver.get_log('performance'):
+                try:
+                    webview = json.loads(entry['message']).get('webview')
+                except (KeyError, ValueError):
+                    continue
+                if webview in self._buffers:
+                    self._buffers[webview].append(entry)
+            entries, self._buffers[target_id] = self._buffers.get(target_id, []), []
+            return entries
+
+    def shutdown(self) -> None:
+        """关闭共享的Chrome，所有浏览器上下文随之失效"""
+        with self.lock:
+            owner, self._owner = self._owner, None
+            self._home_handle = self._current_handle = None
+            self._buffers.clear()
+        if owner:
+            owner.close()
+
+
+class ContextProxy:
+    """WebDriver或WebElement的代理，每次调用前切换到所属账号的标签页"""
+
+    def __init__(self, shared: SharedChrome, handle: str, target: Any):
+        self._shared = shared
+        self._handle = handle
+        self._target = target
+
+    def _wrap(self, value: Any) -> Any:
+        """把返回的元素也包装为代理，元素命令同样需要在所属标签页中执行"""
+        from selenium.webdriver.remote.webelement import WebElement
+
+        if isinstance(value, WebElement):
+            return ContextProxy(self._shared, self._handle, value)
+        if isinstance(value, list) and value and isinstance(value[0], WebElement):
+            return [ContextProxy(self._shared, self._handle, element) for element in value]
+        return value
+
+    @staticmethod
+    def _unwrap(value: Any) -> Any:
+        return value._target if isinstance(value, ContextProxy) else value
+
+    def __getattr__(self, name: str) -> Any:
+        # 属性（如current_url、text）本身也会发送命令，同样需要先切换标签页
+        value = self._shared.call(self._handle, getattr, self._target, name)
+        if not callable(value):
+            return self._wrap(value)
+
+        def method(*args, **kwargs):
+            args = [self._unwrap(arg) for arg in args]
+            return self._wrap(self._shared.call(self._handle, value, *args, **kwargs))
+        return method
+
+
+class ContextDriver(ContextProxy):
+    """单个浏览器上下文使用的WebDriver代理"""
+
+    def __init__(self, shared: SharedChrome, handle: str, target_id: str):
+        super().__init__(shared, handle, shared.driver)
+        self.target_id = target_id
+
+    def get_log(self, log_type: str) -> List[Dict[str, Any]]:
+        """performance日志只返回本标签页的事件，其他类型的日志直接读取"""
+        if log_type == 'performance':
+            return self._shared.performance_entries(self.target_id)
+        return self._shared.call(self._handle, self._target.get_log, log_type)
+
+
+class ContextBrowserManager(SeleniumBrowserManager):
+    """在共享Chrome的独立浏览器上下文中运行的浏览器管理器"""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化浏览器管理器
+
+        Args:
+            config: 浏览器配置信息
+        """
+        super().__init__(config)
+        self.config = config
+        # MutationObserver等待期间会一直占用共享的WebDriver会话，共享模式下使用轮询
+        self.wait_strategy = 'poll'
+        self.shared: Optional[SharedChrome] = None
+        self.context_id: Optional[str] = None
+        self.target_id: Optional[str] = None
+
+    def initialize_driver(self) -> ContextDriver:
+        """
+        在共享的Chrome中创建本账号的浏览器上下文，Chrome未启动时先启动
+
+        Returns:
+            本上下文的WebDriver代理
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            logger.info(f"在共享的Chrome中创建浏览器上下文 (无头模式: {self.headless})")
+            with span('driver_init', browser=self.browser_type, headless=self.headless, shared=True):
+                self.shared = get_shared_chrome(self.config)
+                self.context_id, self.target_id, handle = self.shared.open_context()
+                self.driver = ContextDriver(self.shared, handle, self.target_id)
+                if self.headless:
+                    self._inject_anti_detection_scripts(self.driver)
+                self.wait = WebDriverWait(self.driver, self.timeout)
+                self._enable_cdp_events()
+                return self.driver
+        except Exception as e:
+            logger.error(f"创建浏览器上下文失败: {e}")
+            raise
+
+    def navigate_to(self, url: str) -> None:
+        """
+        导航到指定URL，通过Page.navigate发起导航后等待load事件，等待期间不占用共享锁
+
+        Args:
+            url: 目标网页URL
+        """
+        logger.info(f"导航至: {url}")
+        with span('navigate', url=url) as attributes:
+            stats_before = dict(self.network_stats)
+            mark = self.cdp_mark()
+            self.driver.execute_cdp_cmd('Page.navigate', {'url': url})
+            self.wait_for_load(since=mark)
+            attributes['network_idle'] = self.wait_for_network_idle()
+            attributes.update({key: value - stats_before[key] for key, value in self.network_stats.items()})
+
+    def reset_session(self) -> None:
+        """清除本上下文的Cookie并回到空白页"""
+        self.driver.execute_cdp_cmd('Storage.clearCookies', {'browserContextId': self.context_id})
+        self.driver.execute_cdp_cmd('Page.navigate', {'url': 'about:blank'})
+
+    def close(self) -> None:
+        """关闭本账号的浏览器上下文，共享的Chrome保持运行"""
+        try:
+            if self.driver:
+                logger.info("关闭浏览器上下文")
+                self.shared.close_context(self.context_id, self.target_id)
+        except Exception as e:
+            logger.error(f"关闭浏览器上下文时出错: {e}")
+        finally:
+            self.driver = None
+            self.cdp_events_enabled = False
+
+
+_shared_chrome: Optional[SharedChrome] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_chrome(config: Dict[str, Any]) -> SharedChrome:
+    """
+    获取全局共享的Chrome
+
+    Args:
+        config: 配置信息
+
+    Returns:
+        共享Chrome
+    """
+    global _shared_chrome
+    with _shared_lock:
+        if _shared_chrome is None:
+            _shared_chrome = SharedChrome(config)
+        return _shared_chrome
+
+
+def shutdown_shared_chrome() -> None:
+    """关闭共享的Chrome（如果已启动）"""
+    with _shared_lock:
+        shared = _shared_chrome
+    if shared:
+        shared.shutdown()
@@ -0,0 +1,221 @@
+"""
+阶段耗时记录模块
+以span的形式记录每个阶段的开始时间、耗时和附加信息，并输出为JSON运行报告
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+_local = threading.local()
+# span完成时的回调，例如导出为Prometheus指标
+_listeners: List[Callable[['SpanRecorder', Dict[str, Any]], None]] = []
+
+
+class SpanRecorder:
+    """记录一次运行（或一个账号）中的所有span"""
+
+    def __init__(self, name: str, report_path: Optional[str] = None, **attributes: Any):
+        """
+        初始化记录器
+
+        Args:
+            name: 记录器名称，通常为账号名称或run
+            report_path: 报告文件路径，为None时不写入文件
+            attributes: 附加信息
+        """
+        self.name = name
+        self.report_path = report_path
+        self.attributes = attributes
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        记录一个阶段，with块中可以修改返回的字典补充结果信息
+
+        Args:
+            name: 阶段名称
+            attributes: 附加信息
+
+        Yields:
+            span的附加信息字典
+        """
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield attributes
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            self.add(name, time.perf_counter() - start, start=start, status=attributes.pop('status', status),
+                     **attributes)
+
+    def add(self, name: str, duration: float, start: Optional[float] = None, status: str = 'ok',
+            **attributes: Any) -> None:
+        """
+        添加一个已完成的span
+
+        Args:
+            name: 阶段名称
+            duration: 耗时（秒）
+            start: 开始时间（time.perf_counter），默认为当前时间减去耗时
+            status: 状态
+            attributes: 附加信息
+        """
+        if start is None:
+            start = time.perf_counter() - duration
+        record = {
+            'name': name,
+            'offset': round(start - self._start, 4),
+            'duration': round(duration, 4),
+            'status': status,
+            'thread': threading.current_thread().name,
+        }
+        if attributes:
+            record['attributes'] = attributes
+        with self._lock:
+            self._spans.append(record)
+        for listener in _listeners:
+            try:
+                listener(self, record)
+            except Exception as e:
+                logger.debug(f"span回调出错: {e}")
+
+    def phase_totals(self) -> Dict[str, float]:
+        """
+        按阶段名称汇总耗时
+
+        Returns:
+            阶段名称到总耗时的映射
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for record in self._spans:
+                totals[record['name']] = totals.get(record['name'], 0) + record['duration']
+        return totals
+
+    def attribute_total(self, key: str) -> float:
+        """
+        汇总所有span中某个数值附加信息的总和
+
+        Args:
+            key: 附加信息的名称，如saved_seconds
+
+        Returns:
+            总和
+        """
+        with self._lock:
+            return sum(record.get('attributes', {}).get(key, 0) for record in self._spans)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可序列化的字典"""
+        with self._lock:
+            spans = list(self._spans)
+        return {
+            'name': self.name,
+            'started_at': self.started_at,
+            'elapsed': round(time.perf_counter() - self._start, 4),
+            'attributes': self.attributes,
+            'totals': {name: round(total, 4) for name, total in self.phase_totals().items()},
+            'spans': spans,
+        }
+
+    def write(self) -> None:
+        """将报告写入report_path"""
+        if not self.report_path:
+            return
+        try:
+            if os.path.dirname(self.report_path):
+                os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+            temp_path = f"{self.report_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.report_path)
+        except Exception as e:
+            logger.warning(f"写入运行报告失败: {e}")
+
+
+def add_span_listener(listener: Callable[[SpanRecorder, Dict[str, Any]], None]) -> None:
+    """
+    注册span完成时的回调
+
+    Args:
+        listener: 回调函数，参数为记录器和span记录
+    """
+    _listeners.append(listener)
+
+
+def current_recorder() -> Optional[SpanRecorder]:
+    """
+    获取当前线程正在使用的记录器
+
+    Returns:
+        记录器，未激活时返回None
+    """
+    return getattr(_local, 'recorder', None)
+
+
+@contextmanager
+def activate(recorder: Optional[SpanRecorder]) -> Iterator[Optional[SpanRecorder]]:
+    """
+    在当前线程中激活记录器，with块结束后恢复之前的记录器
+
+    Args:
+        recorder: 记录器
+    """
+    previous = current_recorder()
+    _local.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    在当前线程的记录器中记录一个阶段，没有激活的记录器时不记录
+
+    Args:
+        name: 阶段名称
+        attributes: 附加信息
+
+    Yields:
+        span的附加信息字典
+    """
+    recorder = current_recorder()
+    if recorder is None:
+        yield attributes
+        return
+    with recorder.span(name, **attributes) as span_attributes:
+        yield span_attributes
+
+
+def report_path(report_config: Dict[str, Any], run_id: str, name: str) -> Optional[str]:
+    """
+    获取报告文件路径
+
+    Args:
+        report_config: 报告配置
+        run_id: 运行ID
+        name: 报告名称
+
+    Returns:
+        报告文件路径，未启用报告时返回None
+    """
+    if not report_config.get('enabled', True):
+        return None
+    safe_name = ''.join(char if char.isalnum() or char in '-_.' else '_' for char in name)
+    return os.path.join(report_config.get('dir', 'records/reports'), run_id, f"{safe_name}.json")